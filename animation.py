@@ -0,0 +1,96 @@
+import time
+
+from flow import blocking
+
+# Keys that jump straight to the end of an animation; any other key
+# fast-forwards it
+SKIP_KEYS = ('q', '\x1b', '\r', '\n')
+FAST_FORWARD = 4
+
+
+class FrameClock:
+    """Hands out frame deadlines at a fixed rate.
+
+    Deadlines are measured from the start of playback rather than from the
+    previous frame, so a slow draw doesn't push every later frame back.
+    """
+
+    def __init__(self, fps, clock=time.monotonic):
+        self.fps = fps
+        self.clock = clock
+        self.start_time = None
+        self.frame = 0
+
+    def start(self):
+        self.start_time = self.clock()
+        self.frame = 0
+
+    def next_deadline(self):
+        """Advance one frame and return the time it should end"""
+        self.frame += 1
+        return self.start_time + self.frame / self.fps
+
+    def speed_up(self, factor):
+        """Play the remaining frames factor times faster from now on"""
+        now = self.clock()
+        self.fps *= factor
+        self.start_time = now - self.frame / self.fps
+
+
+class AnimationPlayer:
+    """Plays animation steps against a frame clock.
+
+    A step is a callable that draws one frame, usually by writing a few
+    cells with Terminal.write_at. Between steps the player waits for the
+    frame deadline with a timed read_key, so a keypress can skip or
+    fast-forward. Terminals that aren't realtime (headless ones) run the
+    steps back to back without waiting or consuming keys.
+
+    play() and hold() block; play_flow() and hold_flow() are the same
+    thing as flows (see flow.py) for use inside other flows.
+    """
+
+    def __init__(self, terminal, fps=5):
+        self.terminal = terminal
+        self.fps = fps
+
+    def play_flow(self, steps, fps=None):
+        """Run every step, returning True if the player skipped ahead"""
+        clock = FrameClock(fps or self.fps)
+        clock.start()
+        waiting = self.terminal.realtime
+        skipped = False
+        for step in steps:
+            step()
+            if not waiting:
+                continue
+            deadline = clock.next_deadline()
+            key = yield from self._wait_until(clock, deadline)
+            if key is None:
+                continue
+            if key.lower() in SKIP_KEYS:
+                # Draw what is left without holding any frame
+                waiting = False
+                skipped = True
+            else:
+                clock.speed_up(FAST_FORWARD)
+                yield from self._wait_until(clock, clock.start_time + clock.frame / clock.fps)
+        return skipped
+
+    play = blocking(play_flow)
+
+    def hold_flow(self, seconds):
+        """Keep the current frame up for a while or until a key is pressed"""
+        if not self.terminal.realtime or seconds <= 0:
+            return False
+        clock = FrameClock(1 / seconds)
+        clock.start()
+        return (yield from self._wait_until(clock, clock.next_deadline())) is not None
+
+    hold = blocking(hold_flow)
+
+    def _wait_until(self, clock, deadline):
+        remaining = deadline - clock.clock()
+        if remaining <= 0:
+            return None
+        return (yield remaining)
@@ -1,369 +1,180 @@
-def get_ascii_art(name):
-    """Return ASCII art for entities/items"""
-    art = {
-        'player': '''
+from types import MappingProxyType
+
+# Small map/inventory art keyed by entity name
+_ENTITY_ART = MappingProxyType({
+    'player': '''
     @
    /|\\
    / \\
         ''',
-        'monster': '''
+    'monster': '''
     M
    /|\\
    / \\
         ''',
-        'treasure': '''
+    'treasure': '''
     $
    /|\\
    / \\
         ''',
-        'wall': '''
+    'wall': '''
   ####
   ####
   ####
         '''
-    }
-    return art.get(name.lower(), '?')
+})
+
+# Every combat figure shares the same body; only the head, the attack
+# arrow and the hurt shout differ between entities
+_COMBAT_BODY = r'''
+      {head}
+     /|\
+    / | \
+   /  |  \
+  /   |   \
+ /    |    \
+/     |     \
+     / \
+    /   \
+   /     \
+  /       \
+ /         \
+/           \
+{extra}        '''
+
+_COMBAT_FIGURES = {
+    # entity: (head, attack arrow, hurt shout)
+    'player': ('@', '>>>>>>>>>>>>', 'OUCH!'),
+    'goblin': ('g', '<<<<<<<<<<<<', 'GRR!'),
+    'orc': ('O', '<<<<<<<<<<<<', 'RAA!'),
+    'troll': ('T', '<<<<<<<<<<<<', 'GRR!'),
+    'monster': ('M', '<<<<<<<<<<<<', 'OOF!'),  # Default for anything else
+}
+
+def _build_combat_art():
+    art = {}
+    for entity, (head, arrow, shout) in _COMBAT_FIGURES.items():
+        art[(entity, 'idle')] = _COMBAT_BODY.format(head=head, extra='')
+        art[(entity, 'attack')] = _COMBAT_BODY.format(head=head, extra=f'   {arrow}\n')
+        art[(entity, 'hurt')] = _COMBAT_BODY.format(head=head, extra=f'     {shout}\n')
+    return MappingProxyType(art)
+
+def _split_and_pad(text):
+    lines = text.split('\n')
+    width = max(len(line) for line in lines)
+    return tuple(line.ljust(width) for line in lines)
+
+# Built once at import: raw strings for get_combat_art and pre-split,
+# pre-padded line tuples for get_combat_art_lines
+COMBAT_ART = _build_combat_art()
+COMBAT_ART_LINES = MappingProxyType({key: _split_and_pad(text) for key, text in COMBAT_ART.items()})
+
+def get_ascii_art(name):
+    """Return ASCII art for entities/items"""
+    return _ENTITY_ART.get(name.lower(), '?')
+
+def _combat_art_key(entity_type, pose):
+    if entity_type not in _COMBAT_FIGURES:
+        entity_type = 'monster'
+    return (entity_type, pose)
 
 def get_combat_art(entity_type, pose='idle'):
     """Return ASCII art for combat animations"""
-    if entity_type == 'player':
-        if pose == 'idle':
-            return '''
-      @
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-        '''
-        elif pose == 'attack':
-            return '''
-      @
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-   >>>>>>>>>>>>
-        '''
-        elif pose == 'hurt':
-            return '''
-      @
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-     OUCH!
-        '''
-    elif entity_type == 'goblin':
-        if pose == 'idle':
-            return '''
-      g
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-        '''
-        elif pose == 'attack':
-            return '''
-      g
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-   <<<<<<<<<<<<
-        '''
-        elif pose == 'hurt':
-            return '''
-      g
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-     GRR!
-        '''
-    elif entity_type == 'orc':
-        if pose == 'idle':
-            return '''
-      O
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-        '''
-        elif pose == 'attack':
-            return '''
-      O
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-   <<<<<<<<<<<<
-        '''
-        elif pose == 'hurt':
-            return '''
-      O
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-     RAA!
-        '''
-    elif entity_type == 'troll':
-        if pose == 'idle':
-            return '''
-      T
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-        '''
-        elif pose == 'attack':
-            return '''
-      T
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-   <<<<<<<<<<<<
-        '''
-        elif pose == 'hurt':
-            return '''
-      T
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-     GRR!
-        '''
-    else:  # Default monster
-        if pose == 'idle':
-            return '''
-      M
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-        '''
-        elif pose == 'attack':
-            return '''
-      M
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-   <<<<<<<<<<<<
-        '''
-        elif pose == 'hurt':
-            return '''
-      M
-     /|\\
-    / | \\
-   /  |  \\
-  /   |   \\
- /    |    \\
-/     |     \\
-     / \\
-    /   \\
-   /     \\
-  /       \\
- /         \\
-/           \\
-     OOF!
-        '''
+    return COMBAT_ART.get(_combat_art_key(entity_type, pose))
+
+def get_combat_art_lines(entity_type, pose='idle'):
+    """Return combat art as a tuple of lines padded to the same width.
+
+    The tuples are shared and built at import, so callers can compose
+    them directly without splitting or padding. Unknown poses give ().
+    """
+    return COMBAT_ART_LINES.get(_combat_art_key(entity_type, pose), ())
+
+_ANIMATIONS = {
+    'fireball': [
+        r"   *   ",
+        r"  ***  ",
+        r" ***** ",
+        r"*******",
+        r"  ***  ",
+        r"   *   "
+    ],
+    'lightning': [
+        r"   /  ",
+        r"  /   ",
+        r" /    ",
+        r"/     ",
+        r"  /   ",
+        r" /    "
+    ],
+    'heal': [
+        r"  +  ",
+        r" +++ ",
+        r"  +  "
+    ],
+    'power_strike': [
+        r"  /|  ",
+        r" / |  ",
+        r"/  |  ",
+        r"   |  "
+    ],
+    'shield_bash': [
+        r" [===] ",
+        r"  | |  ",
+        r" [===] "
+    ],
+    'backstab': [
+        r"  >---> ",
+        r"   >--->",
+        r"    >--->"
+    ],
+    'evasion': [
+        r"  \\  ",
+        r"   \\ ",
+        r"    \\"],
+    'poison_strike': [
+        r" ~~~  ",
+        r"~ ~ ~ ",
+        r" ~~~  "
+    ],
+    'battle_rage': [
+        r" !!!  ",
+        r"!!!!! ",
+        r" !!!  "
+    ],
+    'smite': [
+        r"  |  ",
+        r" /|\ ",
+        r"  |  "
+    ],
+    'ice_storm': [
+        r"  *  ",
+        r" * * ",
+        r"  *  "
+    ],
+    'meteor': [
+        r"  o  ",
+        r" ooo ",
+        r"  o  "
+    ],
+    'divine_protection': [
+        r"  ()  ",
+        r" (  ) ",
+        r"  ()  "
+    ],
+    'resurrection': [
+        r"  ^  ",
+        r" / \\",
+        r"/   \\"
+    ]
+}
+# Frozen so every caller can share the same frame tuples
+ANIMATIONS = MappingProxyType({name: tuple(frames) for name, frames in _ANIMATIONS.items()})
+_DEFAULT_ANIMATION = (r" * ",)
 
 def get_animation_frames(name):
-    """Return a list of ASCII frames for a given spell or skill animation name."""
-    # Example animations for demonstration
-    animations = {
-        'fireball': [
-            r"   *   ",
-            r"  ***  ",
-            r" ***** ",
-            r"*******",
-            r"  ***  ",
-            r"   *   "
-        ],
-        'lightning': [
-            r"   /  ",
-            r"  /   ",
-            r" /    ",
-            r"/     ",
-            r"  /   ",
-            r" /    "
-        ],
-        'heal': [
-            r"  +  ",
-            r" +++ ",
-            r"  +  "
-        ],
-        'power_strike': [
-            r"  /|  ",
-            r" / |  ",
-            r"/  |  ",
-            r"   |  "
-        ],
-        'shield_bash': [
-            r" [===] ",
-            r"  | |  ",
-            r" [===] "
-        ],
-        'backstab': [
-            r"  >---> ",
-            r"   >--->",
-            r"    >--->"
-        ],
-        'evasion': [
-            r"  \\  ",
-            r"   \\ ",
-            r"    \\"],
-        'poison_strike': [
-            r" ~~~  ",
-            r"~ ~ ~ ",
-            r" ~~~  "
-        ],
-        'battle_rage': [
-            r" !!!  ",
-            r"!!!!! ",
-            r" !!!  "
-        ],
-        'smite': [
-            r"  |  ",
-            r" /|\ ",
-            r"  |  "
-        ],
-        'ice_storm': [
-            r"  *  ",
-            r" * * ",
-            r"  *  "
-        ],
-        'meteor': [
-            r"  o  ",
-            r" ooo ",
-            r"  o  "
-        ],
-        'divine_protection': [
-            r"  ()  ",
-            r" (  ) ",
-            r"  ()  "
-        ],
-        'resurrection': [
-            r"  ^  ",
-            r" / \\",
-            r"/   \\"
-        ]
-    }
-    return animations.get(name, [r" * "])
+    """Return the ASCII frames for a given spell or skill animation name."""
+    return ANIMATIONS.get(name, _DEFAULT_ANIMATION)
 
 def get_title_screen():
     return r'''
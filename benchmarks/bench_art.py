@@ -0,0 +1,63 @@
+"""Microbenchmark for combat art fetch and compose time.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_art
+"""
+import timeit
+
+from ascii_art import get_combat_art, get_combat_art_lines
+from game import compose_combat_panel
+
+ENTITIES = ['goblin', 'orc', 'troll', 'dragon']
+POSES = ['idle', 'attack', 'hurt']
+
+
+def compose_from_strings(monster_type, player_pose, monster_pose):
+    """The pre-table path: fetch art strings, split and pad every frame"""
+    player_lines = (get_combat_art('player', player_pose) or '').split('\n')
+    monster_lines = (get_combat_art(monster_type, monster_pose) or '').split('\n')
+    max_lines = max(len(player_lines), len(monster_lines))
+    panel = []
+    for i in range(max_lines):
+        player_line = player_lines[i] if i < len(player_lines) else ""
+        monster_line = monster_lines[i] if i < len(monster_lines) else ""
+        panel.append(f"{player_line:<40} {monster_line}")
+    return panel
+
+
+def fetch_lines():
+    for entity in ENTITIES:
+        for pose in POSES:
+            get_combat_art_lines(entity, pose)
+
+
+def fetch_and_split_strings():
+    for entity in ENTITIES:
+        for pose in POSES:
+            (get_combat_art(entity, pose) or '').split('\n')
+
+
+def compose_all(compose):
+    for entity in ENTITIES:
+        for pose in POSES:
+            compose(entity, 'idle', pose)
+
+
+def main(number=2000):
+    calls = len(ENTITIES) * len(POSES) * number
+    cases = [
+        ("fetch: split strings", fetch_and_split_strings),
+        ("fetch: line tuples", fetch_lines),
+        ("compose: split + pad", lambda: compose_all(compose_from_strings)),
+        ("compose: line tuples", lambda: compose_all(compose_combat_panel.__wrapped__)),
+        ("compose: cached panel", lambda: compose_all(compose_combat_panel)),
+    ]
+    print(f"{'case':<24} {'us/call':>10}")
+    for label, func in cases:
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        print(f"{label:<24} {seconds / calls * 1e6:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
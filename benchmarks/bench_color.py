@@ -0,0 +1,82 @@
+"""Bytes per frame for coloured map rendering.
+
+Walks the player around generated levels and draws every step through a
+PosixTerminal into a null sink, comparing monochrome output (which still
+dims remembered tiles) with run-length-merged colour, naive per-cell
+colour and colour under a bandwidth cap.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_color
+"""
+import os
+import random
+
+from dungeon import Dungeon, TILE_COLORS, sgr
+from terminal import PosixTerminal
+
+# Pretend the window is tall enough for diffed redraws
+os.environ.setdefault('LINES', '200')
+os.environ.setdefault('COLUMNS', '500')
+
+
+class NullSink:
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+def random_walk(dungeon, steps, rng):
+    """Yield player positions for a random walk over floor tiles"""
+    x, y = 1, 1
+    for _ in range(steps):
+        yield x, y
+        options = [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if dungeon.map[y + dy][x + dx] in '.>']
+        if options:
+            x, y = rng.choice(options)
+
+
+def per_cell_color(lines):
+    """Colour every visible character with its own escape sequence"""
+    out = []
+    for line in lines:
+        plain = line.replace('\x1b[0m', '')
+        out.append(''.join(sgr(TILE_COLORS[ch]) + ch if ch in TILE_COLORS else ch for ch in plain))
+    return out
+
+
+def measure(level, steps, mode, cap=None, seed=1):
+    random.seed(seed)
+    dungeon = Dungeon()
+    for _ in range(level - 1):
+        dungeon.next_level()
+    terminal = PosixTerminal(NullSink(), input_fd=0)
+    terminal.max_frame_bytes = cap
+    for pos in random_walk(dungeon, steps, random.Random(seed)):
+        lines = dungeon.render_lines(player_pos=pos, color=(mode != 'plain'))
+        if mode == 'per-cell':
+            lines = per_cell_color(lines)
+        terminal.draw(lines)
+    return terminal
+
+
+def main(steps=200):
+    print(f"{'level':>5} {'mode':<16} {'bytes/frame':>12} {'degraded':>9}")
+    for level in (1, 10):
+        baseline = None
+        for label, mode, cap in [("no colour", 'plain', None),
+                                 ("colour (runs)", 'color', None),
+                                 ("colour per-cell", 'per-cell', None),
+                                 ("colour capped", 'color', 500)]:
+            terminal = measure(level, steps, mode, cap)
+            per_frame = terminal.bytes_written / terminal.frames_drawn
+            baseline = baseline or per_frame
+            print(f"{level:>5} {label:<16} {per_frame:>12.0f} {terminal.frames_degraded:>9}"
+                  f"   ({per_frame / baseline:.2f}x no colour)")
+
+
+if __name__ == "__main__":
+    main()
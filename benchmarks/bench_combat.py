@@ -0,0 +1,84 @@
+"""Combat rounds per second with and without the UI.
+
+Compares the pure resolver (combat.resolve_round) with Game.combat_round,
+which runs the same resolver and presents it: poses, battle log and
+screen frames, on a HeadlessTerminal (frames built and kept) and on a
+NullTerminal (nothing drawn).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_combat [--seconds S]
+"""
+import argparse
+import random
+import time
+
+import combat
+from entities import Player, Monster
+from game import Game
+from terminal import HeadlessTerminal, NullTerminal
+
+# Rogues dodge and dragons survive a long time, so every round goes
+# through the full player and monster turns
+PLAYER_CLASS = 'rogue'
+MONSTER_TYPE = 'dragon'
+
+
+def fresh_pair():
+    player = Player(1, 1, PLAYER_CLASS)
+    player.max_hp = player.hp = 10 ** 9
+    return player, Monster(2, 1, MONSTER_TYPE)
+
+
+def resolver_rounds(seconds):
+    """Rounds per second of the bare resolver"""
+    player, monster = fresh_pair()
+    player_state, monster_state = combat.player_state(player), combat.monster_state(monster)
+    start_monster = monster_state
+    rng = random.Random(1)
+    rounds = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(1000):
+            result = combat.resolve_round(player_state, monster_state, 'a', rng)
+            player_state, monster_state = result.player, result.monster
+            if result.outcome is not None:
+                monster_state = start_monster
+        rounds += 1000
+    return rounds / (time.perf_counter() - start)
+
+
+def game_rounds(terminal, seconds):
+    """Rounds per second of Game.combat_round drawing on terminal"""
+    game = Game(terminal)
+    game.test_mode = True
+    game.player, monster = fresh_pair()
+    log = []
+    rounds = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(100):
+            result, log = game.combat_round(game.player, monster, 'a', log)
+            if result is not None or not monster.is_alive():
+                monster = Monster(2, 1, MONSTER_TYPE)
+                log = []
+        rounds += 100
+    return rounds / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Combat rounds per second")
+    parser.add_argument('--seconds', type=float, default=2.0, help="time per case")
+    args = parser.parse_args(argv)
+    cases = [
+        ("resolve_round", lambda: resolver_rounds(args.seconds)),
+        ("combat_round, NullTerminal", lambda: game_rounds(NullTerminal(), args.seconds)),
+        ("combat_round, HeadlessTerminal", lambda: game_rounds(HeadlessTerminal(max_frames=4), args.seconds)),
+    ]
+    print(f"{'case':<32} {'rounds/s':>12}")
+    for label, run in cases:
+        print(f"{label:<32} {run():>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
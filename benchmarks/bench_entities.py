@@ -0,0 +1,92 @@
+"""Memory and attribute access of many monsters and items.
+
+Builds 100k monsters and 100k items under tracemalloc and reports the
+bytes each one costs, then times reading and writing the attributes the
+game touches every turn (position, HP and move counter of monsters,
+quantity and weight of items). Entities keep their attributes in
+__slots__, so an instance has no __dict__ of its own, and a monster's
+per-type stats are read from its shared template (see monsters.py).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_entities [--count N] [--repeat R]
+"""
+import argparse
+import time
+import tracemalloc
+
+from entities import Monster, Item
+
+MONSTER_TYPES = ['goblin', 'orc', 'troll', 'dragon']
+
+
+def build_monsters(count):
+    return [Monster(i % 80, i % 25, MONSTER_TYPES[i % len(MONSTER_TYPES)]) for i in range(count)]
+
+
+def build_items(count):
+    return [Item(i % 80, i % 25, '!', 'Health Potion', None, 'potion', 1 + i % 5, 0.5) for i in range(count)]
+
+
+def bytes_per_instance(build, count):
+    """Bytes allocated per instance built by build(count)"""
+    build(10)  # Warm up imports and caches
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        instances = build(count)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    # Leave out the list holding them
+    del instances
+    return total / count - 8
+
+
+def touch_monsters(monsters):
+    """One map turn's worth of attribute traffic per monster: 4 reads, 1 write"""
+    total = 0
+    for monster in monsters:
+        total += monster.x + monster.y + monster.hp
+        monster.move_counter = monster.move_counter + 1
+    return total
+
+
+def touch_items(items):
+    """Weighing an inventory: 2 reads per item, then 1 write"""
+    total = 0.0
+    for item in items:
+        total += item.quantity * item.weight
+        item.quantity = item.quantity
+    return total
+
+
+def ns_per_access(touch, instances, accesses, repeat):
+    """Best time over repeat runs, in nanoseconds per attribute access"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        touch(instances)
+        best = min(best, time.perf_counter() - start)
+    return best / (len(instances) * accesses) * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory and attribute access of many monsters and items")
+    parser.add_argument('--count', type=int, default=100000, help="monsters and items to build")
+    parser.add_argument('--repeat', type=int, default=5, help="timing runs per case (best is kept)")
+    args = parser.parse_args(argv)
+    print(f"{'case':<10} {'bytes/instance':>15} {'ns/access':>10}")
+    cases = [
+        ("Monster", build_monsters, touch_monsters, 5),
+        ("Item", build_items, touch_items, 3),
+    ]
+    for label, build, touch, accesses in cases:
+        size = bytes_per_instance(build, args.count)
+        ns = ns_per_access(touch, build(args.count), accesses, args.repeat)
+        print(f"{label:<10} {size:>15,.0f} {ns:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Auto-explore soak test.
+
+Plays levels headlessly with auto-explore: explore until something stops
+it, fight whatever came into view, open chests in the way, then take the
+stairs once the level is fully explored. Reports simulation steps per
+second and fails loudly if the simulation gets stuck.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_explore [--levels N] [--seed S]
+"""
+import argparse
+import random
+import time
+
+from entities import Player
+from game import Game
+from terminal import HeadlessTerminal
+
+MOVE_KEYS = {(0, -1): 'w', (-1, 0): 'a', (0, 1): 's', (1, 0): 'd'}
+# Answers for any prompt the game raises: F confirms the highlighted
+# combat action (Attack), and any key dismisses a message
+PROMPT_KEYS = ['f'] * 200
+
+
+def step_toward(game, goal):
+    """Take one ordinary move along the known path to goal; False if there is none"""
+    path = game.dungeon.find_path((game.player.x, game.player.y), goal)
+    if not path:
+        return False
+    x, y = path[0]
+    game.terminal.keys.clear()
+    game.terminal.feed([MOVE_KEYS[(x - game.player.x, y - game.player.y)]] + PROMPT_KEYS)
+    game.handle_input()
+    return True
+
+
+def soak(levels=3, seed=1, max_actions=100000):
+    """Play the given number of levels and return (steps, fights, seconds)"""
+    random.seed(seed)
+    terminal = HeadlessTerminal(max_frames=4)
+    game = Game(terminal)
+    game.test_mode = True  # No loot prompts
+    game.player = Player(1, 1, 'warrior')
+    game.player.max_hp = game.player.hp = 10 ** 9  # Soak runs shouldn't end in death
+    steps = fights = 0
+    start = time.perf_counter()
+    for _ in range(max_actions):
+        if game.dungeon.level > levels or not game.is_running:
+            break
+        terminal.keys.clear()
+        terminal.feed(PROMPT_KEYS)
+        dungeon = game.dungeon
+        dungeon.update_fov(game.player.x, game.player.y)
+        monsters = dungeon.visible_monsters()
+        frontier = dungeon.get_frontier_map()
+        if monsters:
+            nearest = min(monsters, key=lambda m: abs(m.x - game.player.x) + abs(m.y - game.player.y))
+            if step_toward(game, (nearest.x, nearest.y)):
+                steps += 1
+                fights += not nearest.is_alive()
+                continue
+        taken = game.auto_explore() if not monsters else 0
+        if taken:
+            steps += taken
+            continue
+        step = frontier.next_step(game.player.x, game.player.y)
+        if step is not None:
+            # Something (usually a chest) is in the way; walk into it
+            terminal.keys.clear()
+            terminal.feed([MOVE_KEYS[step]] + PROMPT_KEYS)
+            game.handle_input()
+            steps += 1
+        elif dungeon.stairs and step_toward(game, dungeon.stairs):
+            steps += 1
+        else:
+            raise RuntimeError(f"Soak test stuck on level {dungeon.level} at {(game.player.x, game.player.y)}")
+    else:
+        raise RuntimeError(f"Soak test did not finish in {max_actions} actions")
+    return steps, fights, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Auto-explore soak test")
+    parser.add_argument('--levels', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    steps, fights, seconds = soak(args.levels, args.seed)
+    print(f"{args.levels} levels, {steps} steps, {fights} monsters killed in {seconds:.2f}s "
+          f"({steps / seconds:.0f} steps/s, including level generation)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Game forks per second.
+
+Forks a game standing on the map with snapshot.fork() (shared tile rows,
+compact entity tuples, captured random state) and compares it with
+copy.deepcopy() of the dungeon and player, at dungeon level 1 and a
+bigger level 10.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_fork [--seconds S]
+"""
+import argparse
+import copy
+import random
+import time
+
+import snapshot
+from entities import Player
+from game import Game
+from terminal import NullTerminal
+
+
+def game_on_level(level, seed=1):
+    """A game with a player on a freshly seen level-`level` map"""
+    random.seed(seed)
+    game = Game(NullTerminal())
+    game.player = Player(1, 1, 'rogue')
+    if level > 1:
+        game.dungeon.level = level
+        game.dungeon.generate()
+    game.dungeon.update_fov(1, 1)
+    game.dungeon.get_frontier_map()
+    return game
+
+
+def rate(action, seconds):
+    """Calls of action per second"""
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(100):
+            action()
+        count += 100
+    return count / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Game forks per second")
+    parser.add_argument('--seconds', type=float, default=1.0, help="time per case")
+    args = parser.parse_args(argv)
+    print(f"{'case':<34} {'per second':>12}")
+    for level in (1, 10):
+        game = game_on_level(level)
+        snap = snapshot.take_snapshot(game)
+        cases = [
+            ("take_snapshot", lambda: snapshot.take_snapshot(game)),
+            ("restore", lambda: snapshot.restore(snap)),
+            ("fork", lambda: snapshot.fork(game)),
+            ("deepcopy(dungeon, player)", lambda: copy.deepcopy((game.dungeon, game.player))),
+        ]
+        for label, action in cases:
+            print(f"{f'level {level}: {label}':<34} {rate(action, args.seconds):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Memory per idle game session.
+
+Builds N sessions the way the server holds them (a Game on a
+NullTerminal with a player standing on a freshly seen map) under
+tracemalloc and reports the bytes each one costs, at dungeon and
+character level 1 and at level 20, with the biggest allocation sites.
+Static game data (class spells and skills, monster loot tables, chest
+contents) lives in shared module-level tables, so it should not show up
+per session.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory [--sessions N] [--top K]
+"""
+import argparse
+import random
+import tracemalloc
+
+from entities import Player
+from game import Game
+from terminal import NullTerminal
+
+CLASSES = ['warrior', 'mage', 'rogue', 'cleric']
+
+
+def idle_session(level, player_class):
+    """A session parked on a level-`level` map with a level-`level` player"""
+    game = Game(NullTerminal())
+    game.player = Player(1, 1, player_class)
+    while game.player.level < level:
+        game.player.level_up()
+    if level > 1:
+        game.dungeon.level = level
+        game.dungeon.generate()
+    game.dungeon.update_fov(game.player.x, game.player.y)
+    return game
+
+
+def measure(level, sessions, seed=1):
+    """Return (bytes per session, snapshot statistics by line)"""
+    random.seed(seed)
+    idle_session(level, CLASSES[0])  # Warm up imports and caches
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        games = [idle_session(level, CLASSES[i % len(CLASSES)]) for i in range(sessions)]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, 'lineno')
+    total = sum(stat.size_diff for stat in stats)
+    del games
+    return total / sessions, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory per idle game session")
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--top', type=int, default=5, help="allocation sites to list per level")
+    args = parser.parse_args(argv)
+    for level in (1, 20):
+        per_session, stats = measure(level, args.sessions)
+        print(f"level {level:>2}: {per_session / 1024:8.1f} KiB per idle session")
+        for stat in stats[:args.top]:
+            frame = stat.traceback[0]
+            print(f"    {stat.size_diff / args.sessions / 1024:8.1f} KiB  {frame.filename.rsplit('/', 1)[-1]}:{frame.lineno}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Render throughput for the map and the full-screen game views.
+
+Drives Dungeon.render, Game.display_combat_screen, Game.show_inventory and
+Game.show_animation into a byte-counting null sink and reports frames per
+second, bytes per frame and peak memory per frame: the most bytes that
+tracemalloc sees in use above the starting point while one frame is
+drawn (a high-water mark, not a count of allocations). Map cases run at
+the map sizes of levels 1, 10, 50 and 100 and include the original
+per-character print loop for comparison.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_render           # compare with the stored baseline
+    python -m benchmarks.bench_render --save    # store these numbers as the baseline
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import time
+import tracemalloc
+from collections import deque
+
+from dungeon import Dungeon
+from entities import Item, Monster, Player
+from game import Game
+from terminal import PosixTerminal
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'render_baseline.json')
+LEVELS = (1, 10, 50, 100)
+
+
+class CountingSink:
+    """Text stream that throws everything away but counts the bytes"""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text):
+        self.bytes += len(text.encode('utf-8'))
+
+    def flush(self):
+        pass
+
+
+class BenchTerminal(PosixTerminal):
+    """Stream backend into a sink, with scripted keys and no waiting"""
+
+    realtime = False
+
+    def __init__(self, sink):
+        super().__init__(sink, input_fd=0)
+        self.keys = deque()
+
+    def read_key(self, timeout=None):
+        return self.keys.popleft() if self.keys else 'q'
+
+
+def make_dungeon(level, seed=1):
+    """Return a dungeon with the size of the given level.
+
+    Dungeon.generate() gets very slow on big levels, and rendering only
+    cares about the size and contents of the map, so the layout here is
+    seeded random fill with a wall border.
+    """
+    rng = random.Random(seed)
+    dungeon = Dungeon()
+    dungeon.level = level
+    dungeon.width = dungeon.base_width + (level - 1) * 4
+    dungeon.height = dungeon.base_height + (level - 1) * 2
+    width, height = dungeon.width, dungeon.height
+    dungeon.map = [['#' if x in (0, width - 1) or y in (0, height - 1) or rng.random() < 0.3 else '.'
+                    for x in range(width)] for y in range(height)]
+    dungeon.map[1][1] = '.'
+    dungeon.explored = bytearray(width * height)
+    dungeon.visible = bytearray(width * height)
+    dungeon.visible_cells = set()
+    dungeon.fov_origin = None
+    floors = [(x, y) for y in range(height) for x in range(width) if dungeon.map[y][x] == '.']
+    dungeon.monsters = [Monster(x, y, rng.choice(['goblin', 'orc', 'troll']))
+                        for x, y in rng.sample(floors, 10 + level // 5)]
+    dungeon.chests = []
+    return dungeon
+
+
+def walk(dungeon, seed=1):
+    """Yield positions of an endless random walk over floor tiles"""
+    rng = random.Random(seed)
+    x, y = 1, 1
+    while True:
+        yield x, y
+        options = [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if dungeon.map[y + dy][x + dx] == '.']
+        if options:
+            x, y = rng.choice(options)
+
+
+def legacy_render(dungeon, player_pos):
+    """The original renderer: one print() call per map cell"""
+    display_map = [row[:] for row in dungeon.map]
+    for monster in dungeon.monsters:
+        if monster.is_alive():
+            display_map[monster.y][monster.x] = monster.char
+    for chest in dungeon.chests:
+        display_map[chest.y][chest.x] = chest.char
+    for y in range(dungeon.height):
+        for x in range(dungeon.width):
+            if player_pos and (x, y) == player_pos:
+                print('@', end='')
+            else:
+                print(display_map[y][x], end='')
+        print()
+    print(f"\nLevel: {dungeon.level}")
+    print("Controls: WASD to move, P to quit, I for inventory, X for spells/skills")
+    print("Monsters: g=Goblin, o=Orc, t=Troll | C=Chest, >=Stairs")
+
+
+def map_cases(level):
+    """Return (name, sink, step) cases for one map size; step returns frames drawn"""
+    cases = []
+
+    dungeon = make_dungeon(level)
+    positions = walk(dungeon)
+    sink = CountingSink()
+
+    def print_loop(dungeon=dungeon, positions=positions, sink=sink):
+        with contextlib.redirect_stdout(sink):
+            legacy_render(dungeon, next(positions))
+        return 1
+    cases.append(("map: print loop", sink, print_loop))
+
+    for name, color in (("map: diffed", False), ("map: diffed colour", True)):
+        dungeon = make_dungeon(level)
+        positions = walk(dungeon)
+        sink = CountingSink()
+        terminal = BenchTerminal(sink)
+
+        def diffed(dungeon=dungeon, positions=positions, terminal=terminal, color=color):
+            dungeon.render(next(positions), terminal=terminal, color=color)
+            return 1
+        cases.append((name, sink, diffed))
+    return cases
+
+
+def screen_cases():
+    """Return (name, sink, step) cases for the full-screen game views"""
+    sink = CountingSink()
+    terminal = BenchTerminal(sink)
+    game = Game(terminal)
+    game.player = Player(1, 1, 'mage')
+    for name, effect, kind in (("Health Potion", {'heal': 15}, 'potion'),
+                               ("Steel Sword", {'attack': 5}, 'weapon'),
+                               ("Leather Armor", {'defense': 2}, 'armor')):
+        game.player.add_to_inventory(Item(0, 0, '!', name, effect, kind))
+    monster = Monster(2, 2, 'orc')
+    log = ["You attack the Orc for 3 damage!", "The Orc hits you for 2 damage!", "You cast Fireball!"]
+    poses = [('idle', 'idle'), ('attack', 'hurt'), ('hurt', 'attack')]
+
+    def counted(func):
+        def step():
+            before = terminal.frames_drawn
+            func()
+            return terminal.frames_drawn - before
+        return step
+
+    pose_index = [0]
+
+    def combat():
+        player_pose, monster_pose = poses[pose_index[0] % len(poses)]
+        pose_index[0] += 1
+        game.display_combat_screen(monster, log, player_pose, monster_pose)
+
+    def inventory():
+        terminal.keys.extend('sssq')
+        game.show_inventory()
+
+    return [
+        ("combat screen", sink, counted(combat)),
+        ("inventory", sink, counted(inventory)),
+        ("animation", sink, counted(lambda: game.show_animation('fireball', monster, log))),
+    ]
+
+
+def measure(sink, step, seconds):
+    """Return frames/sec, bytes/frame and peak traced bytes/frame"""
+    step()  # Warm up caches and draw the first full frame
+    frames = 0
+    start_bytes = sink.bytes
+    start = time.perf_counter()
+    while True:
+        frames += step()
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds and frames >= 5:
+            break
+    fps = frames / elapsed
+    bytes_per_frame = (sink.bytes - start_bytes) / frames
+
+    # Memory pass: peak traced memory above the starting point, per frame
+    tracemalloc.start()
+    peak_total = 0
+    traced_frames = 0
+    for _ in range(5):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        traced_frames += step()
+        peak_total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return {'fps': fps, 'bytes': bytes_per_frame, 'peak': peak_total / traced_frames}
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--save', action='store_true', help="store the results as the new baseline")
+    parser.add_argument('--seconds', type=float, default=0.5, help="time spent on each case")
+    parser.add_argument('--levels', type=int, nargs='+', default=list(LEVELS))
+    args = parser.parse_args(argv)
+    # Pretend the window is tall enough for diffed redraws of the big maps
+    os.environ.setdefault('LINES', '500')
+    os.environ.setdefault('COLUMNS', '500')
+
+    baseline = load_baseline()
+    results = {}
+    print(f"{'level':>5} {'case':<20} {'frames/s':>10} {'bytes/frame':>12} {'peak KiB':>10} {'vs baseline':>12}")
+    runs = [(level, map_cases(level)) for level in args.levels] + [('-', screen_cases())]
+    for level, cases in runs:
+        for name, sink, step in cases:
+            key = f"{name} @ {level}"
+            result = measure(sink, step, args.seconds)
+            results[key] = result
+            previous = baseline.get(key)
+            change = f"{result['fps'] / previous['fps']:.2f}x" if previous else "-"
+            print(f"{level:>5} {name:<20} {result['fps']:>10.1f} {result['bytes']:>12.0f} "
+                  f"{result['peak'] / 1024:>10.1f} {change:>12}")
+
+    if args.save:
+        baseline.update({key: {k: round(v, 1) for k, v in result.items()} for key, result in results.items()})
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline saved to {BASELINE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
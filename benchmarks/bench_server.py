@@ -0,0 +1,133 @@
+"""Load test for the telnet server.
+
+Opens N scripted sessions against server.py, each picking a class and
+then pressing random keys, and reports input-to-frame latency (time from
+sending a key to the first byte of the redraw) at p50/p99. A second pass
+opens the sessions again under tracemalloc and reports the memory each
+idle session on the map costs. Both sides of the connections share this
+process, so the figure includes the client's end of each socket.
+
+Run from the repository root, against an in-process server:
+
+    python -m benchmarks.bench_server [--sessions N] [--keys K]
+
+or against a running server (latency only):
+
+    python -m benchmarks.bench_server --port 4000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+
+from server import GameServer
+
+# Mostly moves; F confirms combat actions and Space dismisses messages
+KEYS = 'wasd' * 4 + 'f '
+SETTLE = 0.02  # Output is over once the connection is quiet this long
+
+
+async def read_burst(reader):
+    """Wait for output, then read until the connection goes quiet.
+
+    Returns the seconds until the first byte, or None if it closed.
+    """
+    start = time.perf_counter()
+    data = await reader.read(65536)
+    if not data:
+        return None
+    first = time.perf_counter() - start
+    while True:
+        try:
+            data = await asyncio.wait_for(reader.read(65536), SETTLE)
+        except asyncio.TimeoutError:
+            return first
+        if not data:
+            return None
+
+
+async def enter_dungeon(host, port):
+    """Connect, pass the title screen and pick a class; return the streams"""
+    reader, writer = await asyncio.open_connection(host, port)
+    await read_burst(reader)
+    for key in ' 1':
+        writer.write(key.encode())
+        await read_burst(reader)
+    return reader, writer
+
+
+async def scripted_session(host, port, keys, rng, latencies):
+    reader, writer = await enter_dungeon(host, port)
+    try:
+        for _ in range(keys):
+            writer.write(rng.choice(KEYS).encode())
+            latency = await read_burst(reader)
+            if latency is None:
+                break  # Died; the server closed the session
+            latencies.append(latency)
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def measure_latency(host, port, sessions, keys, seed):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(scripted_session(host, port, keys, random.Random(seed + i), latencies)
+                           for i in range(sessions)))
+    return latencies, time.perf_counter() - start
+
+
+async def measure_memory(host, port, sessions):
+    """Bytes allocated per session parked on the map"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        streams = [await enter_dungeon(host, port) for _ in range(sessions)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    for _, writer in streams:
+        writer.close()
+    return (after - before) / sessions
+
+
+async def run(args):
+    server = None
+    host, port = args.host, args.port
+    if port is None:
+        server = GameServer(color=True, seed=args.seed)
+        port = await server.start('127.0.0.1', 0)
+        host = '127.0.0.1'
+    try:
+        latencies, elapsed = await measure_latency(host, port, args.sessions, args.keys, args.seed)
+        print(f"{args.sessions} sessions, {len(latencies)} keys in {elapsed:.1f}s ({len(latencies) / elapsed:.0f} keys/s)")
+        print(f"input-to-frame latency: p50 {percentile(latencies, 0.5) * 1000:.2f} ms, "
+              f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms, mean {statistics.mean(latencies) * 1000:.2f} ms")
+        if server is not None:
+            per_session = await measure_memory(host, port, args.sessions)
+            print(f"memory per session on the map: {per_session / 1024:.1f} KiB")
+    finally:
+        if server is not None:
+            await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Telnet server load test")
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--keys', type=int, default=50, help="keys per session")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None, help="test a running server instead of an in-process one")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""Combat rules without any I/O.
+
+resolve_round() plays one round of combat on immutable snapshots of the
+player and the monster (resolve_group_round() on the player and several
+monsters) and returns their new states plus a list of events describing
+what happened. It never draws, waits, reads keys or touches the
+Player/Monster objects, so it can be called millions of times by
+simulations and bots. Game.combat_round() is the UI layer: it takes the
+snapshots, calls the resolver, plays the poses and animations for the
+events, then writes the new states back.
+
+A fight's battle log is a CombatLog: a small ring of event records that
+are only turned into text when a screen shows them.
+"""
+import logging
+import logging.handlers
+from collections import deque, namedtuple
+
+from effects import STUN_TURNS
+
+POTION_HEAL = 15  # Health Potion effect
+RUN_CHANCE = 0.5
+BATTLE_LOG_SIZE = 8  # Records a CombatLog keeps; the combat screen shows the last 3
+
+# effects is the entity's effects.StatusEffects; the resolver works on a
+# copy, so the snapshots it was given stay as they were
+PlayerState = namedtuple('PlayerState', ['hp', 'max_hp', 'mana', 'stamina', 'attack', 'defense',
+                                         'dodge_chance', 'effects', 'potions'])
+MonsterState = namedtuple('MonsterState', ['name', 'hp', 'attack', 'defense', 'effects'])
+# kind is a key of EVENT_TEXT, actor 'player' or 'monster', amount the
+# number shown in the log (or None), name the spell, skill or monster
+Event = namedtuple('Event', ['kind', 'actor', 'amount', 'name'])
+RoundResult = namedtuple('RoundResult', ['player', 'monster', 'events', 'outcome'])
+GroupResult = namedtuple('GroupResult', ['player', 'monsters', 'events', 'outcome'])
+
+
+class LogRecord(namedtuple('LogRecord', ['kind', 'actor', 'amount', 'name', 'turn'])):
+    """An Event in a CombatLog, stamped with the round it happened in"""
+    __slots__ = ()
+
+    def __str__(self):
+        return format_event(self)
+
+
+EVENT_TEXT = {
+    'hit': "You hit {name} for {amount} damage!",
+    'defeated': "You defeated the {name}!",
+    'potion': "You use a Health Potion and restore {amount} HP!",
+    'no_potion': "No health potions left!",
+    'spell_damage': "You cast {name} for {amount} damage!",
+    'spell_heal': "You cast {name} and restored {amount} HP!",
+    'no_mana': "Not enough mana!",
+    'no_stamina': "Not enough stamina!",
+    'skill_damage': "You use {name} and deal {amount} damage!",
+    'stun': "The monster is stunned!",
+    'self_heal': "You heal {amount} HP!",
+    'prepare_dodge': "You prepare to dodge the next attack!",
+    'poison': "The monster is poisoned!",
+    'skill': "You use {name}!",
+    'no_ability': "You decide not to cast a spell or use a skill.",
+    'ran': "You successfully ran away!",
+    'run_failed': "You failed to run away!",
+    'poison_tick': "The {name} takes {amount} poison damage!",
+    'poison_end': "The poison wears off!",
+    'stunned': "The {name} is stunned and cannot attack!",
+    'dodge': "You nimbly dodge the attack!",
+    'evade': "You dodge the {name}'s attack!",
+    'monster_hit': "The {name} attacks for {amount} damage!",
+    'player_defeated': "You have been defeated!",
+    'shield': "You cast {name} and gain {amount} defense!",
+    'ward': "You cast {name}; death will not take you yet!",
+    'shield_end': "Your divine protection fades!",
+    'ward_end': "Your resurrection ward fades!",
+    'revived': "You fall... and rise again with full HP!",
+    # Lines the game adds around the rounds
+    'encounter': "You encounter a {name}! ({amount[0]} HP, ATK {amount[1]}, DEF {amount[2]})",
+    'ambush': "{name} ambushes you for {amount} damage!",
+    'exp': "Gained {amount} experience points!",
+    'level_up': "Level up! You are now level {amount}!",
+    'text': "{name}",
+}
+
+
+def format_event(event):
+    """Return the battle log line for an event"""
+    return EVENT_TEXT[event.kind].format(amount=event.amount, name=event.name)
+
+
+class CombatLog:
+    """Bounded battle log of structured records.
+
+    Keeps the last `size` records of a fight in a ring and formats them
+    only when asked: indexing, slicing (log[-3:]) and iteration give
+    lines of text, like the plain list of lines it replaces. With a
+    history logger (see history_logger()) every record is also written
+    out in full.
+    """
+
+    def __init__(self, size=BATTLE_LOG_SIZE, history=None):
+        self.records = deque(maxlen=size)
+        self.turn = 0  # Round number stamped on new records
+        self.history = history
+
+    def append(self, entry):
+        """Add an Event, or a line of text"""
+        if isinstance(entry, str):
+            entry = Event('text', None, None, entry)
+        record = LogRecord(entry.kind, entry.actor, entry.amount, entry.name, self.turn)
+        self.records.append(record)
+        if self.history is not None:
+            self.history.info("turn %d %s %s: %s", record.turn, record.kind, record.actor, record)
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [str(record) for record in list(self.records)[index]]
+        return str(self.records[index])
+
+    def __iter__(self):
+        return (str(record) for record in self.records)
+
+
+def add_events(log, events):
+    """Add events to a battle log: a CombatLog keeps the records, a plain list gets the lines"""
+    if isinstance(log, CombatLog):
+        log.extend(events)
+    else:
+        log.extend(format_event(event) for event in events)
+
+
+def history_logger(path, max_bytes=1_000_000, backups=3):
+    """A logger writing every fight's full history to a rotating file.
+
+    Replaces the file of an earlier call.
+    """
+    logger = logging.getLogger('asciigame.combat')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for old in logger.handlers[:]:
+        logger.removeHandler(old)
+        old.close()
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    logger.addHandler(handler)
+    return logger
+
+
+def player_state(player):
+    """Snapshot the combat-relevant state of a Player"""
+    return PlayerState(player.hp, player.max_hp, player.mana, player.stamina, player.attack, player.defense,
+                       getattr(player, 'dodge_chance', 0.0), player.effects, player.get_potion_count('Health Potion'))
+
+
+def monster_state(monster):
+    """Snapshot the combat-relevant state of a Monster"""
+    return MonsterState(monster.name, monster.hp, monster.attack, monster.defense, monster.effects)
+
+
+def apply_player_state(player, state):
+    """Write a resolved PlayerState back to the Player, using up drunk potions"""
+    player.hp, player.mana, player.stamina, player.effects = state.hp, state.mana, state.stamina, state.effects
+    for _ in range(player.get_potion_count('Health Potion') - state.potions):
+        for item in player.inventory:
+            if item.name == 'Health Potion' and item.item_type == 'potion' and item.quantity > 0:
+                player.remove_from_inventory(item)
+                break
+
+
+def apply_monster_state(monster, state):
+    """Write a resolved MonsterState back to the Monster"""
+    monster.hp, monster.effects = state.hp, state.effects
+
+
+def _player_takes(player, damage, defense):
+    # Player.take_damage applies defense again on top of the attack's own
+    # defense reduction
+    return player._replace(hp=max(0, player.hp - max(1, damage - defense)))
+
+
+def resolve_round(player, monster, action, rng, ability=None):
+    """Resolve one round of combat.
+
+    player and monster are PlayerState/MonsterState snapshots; action is
+    'a' (attack), 'h' (health potion), 'x' (spell or skill) or 'r' (run).
+    For 'x', ability is the chosen ('spell' | 'skill', data) pair from the
+    player's learned spells/skills, or None if the choice was cancelled.
+    rng only needs a random() method.
+
+    Returns RoundResult(player, monster, events, outcome) where outcome
+    is True (monster defeated), False (player defeated), 'run' or None
+    like Game.combat_round.
+    """
+    result = resolve_group_round(player, (monster,), 0, action, rng, ability)
+    return RoundResult(result.player, result.monsters[0], result.events, result.outcome)
+
+
+def resolve_group_round(player, monsters, target, action, rng, ability=None):
+    """Resolve one round of a fight against one or more monsters.
+
+    monsters is the fight's initiative queue of MonsterStates. The player
+    acts first, on monsters[target] (area spells hit every monster still
+    standing), then each living monster takes its turn in queue order.
+    Arguments are otherwise those of resolve_round().
+
+    Returns GroupResult(player, monsters, events, outcome) where outcome
+    is True once every monster is defeated, False (player defeated), 'run'
+    or None.
+    """
+    events = []
+
+    def emit(kind, actor='player', amount=None, name=None):
+        events.append(Event(kind, actor, amount, name))
+
+    player_effects = player.effects.copy()
+    player = player._replace(effects=player_effects)
+    monsters = [monster._replace(effects=monster.effects.copy()) for monster in monsters]
+    monster = monsters[target]
+
+    def strike(monster, damage):
+        monster = monster._replace(hp=max(0, monster.hp - damage))
+        if monster.hp <= 0:
+            emit('defeated', name=monster.name)
+        return monster
+
+    # Player's turn
+    player = player_effects.tick(player, lambda kind, amount=None: emit(kind, 'player', amount))
+    if action == 'a':
+        damage = max(1, player.attack - monster.defense)
+        emit('hit', amount=damage, name=monster.name)
+        monster = strike(monster, damage)
+    elif action == 'h':
+        if player.potions > 0:
+            player = player._replace(hp=min(player.max_hp, player.hp + POTION_HEAL), potions=player.potions - 1)
+            emit('potion', amount=POTION_HEAL)
+        else:
+            emit('no_potion')
+    elif action == 'x':
+        if ability is None:
+            emit('no_ability')
+        elif ability[0] == 'spell':
+            data = ability[1]
+            if player.mana >= data['mana_cost']:
+                player = player._replace(mana=player.mana - data['mana_cost'])
+                if 'damage' in data:
+                    emit('spell_damage', amount=data['damage'], name=data['name'])
+                    if data.get('area'):
+                        monsters = [strike(other, data['damage']) if other.hp > 0 else other for other in monsters]
+                        monster = monsters[target]
+                    else:
+                        monster = strike(monster, data['damage'])
+                elif 'heal' in data:
+                    player = player._replace(hp=min(player.max_hp, player.hp + data['heal']))
+                    emit('spell_heal', amount=data['heal'], name=data['name'])
+                elif data.get('effect') == 'shield':
+                    # The player's turn has already ticked, so this round is
+                    # the first of the spell's duration
+                    player_effects.add('shield', data['defense'], data['duration'] - 1)
+                    emit('shield', amount=data['defense'], name=data['name'])
+                elif data.get('effect') == 'revive':
+                    player_effects.add('revive', duration=data['duration'] - 1)
+                    emit('ward', name=data['name'])
+            else:
+                emit('no_mana')
+        else:
+            data = ability[1]
+            if 'stamina_cost' in data:
+                if player.stamina < data['stamina_cost']:
+                    emit('no_stamina')
+                    return GroupResult(player, monsters, events, None)
+                player = player._replace(stamina=player.stamina - data['stamina_cost'])
+            damage = data.get('damage', 0)
+            if damage:
+                emit('skill_damage', amount=damage, name=data['name'])
+                monster = strike(monster, damage)
+            if data.get('stun'):
+                monster.effects.add('stun', duration=STUN_TURNS)
+                emit('stun')
+            if 'self_heal' in data:
+                player = player._replace(hp=min(player.max_hp, player.hp + data['self_heal']))
+                emit('self_heal', amount=data['self_heal'])
+            if data.get('dodge'):
+                player_effects.add('evade')
+                emit('prepare_dodge')
+            if 'poison' in data:
+                monster.effects.add('poison', data['poison'], data['poison'])
+                emit('poison')
+            if damage == 0 and not any(key in data for key in ['stun', 'self_heal', 'dodge', 'poison']):
+                emit('skill', name=data['name'])
+    elif action == 'r':
+        if rng.random() < RUN_CHANCE:
+            emit('ran')
+            return GroupResult(player, monsters, events, 'run')
+        emit('run_failed')
+    monsters[target] = monster
+
+    # The monsters' turns
+    for i, monster in enumerate(monsters):
+        if monster.hp <= 0:
+            continue
+        name, effects = monster.name, monster.effects
+        # Poison and other effects on the monster act first
+        monster = effects.tick(monster, lambda kind, amount=None: emit(kind, 'monster', amount, name))
+        if monster.hp <= 0:
+            emit('defeated', 'monster', name=name)
+        elif effects.has('stun'):
+            emit('stunned', 'monster', name=name)
+            effects.remove('stun')
+        elif player.dodge_chance > 0 and rng.random() < player.dodge_chance:
+            # A passive dodge ends the monster's turn
+            emit('dodge', 'monster', name=name)
+        elif player_effects.has('evade'):
+            emit('evade', 'monster', name=name)
+            player_effects.remove('evade')
+        else:
+            damage = max(1, monster.attack - player.defense - player_effects.magnitude('shield'))
+            player = _player_takes(player, damage, player.defense)
+            emit('monster_hit', 'monster', damage, name)
+        monsters[i] = monster
+
+        if player.hp <= 0 and player_effects.has('revive'):
+            player_effects.remove('revive')
+            player = player._replace(hp=player.max_hp)
+            emit('revived', 'monster')
+        if player.hp <= 0:
+            emit('player_defeated', 'monster')
+            return GroupResult(player, monsters, events, False)
+    if all(monster.hp <= 0 for monster in monsters):
+        return GroupResult(player, monsters, events, True)
+    return GroupResult(player, monsters, events, None)
@@ -0,0 +1,371 @@
+"""Monte Carlo combat simulator for balancing monsters against classes.
+
+Replays the rules of Game.combat_round for one player against one monster,
+millions of times at once. Every fight of a batch is a row in a set of
+NumPy arrays and each combat round is a handful of masked array updates,
+so the cost per round is independent of the number of fights.
+
+Rules reproduced from Game.combat_round / Player.take_damage:
+  - player hits deal max(1, ATK - DEF); monster hits deal
+    max(1, max(1, ATK - DEF) - DEF) because take_damage applies the
+    player's defense a second time
+  - spells are paid from mana, skills from stamina; a damaging spell or
+    attack that kills the monster ends the fight before its turn
+  - poison hits the monster at the start of its turn and decays by 1 per
+    round; a monster killed by poison doesn't get that round's attack
+  - a stunned monster loses one attack
+  - the rogue's passive dodge is rolled before a prepared Evasion dodge
+  - running away succeeds half the time
+
+NumPy is optional: without it the same rules run one fight at a time in
+pure Python, which is fine for checks but slow for millions of fights.
+
+    python combat_sim.py --fights 1000000 --classes warrior mage --levels 1 3 5
+"""
+import argparse
+import random
+import time
+
+from entities import Player, Monster
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MONSTER_TYPES = ['goblin', 'orc', 'troll', 'dragon']
+CLASSES = ['warrior', 'mage', 'rogue', 'cleric']
+POLICIES = {
+    'attack': "always attack",
+    'ability': "strongest affordable damaging spell or skill, else attack",
+    'careful': "heal (potion, then heal spell) below 40% HP, else as ability",
+}
+HEAL_THRESHOLD = 0.4
+POTION_HEAL = 15  # Health Potion effect
+RUN_CHANCE = 0.5
+
+# Outcomes
+ONGOING, WON, LOST, FLED, STALEMATE = range(5)
+OUTCOME_NAMES = {WON: 'won', LOST: 'lost', FLED: 'fled', STALEMATE: 'stalemate'}
+
+# Actions: anything from FIRST_ABILITY up is an index into the player's abilities
+ATTACK, POTION, RUN, FIRST_ABILITY = range(4)
+
+
+class Ability:
+    """One learned spell or skill, flattened to the numbers combat uses"""
+
+    def __init__(self, key, data, is_spell):
+        self.key = key
+        self.is_spell = is_spell
+        self.cost = data.get('mana_cost', 0) if is_spell else data.get('stamina_cost', 0)
+        self.damage = data.get('damage', 0)
+        self.heal = data.get('heal', 0) if is_spell else data.get('self_heal', 0)
+        self.stun = bool(data.get('stun'))
+        self.dodge = bool(data.get('dodge'))
+        self.poison = data.get('poison', 0)
+
+
+class Fighter:
+    """Starting stats of the player side of a scenario"""
+
+    def __init__(self, player_class, level=1, potions=0):
+        player = Player(0, 0, player_class)
+        while player.level < level:
+            player.level_up()
+        self.player_class = player_class
+        self.level = level
+        self.max_hp = player.max_hp
+        self.mana = player.mana
+        self.stamina = player.stamina
+        self.attack = player.attack
+        self.defense = player.defense
+        self.dodge_chance = player.dodge_chance
+        self.potions = potions
+        if player.is_caster():
+            learned = player.get_learned_spells()
+        else:
+            learned = player.get_learned_skills()
+        self.abilities = [Ability(key, data, player.is_caster()) for key, data in learned.items()]
+
+
+def monster_stats(monster_type):
+    monster = Monster(0, 0, monster_type)
+    return monster.hp, monster.attack, monster.defense
+
+
+def _monster_hit(fighter, monster_attack):
+    return max(1, max(1, monster_attack - fighter.defense) - fighter.defense)
+
+
+def choose_action(fighter, policy, hp, mana, stamina, potions):
+    """Pick the action one fight takes this round (pure-Python path)"""
+    if policy == 'careful' and hp < fighter.max_hp * HEAL_THRESHOLD:
+        if potions > 0:
+            return POTION
+        for i, ability in enumerate(fighter.abilities):
+            if ability.is_spell and ability.heal and not ability.damage and mana >= ability.cost:
+                return FIRST_ABILITY + i
+    if policy in ('ability', 'careful'):
+        best = None
+        for i, ability in enumerate(fighter.abilities):
+            pool = mana if ability.is_spell else stamina
+            if ability.damage > fighter.attack and pool >= ability.cost:
+                if best is None or ability.damage > fighter.abilities[best].damage:
+                    best = i
+        if best is not None:
+            return FIRST_ABILITY + best
+    return ATTACK
+
+
+def fight_once(fighter, monster_type, policy='attack', rng=random, ambush=False, max_rounds=200):
+    """Resolve one fight and return (outcome, hp_lost, rounds)"""
+    monster_hp, monster_attack, monster_defense = monster_stats(monster_type)
+    hit = _monster_hit(fighter, monster_attack)
+    hp, mana, stamina, potions = fighter.max_hp, fighter.mana, fighter.stamina, fighter.potions
+    poison, stunned, dodging = 0, False, False
+    if ambush:
+        hp = max(0, hp - hit)
+        if hp <= 0:
+            return LOST, fighter.max_hp, 0
+    for rounds in range(1, max_rounds + 1):
+        action = choose_action(fighter, policy, hp, mana, stamina, potions)
+        monster_acts = True
+        if action == ATTACK:
+            monster_hp -= max(1, fighter.attack - monster_defense)
+        elif action == POTION:
+            if potions:
+                potions -= 1
+                hp = min(fighter.max_hp, hp + POTION_HEAL)
+        elif action == RUN:
+            if rng.random() < RUN_CHANCE:
+                return FLED, fighter.max_hp - hp, rounds
+        else:
+            ability = fighter.abilities[action - FIRST_ABILITY]
+            if ability.is_spell:
+                if mana >= ability.cost:
+                    mana -= ability.cost
+                    monster_hp -= ability.damage
+                    if not ability.damage:
+                        hp = min(fighter.max_hp, hp + ability.heal)
+            elif stamina < ability.cost:
+                monster_acts = False  # "Not enough stamina!" ends the round
+            else:
+                stamina -= ability.cost
+                monster_hp -= ability.damage
+                stunned = stunned or ability.stun
+                hp = min(fighter.max_hp, hp + ability.heal)
+                dodging = dodging or ability.dodge
+                if ability.poison:
+                    poison = ability.poison
+        if monster_hp <= 0:
+            return WON, fighter.max_hp - hp, rounds
+        if not monster_acts:
+            continue
+        if poison > 0:
+            monster_hp -= poison
+            poison -= 1
+            if monster_hp <= 0:
+                return WON, fighter.max_hp - hp, rounds
+        if stunned:
+            stunned = False
+        elif fighter.dodge_chance > 0 and rng.random() < fighter.dodge_chance:
+            pass
+        elif dodging:
+            dodging = False
+        else:
+            hp = max(0, hp - hit)
+        if hp <= 0:
+            return LOST, fighter.max_hp, rounds
+        if monster_hp <= 0:
+            return WON, fighter.max_hp - hp, rounds
+    return STALEMATE, fighter.max_hp - hp, max_rounds
+
+
+def _choose_actions(fighter, policy, hp, mana, stamina, potions):
+    """Vectorised choose_action(): one action per fight"""
+    action = np.full(hp.shape, ATTACK, dtype=np.int16)
+    if policy in ('ability', 'careful'):
+        # Weakest first, so the strongest affordable ability is written last
+        ranked = sorted(enumerate(fighter.abilities), key=lambda item: item[1].damage)
+        for i, ability in ranked:
+            if ability.damage > fighter.attack:
+                pool = mana if ability.is_spell else stamina
+                action[pool >= ability.cost] = FIRST_ABILITY + i
+    if policy == 'careful':
+        hurt = hp < fighter.max_hp * HEAL_THRESHOLD
+        for i, ability in reversed(list(enumerate(fighter.abilities))):
+            if ability.is_spell and ability.heal and not ability.damage:
+                action[hurt & (mana >= ability.cost)] = FIRST_ABILITY + i
+        action[hurt & (potions > 0)] = POTION
+    return action
+
+
+def fight_batch(fighter, monster_type, policy='attack', fights=100000, rng=None, ambush=False, max_rounds=200):
+    """Resolve many fights at once; return (outcome, hp_lost, rounds) arrays"""
+    rng = rng if rng is not None else np.random.default_rng()
+    monster_hp_start, monster_attack, monster_defense = monster_stats(monster_type)
+    hit = _monster_hit(fighter, monster_attack)
+    attack_damage = max(1, fighter.attack - monster_defense)
+
+    hp = np.full(fights, fighter.max_hp, dtype=np.int32)
+    mana = np.full(fights, fighter.mana, dtype=np.int32)
+    stamina = np.full(fights, fighter.stamina, dtype=np.int32)
+    potions = np.full(fights, fighter.potions, dtype=np.int32)
+    monster_hp = np.full(fights, monster_hp_start, dtype=np.int32)
+    poison = np.zeros(fights, dtype=np.int32)
+    stunned = np.zeros(fights, dtype=bool)
+    dodging = np.zeros(fights, dtype=bool)
+    outcome = np.full(fights, ONGOING, dtype=np.int8)
+    rounds = np.zeros(fights, dtype=np.int32)
+
+    if ambush:
+        hp -= hit
+        np.maximum(hp, 0, out=hp)
+        outcome[hp <= 0] = LOST
+
+    for _ in range(max_rounds):
+        active = outcome == ONGOING
+        if not active.any():
+            break
+        rounds[active] += 1
+        action = _choose_actions(fighter, policy, hp, mana, stamina, potions)
+        monster_acts = active.copy()
+
+        # Player's turn
+        monster_hp[active & (action == ATTACK)] -= attack_damage
+        drink = active & (action == POTION) & (potions > 0)
+        potions[drink] -= 1
+        hp[drink] = np.minimum(hp[drink] + POTION_HEAL, fighter.max_hp)
+        running = active & (action == RUN)
+        fled = running & (rng.random(fights) < RUN_CHANCE)
+        outcome[fled] = FLED
+        monster_acts &= ~fled
+        for i, ability in enumerate(fighter.abilities):
+            use = active & (action == FIRST_ABILITY + i)
+            if not use.any():
+                continue
+            pool = mana if ability.is_spell else stamina
+            paid = use & (pool >= ability.cost)
+            pool[paid] -= ability.cost
+            if not ability.is_spell:
+                monster_acts &= ~(use & ~paid)
+            monster_hp[paid] -= ability.damage
+            if ability.heal and (not ability.is_spell or not ability.damage):
+                hp[paid] = np.minimum(hp[paid] + ability.heal, fighter.max_hp)
+            if ability.stun:
+                stunned |= paid
+            if ability.dodge:
+                dodging |= paid
+            if ability.poison:
+                poison[paid] = ability.poison
+        killed = active & (monster_hp <= 0)
+        outcome[killed] = WON
+        monster_acts &= ~killed
+
+        # Monster's turn
+        poisoned = monster_acts & (poison > 0)
+        monster_hp[poisoned] -= poison[poisoned]
+        poison[poisoned] -= 1
+        poisoned_to_death = monster_acts & (monster_hp <= 0)
+        outcome[poisoned_to_death] = WON
+        monster_acts &= ~poisoned_to_death
+        strikes = monster_acts & ~stunned
+        stunned[monster_acts] = False
+        if fighter.dodge_chance > 0:
+            strikes &= ~(rng.random(fights) < fighter.dodge_chance)
+        dodged = strikes & dodging
+        dodging[dodged] = False
+        strikes &= ~dodged
+        hp[strikes] -= hit
+        np.maximum(hp, 0, out=hp)
+        lost = monster_acts & (hp <= 0)
+        outcome[lost] = LOST
+        outcome[monster_acts & ~lost & (monster_hp <= 0)] = WON
+
+    outcome[outcome == ONGOING] = STALEMATE
+    return outcome, fighter.max_hp - hp, rounds
+
+
+def evaluate(player_class, level, monster_type, policy='attack', fights=100000, seed=None,
+             potions=0, ambush=False, batch_size=1 << 18):
+    """Simulate fights for one scenario and return its summary as a dict.
+
+    win_rate / loss_rate / flee_rate are fractions of all fights,
+    mean_hp_lost is over all fights and mean_rounds_to_kill over wins.
+    """
+    fighter = Fighter(player_class, level, potions)
+    wins = losses = flees = hp_lost = kill_rounds = 0
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        for start in range(0, fights, batch_size):
+            outcome, lost_hp, rounds = fight_batch(fighter, monster_type, policy, min(batch_size, fights - start),
+                                                   rng, ambush)
+            won = outcome == WON
+            wins += int(won.sum())
+            losses += int((outcome == LOST).sum())
+            flees += int((outcome == FLED).sum())
+            hp_lost += int(lost_hp.sum())
+            kill_rounds += int(rounds[won].sum())
+    else:
+        rng = random.Random(seed)
+        for _ in range(fights):
+            outcome, lost_hp, rounds = fight_once(fighter, monster_type, policy, rng, ambush)
+            wins += outcome == WON
+            losses += outcome == LOST
+            flees += outcome == FLED
+            hp_lost += lost_hp
+            kill_rounds += rounds if outcome == WON else 0
+    return {
+        'class': player_class,
+        'level': level,
+        'monster': monster_type,
+        'policy': policy,
+        'fights': fights,
+        'win_rate': wins / fights,
+        'loss_rate': losses / fights,
+        'flee_rate': flees / fights,
+        'mean_hp_lost': hp_lost / fights,
+        'mean_rounds_to_kill': kill_rounds / wins if wins else None,
+    }
+
+
+def format_table(rows):
+    lines = [f"{'class':<8} {'lvl':>3} {'monster':<7} {'policy':<8} {'win%':>6} {'lose%':>6} {'hp lost':>8} {'rounds':>7}"]
+    for row in rows:
+        rounds = f"{row['mean_rounds_to_kill']:.2f}" if row['mean_rounds_to_kill'] is not None else '-'
+        lines.append(f"{row['class']:<8} {row['level']:>3} {row['monster']:<7} {row['policy']:<8} "
+                     f"{row['win_rate'] * 100:>6.1f} {row['loss_rate'] * 100:>6.1f} {row['mean_hp_lost']:>8.2f} {rounds:>7}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo combat balance table")
+    parser.add_argument('--fights', type=int, default=100000, help="fights per scenario")
+    parser.add_argument('--classes', nargs='+', default=CLASSES, choices=CLASSES)
+    parser.add_argument('--levels', nargs='+', type=int, default=[1, 3, 5])
+    parser.add_argument('--monsters', nargs='+', default=MONSTER_TYPES, choices=MONSTER_TYPES)
+    parser.add_argument('--policies', nargs='+', default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument('--potions', type=int, default=0, help="health potions carried into each fight")
+    parser.add_argument('--ambush', action='store_true', help="monster strikes first, as when it walks into you")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+    if np is None:
+        print("NumPy is not installed; running fights one at a time in pure Python")
+
+    rows = []
+    start = time.perf_counter()
+    for player_class in args.classes:
+        for level in args.levels:
+            for monster_type in args.monsters:
+                for policy in args.policies:
+                    rows.append(evaluate(player_class, level, monster_type, policy, args.fights, args.seed,
+                                         args.potions, args.ambush))
+    elapsed = time.perf_counter() - start
+    print(format_table(rows))
+    total = args.fights * len(rows)
+    print(f"{total} fights in {elapsed:.1f}s ({total / elapsed:,.0f} fights/s)")
+
+
+if __name__ == "__main__":
+    main()
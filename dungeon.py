@@ -1,6 +1,34 @@
 import random
-import os
+from collections import deque
 from entities import Monster, Chest, Item
+from monsters import SPAWN_TYPES
+from terminal import get_terminal
+from explore import FrontierMap
+
+FOV_RADIUS = 8  # How far the player can see
+
+# SGR colour parameters per map character; anything missing uses the
+# terminal's default colour
+TILE_COLORS = {
+    '#': '37',     # Wall: white
+    '.': '90',     # Floor: dark grey
+    '>': '1;35',   # Stairs: bright magenta
+    '@': '1;36',   # Player: bright cyan
+    'C': '1;33',   # Chest: bright yellow
+    'c': '33',     # Opened chest: yellow
+    'g': '32',     # Goblin: green
+    'o': '1;31',   # Orc: bright red
+    't': '1;32',   # Troll: bright green
+    'D': '1;91',   # Dragon: bold light red
+}
+DIM_ATTR = '2'
+
+def sgr(attr):
+    """Return the escape sequence that resets attributes and applies attr"""
+    return f'\x1b[0;{attr}m' if attr else '\x1b[0m'
+
+DIM = sgr(DIM_ATTR)
+RESET = sgr('')
 
 class Dungeon:
     def __init__(self, width=40, height=20):
@@ -13,6 +41,12 @@ class Dungeon:
         self.chests = []  # List of chests in the dungeon
         self.stairs = None  # Position of stairs to next level
         self.level = 1
+        self.explored = bytearray()  # 1 per cell the player has ever seen (index y * width + x)
+        self.visible = bytearray()  # 1 per cell in the current field of view
+        self.visible_cells = set()  # Indices set in self.visible
+        self.fov_origin = None  # Position the current field of view was computed from
+        self.frontier = None  # FrontierMap, built the first time it is asked for
+        self.shared_rows = set()  # Rows of map shared with snapshots/forks (see set_tile)
         self.generate()
 
     def generate(self):
@@ -34,6 +68,13 @@ class Dungeon:
         # Spawn monsters and chests
         self.spawn_monsters()
         self.spawn_chests()
+        # Nothing has been seen on a fresh level
+        self.explored = bytearray(self.width * self.height)
+        self.visible = bytearray(self.width * self.height)
+        self.visible_cells = set()
+        self.fov_origin = None
+        self.frontier = None
+        self.shared_rows = set()
 
     def generate_rooms(self):
         """Generate rooms using cellular automata for more organic feel"""
@@ -150,8 +191,7 @@ class Dungeon:
                 occupied_positions.add((x, y))  # Mark as occupied
                 
                 # Choose monster type
-                monster_types = ['goblin', 'orc', 'troll']
-                monster_type = random.choice(monster_types)
+                monster_type = random.choice(SPAWN_TYPES)
                 
                 monster = Monster(x, y, monster_type)
                 self.monsters.append(monster)
@@ -226,6 +266,108 @@ class Dungeon:
         
         return True
 
+    def _is_sight_clear(self, x1, y1, x2, y2):
+        """Check that no wall stands between two cells (the end cell itself may be a wall)"""
+        dx = abs(x2 - x1)
+        dy = -abs(y2 - y1)
+        x_inc = 1 if x2 > x1 else -1
+        y_inc = 1 if y2 > y1 else -1
+        error = dx + dy
+        x, y = x1, y1
+        while (x, y) != (x2, y2):
+            if (x, y) != (x1, y1) and self.map[y][x] == '#':
+                return False
+            e2 = 2 * error
+            if e2 >= dy:
+                error += dy
+                x += x_inc
+            if e2 <= dx:
+                error += dx
+                y += y_inc
+        return True
+
+    def compute_fov(self, x, y, radius=FOV_RADIUS):
+        """Return the set of cell indices visible from (x, y)"""
+        cells = set()
+        radius_sq = radius * radius
+        for ty in range(max(0, y - radius), min(self.height, y + radius + 1)):
+            for tx in range(max(0, x - radius), min(self.width, x + radius + 1)):
+                if (tx - x) ** 2 + (ty - y) ** 2 <= radius_sq and self._is_sight_clear(x, y, tx, ty):
+                    cells.add(ty * self.width + tx)
+        return cells
+
+    def update_fov(self, x, y, radius=FOV_RADIUS):
+        """Move the field of view to (x, y).
+
+        Only cells whose visibility changed are written to the visible and
+        explored masks. Returns the set of changed cell indices.
+        """
+        if self.fov_origin == (x, y):
+            return set()
+        new_cells = self.compute_fov(x, y, radius)
+        hidden = self.visible_cells - new_cells
+        revealed = new_cells - self.visible_cells
+        for i in hidden:
+            self.visible[i] = 0
+        newly_explored = []
+        for i in revealed:
+            self.visible[i] = 1
+            if not self.explored[i]:
+                self.explored[i] = 1
+                newly_explored.append(i)
+        if self.frontier is not None and newly_explored:
+            self.frontier.reveal(newly_explored)
+        self.visible_cells = new_cells
+        self.fov_origin = (x, y)
+        return hidden | revealed
+
+    def is_visible(self, x, y):
+        """Check if a cell is in the player's current field of view"""
+        return bool(self.visible[y * self.width + x])
+
+    def is_explored(self, x, y):
+        """Check if the player has ever seen a cell"""
+        return bool(self.explored[y * self.width + x])
+
+    def visible_monsters(self):
+        """Return the living monsters in the player's current field of view"""
+        return [m for m in self.monsters if m.is_alive() and self.visible[m.y * self.width + m.x]]
+
+    def get_frontier_map(self):
+        """Return the auto-explore distance map, building it on first use"""
+        if self.frontier is None:
+            self.frontier = FrontierMap(self)
+        return self.frontier
+
+    def find_path(self, start, goal):
+        """Return the shortest list of steps from start to goal, or None.
+
+        Only explored, non-wall cells are walked through, so the player never
+        paths through places they haven't seen. The goal itself is included
+        as the last step and the start is not.
+        """
+        width = self.width
+        start_i = start[1] * width + start[0]
+        goal_i = goal[1] * width + goal[0]
+        parent = {start_i: None}
+        frontier = deque([start_i])
+        while frontier:
+            i = frontier.popleft()
+            if i == goal_i:
+                path = []
+                while i != start_i:
+                    path.append((i % width, i // width))
+                    i = parent[i]
+                return path[::-1]
+            x, y = i % width, i // width
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                n = ny * width + nx
+                if (n not in parent and 0 <= nx < width and 0 <= ny < self.height and
+                        self.explored[n] and self.map[ny][nx] != '#'):
+                    parent[n] = i
+                    frontier.append(n)
+        return None
+
     def get_monster_at(self, x, y):
         """Get monster at specific coordinates"""
         for monster in self.monsters:
@@ -240,6 +382,17 @@ class Dungeon:
                 return chest
         return None
 
+    def set_tile(self, x, y, tile):
+        """Change a map tile once the level is built.
+
+        Snapshots and forks share the rows of map, so a shared row is
+        copied before its first write.
+        """
+        if y in self.shared_rows:
+            self.map[y] = self.map[y][:]
+            self.shared_rows.discard(y)
+        self.map[y][x] = tile
+
     def is_stairs_at(self, x, y):
         """Check if stairs are at specific coordinates"""
         return self.stairs and (x, y) == self.stairs
@@ -257,34 +410,78 @@ class Dungeon:
         self.stairs = None
         self.generate()
 
-    def render(self, player_pos=None, visible=None, player=None):
-        # Clear screen using Windows-compatible method
-        os.system('cls')
+    def render_lines(self, player_pos=None, visible=None, player=None, color=False):
+        """Return the dungeon view as a list of text lines.
+
+        Unexplored cells are blank, remembered cells are dimmed and only
+        cells in view show monsters and chests. The field of view follows
+        player_pos unless visible gives an explicit set of (x, y) cells.
+        With color, tiles and entities get TILE_COLORS. Neighbouring cells
+        with the same attributes share one escape sequence, so a row costs
+        one sequence per run rather than one per cell.
+        """
+        if player_pos:
+            self.update_fov(*player_pos)
+        if visible is not None:
+            visible_mask = bytearray(self.width * self.height)
+            for x, y in visible:
+                visible_mask[y * self.width + x] = 1
+        else:
+            visible_mask = self.visible
         
         # Create a display map that includes monsters and chests
         display_map = [row[:] for row in self.map]
         
         # Add monsters to display map
         for monster in self.monsters:
-            if monster.is_alive():
+            if monster.is_alive() and visible_mask[monster.y * self.width + monster.x]:
                 display_map[monster.y][monster.x] = monster.char
         
         # Add chests to display map
         for chest in self.chests:
-            display_map[chest.y][chest.x] = chest.char
+            if visible_mask[chest.y * self.width + chest.x]:
+                display_map[chest.y][chest.x] = chest.char
         
-        # Render the dungeon
+        if player_pos:
+            display_map[player_pos[1]][player_pos[0]] = '@'
+        
+        lines = []
         for y in range(self.height):
-            for x in range(self.width):
-                if player_pos and (x, y) == player_pos:
-                    print('@', end='')
+            row_start = y * self.width
+            row_end = row_start + self.width
+            # Stop at the last seen cell so rows carry no trailing blanks
+            last = max(visible_mask.rfind(1, row_start, row_end), self.explored.rfind(1, row_start, row_end))
+            parts = []
+            current = ''
+            row = display_map[y]
+            for x in range(last - row_start + 1 if last >= 0 else 0):
+                tile = row[x]
+                i = row_start + x
+                if visible_mask[i]:
+                    attr = TILE_COLORS.get(tile, '') if color else ''
+                elif self.explored[i]:
+                    attr = DIM_ATTR + ';' + TILE_COLORS[tile] if color and tile in TILE_COLORS else DIM_ATTR
                 else:
-                    print(display_map[y][x], end='')
-            print()  # New line after each row
-        
-        print(f"\nLevel: {self.level}")
+                    tile = ' '
+                    attr = current  # Blank cells look the same either way
+                if attr != current:
+                    parts.append(sgr(attr))
+                    current = attr
+                parts.append(tile)
+            if current:
+                parts.append(RESET)
+            lines.append(''.join(parts))
+        lines.append("")
+        lines.append(f"Level: {self.level}")
         if player:
-            print("Controls: WASD to move, P to quit, I for inventory, X for " + ("spells" if player.is_caster() else "skills"))
+            lines.append("Controls: WASD to move, P to quit, I for inventory, X for " + ("spells" if player.is_caster() else "skills"))
         else:
-            print("Controls: WASD to move, P to quit, I for inventory, X for spells/skills")
-        print("Monsters: g=Goblin, o=Orc, t=Troll | C=Chest, >=Stairs") 
\ No newline at end of file
+            lines.append("Controls: WASD to move, P to quit, I for inventory, X for spells/skills")
+        lines.append("Monsters: g=Goblin, o=Orc, t=Troll | C=Chest, >=Stairs")
+        return lines
+
+    def render(self, player_pos=None, visible=None, player=None, terminal=None, color=False):
+        """Draw the dungeon to a terminal backend (the platform default if none is given)"""
+        if terminal is None:
+            terminal = get_terminal()
+        terminal.draw(self.render_lines(player_pos, visible, player, color))
@@ -0,0 +1,128 @@
+"""Timed status effects.
+
+Every Player and Monster carries a StatusEffects: the effects on it, each
+with a magnitude and the last of its owner's turns it lasts for. Effects
+without a duration last until the rules use them up: a stun is spent on
+the turn it stops, an evasion on the attack it dodges.
+
+The combat resolver ticks the player's effects at the start of each
+round and the monster's at the start of its turn. tick() advances the
+owner's turn counter, drops the effects that ran out (their expiry turns
+sit in a heap, so nothing is scanned to find them) and runs the tick
+handlers of the ones left, so a turn costs as much as the effects that
+are active, and next to nothing without any.
+"""
+import heapq
+
+STUN_TURNS = 1  # A stun stops the monster's next turn
+
+# Events reported when an effect runs out
+EXPIRE_EVENTS = {
+    'shield': 'shield_end',
+    'revive': 'ward_end',
+}
+
+
+def _poison(effects, state, magnitude, emit):
+    """Poison hurts for its magnitude, which then drops by one"""
+    if magnitude <= 0:
+        return state
+    state = state._replace(hp=max(0, state.hp - magnitude))
+    emit('poison_tick', magnitude)
+    if magnitude > 1:
+        effects.set_magnitude('poison', magnitude - 1)
+    else:
+        effects.remove('poison')
+        emit('poison_end')
+    return state
+
+
+# Effect name -> handler(effects, state, magnitude, emit) run on each of
+# the owner's turns; returns the owner's new combat state
+TICK_HANDLERS = {
+    'poison': _poison,
+}
+
+
+def _ignore(kind, amount=None):
+    pass
+
+
+class StatusEffects:
+    """The effects on one entity, with an expiry heap"""
+
+    __slots__ = ('turn', 'active', 'expiry')
+
+    def __init__(self, turn=0, active=None):
+        self.turn = turn  # Turns the owner has taken
+        self.active = dict(active or {})  # Effect name -> (magnitude, last turn or None)
+        self.expiry = [(last, name) for name, (_, last) in self.active.items() if last is not None]
+        heapq.heapify(self.expiry)
+
+    def add(self, name, magnitude=1, duration=None):
+        """Put on an effect for the owner's next `duration` turns, or until
+        it is used up; replaces an effect of the same name"""
+        last = None if duration is None else self.turn + duration
+        self.active[name] = (magnitude, last)
+        if last is not None:
+            heapq.heappush(self.expiry, (last, name))
+
+    def remove(self, name):
+        # Its heap entry goes stale and is skipped when it comes up
+        self.active.pop(name, None)
+
+    def has(self, name):
+        return name in self.active
+
+    def magnitude(self, name, default=0):
+        entry = self.active.get(name)
+        return entry[0] if entry is not None else default
+
+    def set_magnitude(self, name, magnitude):
+        """Change an active effect's magnitude, keeping its expiry"""
+        self.active[name] = (magnitude, self.active[name][1])
+
+    def tick(self, state=None, emit=_ignore):
+        """Start one of the owner's turns.
+
+        Drops the effects that ran out, then runs the tick handlers of
+        the rest on state, the owner's combat state. emit(kind, amount)
+        reports what happened. Returns the new state.
+        """
+        self.turn += 1
+        expiry, active = self.expiry, self.active
+        if not active:
+            expiry.clear()  # Only stale entries are left
+            return state
+        while expiry and expiry[0][0] < self.turn:
+            last, name = heapq.heappop(expiry)
+            entry = active.get(name)
+            if entry is not None and entry[1] == last:
+                del active[name]
+                if name in EXPIRE_EVENTS:
+                    emit(EXPIRE_EVENTS[name])
+        for name in [name for name in active if name in TICK_HANDLERS]:
+            state = TICK_HANDLERS[name](self, state, active[name][0], emit)
+        return state
+
+    def copy(self):
+        other = StatusEffects.__new__(StatusEffects)
+        other.turn, other.active, other.expiry = self.turn, dict(self.active), list(self.expiry)
+        return other
+
+    def state(self):
+        """Compact, immutable form: (turn, ((name, (magnitude, last)), ...))"""
+        return self.turn, tuple(self.active.items())
+
+    @classmethod
+    def from_state(cls, state):
+        turn, active = state
+        return cls(turn, dict(active))
+
+    def __eq__(self, other):
+        if not isinstance(other, StatusEffects):
+            return NotImplemented
+        return self.turn == other.turn and self.active == other.active
+
+    def __repr__(self):
+        return f"StatusEffects(turn={self.turn}, active={self.active})"
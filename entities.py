@@ -1,6 +1,69 @@
+import copyreg
 import random
+from operator import attrgetter
+from types import MappingProxyType
+
+from effects import StatusEffects, STUN_TURNS
+from monsters import MONSTER_TEMPLATES
+
+
+def _frozen(table):
+    """Read-only view of a nested dict, shared by every instance"""
+    return MappingProxyType({key: _frozen(value) if isinstance(value, dict) else value
+                             for key, value in table.items()})
+
+
+# Let copy.deepcopy() and pickle handle objects holding these tables
+copyreg.pickle(MappingProxyType, lambda proxy: (_frozen, (dict(proxy),)))
+
+NO_ABILITIES = MappingProxyType({})
+
+# Spells and skills each class learns, by level. Players reference these
+# tables instead of copying them, so a thousand sessions share one set.
+CLASS_SKILLS = _frozen({
+    'warrior': {
+        2: {'power_strike': {'name': 'Power Strike', 'damage': 8, 'stamina_cost': 5, 'description': 'A powerful attack that deals extra damage'}},
+        4: {'shield_bash': {'name': 'Shield Bash', 'damage': 6, 'stun': True, 'stamina_cost': 10, 'description': 'Bash with your shield, may stun the enemy'}},
+        6: {'battle_rage': {'name': 'Battle Rage', 'damage': 12, 'self_heal': 5, 'stamina_cost': 15, 'description': 'Enter a rage, dealing damage and healing yourself'}}
+    },
+    'rogue': {
+        2: {'backstab': {'name': 'Backstab', 'damage': 10, 'stamina_cost': 6, 'description': 'A precise strike that deals extra damage'}},
+        4: {'evasion': {'name': 'Evasion', 'dodge': True, 'stamina_cost': 4, 'description': 'Attempt to dodge the next attack'}},
+        6: {'poison_strike': {'name': 'Poison Strike', 'damage': 8, 'poison': 3, 'stamina_cost': 10, 'description': 'Strike with a poisoned weapon'}}
+    },
+})
+CLASS_SPELLS = _frozen({
+    'mage': {
+        1: {'fireball': {'name': 'Fireball', 'damage': 8, 'mana_cost': 5, 'description': 'Deals 8 damage'}},
+        3: {'lightning': {'name': 'Lightning', 'damage': 12, 'mana_cost': 10, 'description': 'Deals 12 damage'}},
+        5: {'ice_storm': {'name': 'Ice Storm', 'damage': 18, 'area': True, 'mana_cost': 15, 'description': 'Deals 18 damage to every foe'}},
+        7: {'meteor': {'name': 'Meteor', 'damage': 25, 'area': True, 'mana_cost': 25, 'description': 'Deals 25 damage to every foe'}}
+    },
+    'cleric': {
+        1: {'heal': {'name': 'Heal', 'heal': 12, 'mana_cost': 6, 'description': 'Restores 12 HP'}},
+        3: {'smite': {'name': 'Smite', 'damage': 10, 'mana_cost': 8, 'description': 'Deals 10 damage'}},
+        5: {'divine_protection': {'name': 'Divine Protection', 'effect': 'shield', 'defense': 3, 'duration': 3, 'mana_cost': 10, 'description': 'Temporary defense boost (+3 DEF for 3 rounds)'}},
+        7: {'resurrection': {'name': 'Resurrection', 'effect': 'revive', 'duration': 10, 'mana_cost': 20, 'description': 'Revive with full HP (if you fall within 10 rounds)'}}
+    },
+})
+
+# Chest contents as (char, name, effect, item_type); Items are only built
+# for what a chest actually drops. Each class has its own option list,
+# in the order the chest samples from.
+_CHEST_ITEMS = {
+    'health': ('!', 'Health Potion', MappingProxyType({'heal': 15}), 'potion'),
+    'mana': ('~', 'Mana Potion', MappingProxyType({'mana': 20}), 'potion'),
+    'sword': ('S', 'Steel Sword', MappingProxyType({'attack': 5}), 'weapon'),
+    'armor': ('A', 'Leather Armor', MappingProxyType({'defense': 2}), 'armor'),
+    'gold': ('$', 'Gold Coins', MappingProxyType({'gold': 50}), 'gold'),
+    'stamina': ('&', 'Stamina Potion', MappingProxyType({'stamina': 15}), 'potion'),
+}
+CASTER_CHEST_LOOT = tuple(_CHEST_ITEMS[key] for key in ('health', 'mana', 'sword', 'armor', 'gold'))
+FIGHTER_CHEST_LOOT = tuple(_CHEST_ITEMS[key] for key in ('health', 'sword', 'armor', 'gold', 'stamina'))
 
 class Entity:
+    __slots__ = ('x', 'y', 'char', 'name')
+
     def __init__(self, x, y, char, name):
         self.x = x
         self.y = y
@@ -8,6 +71,11 @@ class Entity:
         self.name = name
 
 class Player(Entity):
+    __slots__ = ('player_class', 'level', 'exp', 'exp_to_next', 'learned_spells', 'learned_skills',
+                 'available_spells', 'available_skills', 'effects', 'max_weight', 'max_inventory_slots',
+                 'hp', 'max_hp', 'mana', 'max_mana', 'stamina', 'max_stamina', 'attack', 'defense',
+                 'dodge_chance', 'inventory', 'potion_counts', 'equipped_weapon', 'equipped_armor')
+
     def __init__(self, x, y, player_class='warrior'):
         super().__init__(x, y, '@', 'Player')
         self.player_class = player_class
@@ -16,21 +84,22 @@ class Player(Entity):
         self.exp_to_next = 10
         self.learned_spells = set()  # Track which spells are learned
         self.learned_skills = set()  # Track which skills are learned
-        self.available_spells = {}  # Spells that can be learned
-        self.available_skills = {} # Skills that can be learned
-        self.dodging = False
+        self.available_spells = CLASS_SPELLS.get(player_class, NO_ABILITIES)  # Spells that can be learned
+        self.available_skills = CLASS_SKILLS.get(player_class, NO_ABILITIES)  # Skills that can be learned
+        self.effects = StatusEffects()  # Timed status effects (see effects.py)
         self.max_weight = 50.0  # Maximum weight capacity
         self.max_inventory_slots = 20  # Maximum number of different items
         self.setup_class_stats()
         self.hp = self.max_hp
         self.mana = self.max_mana
         self.inventory = []
+        self.potion_counts = {}  # Potion name -> total quantity, kept in step with inventory
         self.equipped_weapon = None  # Track equipped weapon
         self.equipped_armor = None   # Track equipped armor
         self.unlock_all_skills_and_spells_for_level()
 
     def setup_class_stats(self):
-        """Setup stats and spells/skills based on class"""
+        """Setup stats based on class (spells/skills come from CLASS_SPELLS/CLASS_SKILLS)"""
         if self.player_class == 'warrior':
             self.max_hp = 15
             self.max_mana = 0  # Warriors don't use mana
@@ -38,11 +107,6 @@ class Player(Entity):
             self.stamina = 20
             self.attack = 4
             self.defense = 2
-            self.available_skills = {
-                2: {'power_strike': {'name': 'Power Strike', 'damage': 8, 'stamina_cost': 5, 'description': 'A powerful attack that deals extra damage'}},
-                4: {'shield_bash': {'name': 'Shield Bash', 'damage': 6, 'stun': True, 'stamina_cost': 10, 'description': 'Bash with your shield, may stun the enemy'}},
-                6: {'battle_rage': {'name': 'Battle Rage', 'damage': 12, 'self_heal': 5, 'stamina_cost': 15, 'description': 'Enter a rage, dealing damage and healing yourself'}}
-            }
             self.dodge_chance = 0.0
         elif self.player_class == 'mage':
             self.max_hp = 8
@@ -51,12 +115,6 @@ class Player(Entity):
             self.stamina = 0
             self.attack = 2
             self.defense = 1
-            self.available_spells = {
-                1: {'fireball': {'name': 'Fireball', 'damage': 8, 'mana_cost': 5, 'description': 'Deals 8 damage'}},
-                3: {'lightning': {'name': 'Lightning', 'damage': 12, 'mana_cost': 10, 'description': 'Deals 12 damage'}},
-                5: {'ice_storm': {'name': 'Ice Storm', 'damage': 18, 'mana_cost': 15, 'description': 'Deals 18 damage'}},
-                7: {'meteor': {'name': 'Meteor', 'damage': 25, 'mana_cost': 25, 'description': 'Deals 25 damage'}}
-            }
             self.dodge_chance = 0.0
         elif self.player_class == 'rogue':
             self.max_hp = 10
@@ -65,11 +123,6 @@ class Player(Entity):
             self.stamina = 15
             self.attack = 3
             self.defense = 1
-            self.available_skills = {
-                2: {'backstab': {'name': 'Backstab', 'damage': 10, 'stamina_cost': 6, 'description': 'A precise strike that deals extra damage'}},
-                4: {'evasion': {'name': 'Evasion', 'dodge': True, 'stamina_cost': 4, 'description': 'Attempt to dodge the next attack'}},
-                6: {'poison_strike': {'name': 'Poison Strike', 'damage': 8, 'poison': 3, 'stamina_cost': 10, 'description': 'Strike with a poisoned weapon'}}
-            }
             self.dodge_chance = 0.2  # 20% passive dodge chance
         elif self.player_class == 'cleric':
             self.max_hp = 12
@@ -78,14 +131,20 @@ class Player(Entity):
             self.stamina = 0
             self.attack = 2
             self.defense = 2
-            self.available_spells = {
-                1: {'heal': {'name': 'Heal', 'heal': 12, 'mana_cost': 6, 'description': 'Restores 12 HP'}},
-                3: {'smite': {'name': 'Smite', 'damage': 10, 'mana_cost': 8, 'description': 'Deals 10 damage'}},
-                5: {'divine_protection': {'name': 'Divine Protection', 'effect': 'shield', 'mana_cost': 10, 'description': 'Temporary defense boost'}},
-                7: {'resurrection': {'name': 'Resurrection', 'effect': 'revive', 'mana_cost': 20, 'description': 'Revive with full HP'}}
-            }
             self.dodge_chance = 0.0
 
+    @property
+    def dodging(self):
+        """True while a prepared Evasion waits for the next attack"""
+        return self.effects.has('evade')
+
+    @dodging.setter
+    def dodging(self, value):
+        if value:
+            self.effects.add('evade')
+        else:
+            self.effects.remove('evade')
+
     def take_damage(self, amount):
         actual_damage = max(1, amount - self.defense)
         self.hp = max(0, self.hp - actual_damage)
@@ -156,14 +215,17 @@ class Player(Entity):
                     existing_item.effect == item.effect):
                     # Stack the items
                     existing_item.quantity += item.quantity
+                    self._count_potions(item, item.quantity)
                     return True, f"Added to stack: {item.name} (x{existing_item.quantity})"
         # If no stack found or item can't be stacked, add as new item
         self.inventory.append(item)
+        self._count_potions(item, item.quantity)
         return True, f"Added: {item.name}"
 
     def remove_from_inventory(self, item):
         """Remove an item from inventory, handling stacks"""
         if item in self.inventory:
+            self._count_potions(item, -1)
             if item.quantity > 1:
                 item.quantity -= 1
                 return True, f"Used one {item.name} (x{item.quantity} remaining)"
@@ -172,10 +234,20 @@ class Player(Entity):
                 return True, f"Used last {item.name}"
         return False, "Item not found"
 
+    def _count_potions(self, item, delta):
+        """Keep potion_counts in step with an inventory change"""
+        if item.item_type == 'potion':
+            self.potion_counts[item.name] = self.potion_counts.get(item.name, 0) + delta
+
+    def get_potion_count(self, name):
+        """Get how many potions with this name are carried"""
+        return self.potion_counts.get(name, 0)
+
     def drop_item(self, item_index):
         """Drop an item from inventory"""
         if 0 <= item_index < len(self.inventory):
             item = self.inventory[item_index]
+            self._count_potions(item, -1)
             if item.quantity > 1:
                 item.quantity -= 1
                 return True, f"Dropped one {item.name} (x{item.quantity} remaining)"
@@ -329,63 +401,76 @@ class Player(Entity):
         else:
             return f"Class: {self.player_class.title()} | HP: {self.hp}/{self.max_hp} | MP: {self.mana}/{self.max_mana} | Level: {self.level} | Exp: {self.exp}/{self.exp_to_next} | ATK: {self.attack} | DEF: {self.defense}"
 
+def _template_field(field):
+    """A Monster attribute read from its template.
+
+    Setting it gives that one monster a modified copy of the template,
+    so tests and special monsters can still tweak their stats.
+    """
+    def set_field(self, value):
+        self.template = self.template._replace(**{field: value})
+    return property(attrgetter('template.' + field), set_field)
+
+
 class Monster:
+    __slots__ = ('x', 'y', 'template', 'hp', 'effects', 'move_counter')
+
     def __init__(self, x, y, monster_type):
         self.x = x
         self.y = y
-        self.monster_type = monster_type
-        self.stunned = False
-        self.poisoned = False
-        self.poison_damage = 0
-        self.move_speed = 1
-        self.move_counter = 0
-        # Set stats based on monster type
-        if monster_type == 'goblin':
-            self.char = 'g'
-            self.name = 'Goblin'
-            self.hp = 8
-            self.max_hp = 8
-            self.attack = 3
-            self.defense = 1
-            self.speed = 1
-            self.exp_value = 5
-            self.loot_table = ['gold', 'health_potion', 'stamina_potion']
-            self.move_speed = 1
-        elif monster_type == 'orc':
-            self.char = 'o'
-            self.name = 'Orc'
-            self.hp = 15
-            self.max_hp = 15
-            self.attack = 5
-            self.defense = 2
-            self.speed = 1
-            self.exp_value = 10
-            self.loot_table = ['gold', 'health_potion', 'mana_potion', 'stamina_potion']
-            self.move_speed = 2
-        elif monster_type == 'troll':
-            self.char = 't'
-            self.name = 'Troll'
-            self.hp = 25
-            self.max_hp = 25
-            self.attack = 7
-            self.defense = 3
-            self.speed = 1
-            self.exp_value = 20
-            self.loot_table = ['gold', 'health_potion', 'mana_potion', 'stamina_potion', 'sword']
-            self.move_speed = 3
-        elif monster_type == 'dragon':
-            self.char = 'D'
-            self.name = 'Dragon'
-            self.hp = 40  # Reduced from 50
-            self.max_hp = 40  # Reduced from 50
-            self.attack = 10  # Reduced from 12
-            self.defense = 5
-            self.speed = 1
-            self.exp_value = 50
-            self.loot_table = ['gold', 'health_potion', 'mana_potion', 'stamina_potion', 'sword', 'armor']
-            self.move_speed = 1
+        self.template = MONSTER_TEMPLATES[monster_type]  # Shared stats of the type (see monsters.py)
+        self.hp = self.template.hp
+        self.effects = StatusEffects()  # Timed status effects (see effects.py)
         self.move_counter = 0
 
+    # Per-type stats live in the shared template
+    monster_type = _template_field('monster_type')
+    char = _template_field('char')
+    name = _template_field('name')
+    max_hp = _template_field('hp')
+    attack = _template_field('attack')
+    defense = _template_field('defense')
+    speed = _template_field('speed')
+    exp_value = _template_field('exp_value')
+    move_speed = _template_field('move_speed')
+    loot_table = _template_field('loot')
+    art = _template_field('art')  # Combat figure (see ascii_art.py)
+
+    @property
+    def stunned(self):
+        """True while a stun will stop the monster's next turn"""
+        return self.effects.has('stun')
+
+    @stunned.setter
+    def stunned(self, value):
+        if value:
+            self.effects.add('stun', duration=STUN_TURNS)
+        else:
+            self.effects.remove('stun')
+
+    @property
+    def poisoned(self):
+        return self.effects.has('poison')
+
+    @poisoned.setter
+    def poisoned(self, value):
+        if not value:
+            self.effects.remove('poison')
+        elif not self.poisoned:
+            self.effects.add('poison', 0)
+
+    @property
+    def poison_damage(self):
+        """Damage the poison does on the monster's next turn"""
+        return self.effects.magnitude('poison')
+
+    @poison_damage.setter
+    def poison_damage(self, value):
+        if self.poisoned:
+            self.effects.set_magnitude('poison', value)
+        elif value > 0:
+            self.effects.add('poison', value, duration=value)
+
     def should_move(self):
         return self.move_counter >= self.move_speed
 
@@ -485,6 +570,8 @@ class Monster:
         return loot
 
 class Item(Entity):
+    __slots__ = ('effect', 'item_type', 'quantity', 'weight')
+
     def __init__(self, x, y, char, name, effect=None, item_type='misc', quantity=1, weight=0.1):
         super().__init__(x, y, char, name)
         self.effect = effect
@@ -526,6 +613,8 @@ class Item(Entity):
         return f"Used {self.name}"
 
 class Chest(Entity):
+    __slots__ = ('opened', 'loot')
+
     def __init__(self, x, y):
         super().__init__(x, y, 'C', 'Treasure Chest')
         self.opened = False
@@ -533,28 +622,10 @@ class Chest(Entity):
 
     def generate_loot(self, player_class=None):
         """Generate random loot for the chest based on player class"""
-        loot_options = [
-            Item(self.x, self.y, '!', 'Health Potion', {'heal': 15}, 'potion'),
-            Item(self.x, self.y, '~', 'Mana Potion', {'mana': 20}, 'potion'),
-            Item(self.x, self.y, 'S', 'Steel Sword', {'attack': 5}, 'weapon'),
-            Item(self.x, self.y, 'A', 'Leather Armor', {'defense': 2}, 'armor'),
-            Item(self.x, self.y, '$', 'Gold Coins', {'gold': 50}, 'gold')
-        ]
-        
-        # Add stamina potions for non-casters
-        if player_class in ['warrior', 'rogue']:
-            loot_options.append(Item(self.x, self.y, '&', 'Stamina Potion', {'stamina': 15}, 'potion'))
-        
-        # Filter out mana potions for non-casters
-        if player_class in ['warrior', 'rogue']:
-            loot_options = [item for item in loot_options if item.name != 'Mana Potion']
-        
-        # Filter out stamina potions for casters
-        if player_class in ['mage', 'cleric']:
-            loot_options = [item for item in loot_options if item.name != 'Stamina Potion']
-        
+        loot_options = FIGHTER_CHEST_LOOT if player_class in ['warrior', 'rogue'] else CASTER_CHEST_LOOT
         num_items = random.randint(1, 3)
-        self.loot = random.sample(loot_options, min(num_items, len(loot_options)))
+        picks = random.sample(loot_options, min(num_items, len(loot_options)))
+        self.loot = [Item(self.x, self.y, char, name, effect, item_type) for char, name, effect, item_type in picks]
         return self.loot
 
     def open(self, player_class=None):
@@ -0,0 +1,388 @@
+"""Gym-style environments for training and evaluating automated players.
+
+DungeonEnv wraps a Game with reset(seed)/step(action) in the shape of the
+Gymnasium API (without depending on it). The game's session flow is
+driven directly: step() sends one key and runs the simulation on a
+NullTerminal until the next decision, answering title, class and
+"press any key" prompts itself.
+
+Observations are compact integer arrays in one block of memory, exposed
+as memoryviews that are updated in place by every step (wrap them with
+numpy.asarray() for free if NumPy is around):
+
+    tiles     (height, width) bytes   TILE_CODES of the explored map, in a
+                                      window centred on the player
+    entities  (height, width) bytes   ENTITY_CODES of what is in view
+    stats     (len(STATS),) int32     player and fight numbers, see STATS
+
+VecEnv steps N environments in lockstep, in this process or spread over
+worker processes that write their observations straight into shared
+memory, and resets finished episodes automatically.
+
+    python env.py --envs 16 --workers 4 --steps 20000
+"""
+import argparse
+import multiprocessing
+import random
+import time
+from array import array
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+from flow import FLUSH, SessionRandom
+from game import Game
+from terminal import NullTerminal
+
+# Keys an agent can press; an action is an index into this tuple. P (quit)
+# is left out so an agent can't end its own episode.
+ACTIONS = ('w', 'a', 's', 'd', 'f', 'q', 'o', '>', 'i', 'x', '1', '2', '3', '4')
+# Prompts that wait for the agent; everything else is answered by the env
+DECISIONS = ('map', 'combat-action', 'combat-spell', 'combat-skill', 'inventory', 'spells')
+CLASS_KEYS = {'warrior': '1', 'mage': '2', 'rogue': '3', 'cleric': '4'}
+
+VIEW = (21, 41)  # Observation window (height, width) around the player
+TILE_CODES = {'#': 1, '.': 2, '>': 3}  # 0 is unexplored or off the map
+ENTITY_CODES = {'player': 1, 'chest': 2, 'goblin': 3, 'orc': 4, 'troll': 5, 'dragon': 6}
+OTHER_MONSTER = 7  # Entity code for monster types without their own
+STATS = ('hp', 'max_hp', 'mana', 'max_mana', 'stamina', 'max_stamina', 'attack', 'defense',
+         'level', 'exp', 'depth', 'x', 'y', 'potions', 'prompt', 'opponent', 'opponent_hp')
+
+# Rewards per step: monsters killed, levels descended, and dying
+KILL_REWARD = 1.0
+DESCEND_REWARD = 10.0
+DEATH_REWARD = -10.0
+MAX_STEPS = 5000  # Episodes are truncated after this many steps
+
+Observation = namedtuple('Observation', ['tiles', 'entities', 'stats'])
+
+
+class ObservationBuffer:
+    """Observations for n environments in one block of memory.
+
+    The tiles of all environments come first, then their entities, then
+    their stats (aligned for int32). buffer can be any writable buffer of
+    at least size_for(n, view) bytes, such as shared memory; otherwise a
+    bytearray is allocated.
+    """
+
+    def __init__(self, n, view=VIEW, buffer=None):
+        self.n = n
+        self.view = view
+        height, width = view
+        self.cells = n * height * width
+        self.stats_offset = -(-2 * self.cells // 8) * 8
+        size = self.size_for(n, view)
+        self.memory = memoryview(buffer if buffer is not None else bytearray(size))[:size]
+        self._views = [self.memory]
+        self.tiles = self._view(0, self.cells, 'B', (n, height, width))
+        self.entities = self._view(self.cells, 2 * self.cells, 'B', (n, height, width))
+        self.stats = self._view(self.stats_offset, size, 'i', (n, len(STATS)))
+
+    @staticmethod
+    def size_for(n, view=VIEW):
+        cells = n * view[0] * view[1]
+        return -(-2 * cells // 8) * 8 + n * len(STATS) * 4
+
+    def _view(self, start, stop, fmt, shape=None):
+        view = self.memory[start:stop].cast(fmt, shape) if shape else self.memory[start:stop].cast(fmt)
+        self._views.append(view)
+        return view
+
+    def slot(self, i):
+        """Views of environment i: flat (tiles, entities, stats) to write
+        through, and its Observation"""
+        area = self.view[0] * self.view[1]
+        tiles, entities = i * area, self.cells + i * area
+        stats = self.stats_offset + i * len(STATS) * 4
+        stats_view = self._view(stats, stats + len(STATS) * 4, 'i')
+        return (self._view(tiles, tiles + area, 'B'), self._view(entities, entities + area, 'B'), stats_view,
+                Observation(self._view(tiles, tiles + area, 'B', self.view),
+                            self._view(entities, entities + area, 'B', self.view), stats_view))
+
+    def observation(self):
+        return Observation(self.tiles, self.entities, self.stats)
+
+    def release(self):
+        """Release every view, so the underlying buffer can be closed"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+
+
+class DungeonEnv:
+    """One game as a reset()/step() environment.
+
+    slot is where the observations go (see ObservationBuffer.slot); by
+    default the env owns its buffer. The observation returned by reset()
+    and step() is the same set of views every time.
+    """
+
+    def __init__(self, player_class='warrior', view=VIEW, max_steps=MAX_STEPS, slot=None):
+        self.player_class = player_class
+        self.view = view
+        self.max_steps = max_steps
+        if slot is None:
+            self.buffer = ObservationBuffer(1, view)
+            slot = self.buffer.slot(0)
+        self._tiles, self._entities, self._stats, self.observation = slot
+        self._blank = bytes(view[0] * view[1])
+        self.game = None
+        self.prompt = None
+        self.steps = 0
+        self.done = True
+        self._seeds = random.Random()
+        self._rng = None
+        self._flow = None
+        self._map = None
+        self._known = None
+        self._fov_origin = None
+
+    def reset(self, seed=None):
+        """Start a new game and return (observation, info).
+
+        seed fixes this and every following episode; without one the
+        episodes carry on from the previous seed.
+        """
+        if seed is not None:
+            self._seeds.seed(seed)
+        episode_seed = self._seeds.getrandbits(32)
+        self._rng = SessionRandom(episode_seed)
+        with self._rng:
+            self.game = Game(NullTerminal())
+            self.game.test_mode = True
+            self._flow = self.game.session_flow()
+            self._run(None)
+        self.steps = 0
+        self._map = None
+        self._observe()
+        return self.observation, {'seed': episode_seed, 'prompt': self.prompt}
+
+    def step(self, action):
+        """Press ACTIONS[action]; return (observation, reward, terminated, truncated, info)"""
+        if self.done:
+            raise RuntimeError("step() called on a finished episode; call reset() first")
+        game = self.game
+        kills, depth = game.kills, game.dungeon.level
+        with self._rng:
+            self._run(ACTIONS[action])
+        self.steps += 1
+        reward = KILL_REWARD * (game.kills - kills) + DESCEND_REWARD * (game.dungeon.level - depth)
+        terminated = self.done
+        if terminated and game.player.hp <= 0:
+            reward += DEATH_REWARD
+        truncated = not terminated and self.steps >= self.max_steps
+        self._observe()
+        return self.observation, reward, terminated, truncated, {'prompt': self.prompt}
+
+    def _run(self, reply):
+        """Send reply to the flow, then answer requests that need no
+        decision until the agent is asked for a key"""
+        try:
+            while True:
+                request = self._flow.send(reply)
+                if isinstance(request, str):
+                    if request in DECISIONS:
+                        self.prompt = request
+                        self.done = False
+                        return
+                    reply = CLASS_KEYS[self.player_class] if request == 'class' else ' '
+                elif callable(request) or request is FLUSH or request is not None:
+                    reply = None  # Frames aren't drawn and timed waits end at once
+                else:
+                    reply = ' '
+        except StopIteration:
+            self.prompt = None
+            self.done = True
+
+    def _observe(self):
+        """Write the current state into the observation views"""
+        game, dungeon, player = self.game, self.game.dungeon, self.game.player
+        width = dungeon.width
+        if dungeon.map is not self._map:
+            # New level: nothing of it is known yet
+            self._map = dungeon.map
+            self._known = bytearray(width * dungeon.height)
+            self._fov_origin = None
+        if dungeon.fov_origin != self._fov_origin:
+            known, rows = self._known, dungeon.map
+            for index in dungeon.visible_cells:
+                known[index] = TILE_CODES.get(rows[index // width][index % width], 0)
+            self._fov_origin = dungeon.fov_origin
+
+        height, view_width = self.view
+        top, left = player.y - height // 2, player.x - view_width // 2
+        tiles = self._tiles
+        tiles[:] = self._blank
+        lo, hi = max(0, left), min(width, left + view_width)
+        if lo < hi:
+            for row in range(max(0, -top), min(height, dungeon.height - top)):
+                start = (top + row) * width
+                tiles[row * view_width + lo - left:row * view_width + hi - left] = self._known[start + lo:start + hi]
+
+        entities = self._entities
+        entities[:] = self._blank
+        visible = dungeon.visible
+
+        def place(x, y, code):
+            if 0 <= y - top < height and 0 <= x - left < view_width and visible[y * width + x]:
+                entities[(y - top) * view_width + x - left] = code
+
+        for chest in dungeon.chests:
+            place(chest.x, chest.y, ENTITY_CODES['chest'])
+        for monster in dungeon.monsters:
+            if monster.is_alive():
+                place(monster.x, monster.y, ENTITY_CODES.get(monster.monster_type, OTHER_MONSTER))
+        entities[(player.y - top) * view_width + player.x - left] = ENTITY_CODES['player']
+
+        opponent = game.opponent
+        self._stats[:] = array('i', (
+            player.hp, player.max_hp, player.mana, player.max_mana, player.stamina, player.max_stamina,
+            player.attack, player.defense, player.level, player.exp, dungeon.level, player.x, player.y,
+            player.get_potion_count('Health Potion'),
+            DECISIONS.index(self.prompt) + 1 if self.prompt else 0,
+            ENTITY_CODES.get(opponent.monster_type, OTHER_MONSTER) if opponent else 0,
+            opponent.hp if opponent else 0,
+        ))
+
+
+def _step_envs(envs, actions):
+    """Step envs in lockstep, resetting finished ones; return per-env results"""
+    results = []
+    for env, action in zip(envs, actions):
+        _, reward, terminated, truncated, info = env.step(action)
+        if terminated or truncated:
+            info['final_stats'] = tuple(env.observation.stats)
+            _, reset_info = env.reset()
+            info['seed'] = reset_info['seed']
+        results.append((reward, terminated, truncated, info))
+    return results
+
+
+def _worker(conn, memory_name, num_envs, first, last, player_class, view, max_steps):
+    """Run envs first..last-1 of a VecEnv, writing observations to shared memory"""
+    memory = shared_memory.SharedMemory(name=memory_name)
+    buffer = ObservationBuffer(num_envs, view, memory.buf)
+    envs = [DungeonEnv(player_class, view, max_steps, buffer.slot(i)) for i in range(first, last)]
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == 'reset':
+                conn.send([env.reset(seed)[1] for env, seed in zip(envs, data)])
+            elif command == 'step':
+                conn.send(_step_envs(envs, data))
+            else:
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        buffer.release()
+        memory.close()
+
+
+class VecEnv:
+    """N DungeonEnvs stepped in lockstep.
+
+    With workers=0 every env runs in this process; otherwise the envs are
+    split over that many worker processes, which write observations into
+    shared memory. Either way observation is an Observation of views with
+    a leading env axis: tiles and entities (n, height, width), stats
+    (n, len(STATS)). Finished episodes are reset straight away; their
+    info holds the last stats as 'final_stats'.
+    """
+
+    def __init__(self, num_envs, player_class='warrior', workers=0, view=VIEW, max_steps=MAX_STEPS):
+        self.num_envs = num_envs
+        self.view = view
+        self.envs = []
+        self.pipes = []
+        self.processes = []
+        self.memory = None
+        if workers:
+            self.memory = shared_memory.SharedMemory(create=True, size=ObservationBuffer.size_for(num_envs, view))
+            self.buffer = ObservationBuffer(num_envs, view, self.memory.buf)
+            workers = min(workers, num_envs)
+            bounds = [num_envs * i // workers for i in range(workers + 1)]
+            for first, last in zip(bounds, bounds[1:]):
+                parent, child = multiprocessing.Pipe()
+                process = multiprocessing.Process(
+                    target=_worker, daemon=True,
+                    args=(child, self.memory.name, num_envs, first, last, player_class, view, max_steps))
+                process.start()
+                child.close()
+                self.pipes.append((parent, first, last))
+                self.processes.append(process)
+        else:
+            self.buffer = ObservationBuffer(num_envs, view)
+            self.envs = [DungeonEnv(player_class, view, max_steps, self.buffer.slot(i)) for i in range(num_envs)]
+        self.observation = self.buffer.observation()
+
+    def reset(self, seed=None):
+        """Reset every env (env i gets seed + i); return (observation, infos)"""
+        seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        if self.pipes:
+            for conn, first, last in self.pipes:
+                conn.send(('reset', seeds[first:last]))
+            infos = [info for conn, _, _ in self.pipes for info in conn.recv()]
+        else:
+            infos = [env.reset(s)[1] for env, s in zip(self.envs, seeds)]
+        return self.observation, infos
+
+    def step(self, actions):
+        """Step every env; return (observation, rewards, terminated, truncated, infos)"""
+        if self.pipes:
+            for conn, first, last in self.pipes:
+                conn.send(('step', list(actions[first:last])))
+            results = [result for conn, _, _ in self.pipes for result in conn.recv()]
+        else:
+            results = _step_envs(self.envs, actions)
+        rewards, terminated, truncated, infos = zip(*results)
+        return self.observation, list(rewards), list(terminated), list(truncated), list(infos)
+
+    def close(self):
+        for conn, _, _ in self.pipes:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join()
+        self.pipes, self.processes = [], []
+        if self.memory is not None:
+            self.observation = None
+            self.buffer.release()
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Step random agents through vectorised dungeon environments")
+    parser.add_argument('--envs', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=0, help="worker processes (0 runs every env here)")
+    parser.add_argument('--steps', type=int, default=10000, help="steps per env")
+    parser.add_argument('--class', dest='player_class', default='warrior', choices=sorted(CLASS_KEYS))
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    agent = random.Random(args.seed)
+    with VecEnv(args.envs, args.player_class, args.workers) as envs:
+        envs.reset(args.seed)
+        episodes = 0
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            _, _, terminated, truncated, _ = envs.step([agent.randrange(len(ACTIONS)) for _ in range(args.envs)])
+            episodes += sum(terminated) + sum(truncated)
+        elapsed = time.perf_counter() - start
+    total = args.steps * args.envs
+    print(f"{total} steps over {args.envs} envs ({args.workers} workers) in {elapsed:.2f}s: "
+          f"{total / elapsed:,.0f} steps/s, {episodes} episodes finished")
+
+
+if __name__ == "__main__":
+    main()
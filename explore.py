@@ -0,0 +1,134 @@
+import heapq
+from collections import deque
+
+UNREACHED = 1 << 30  # Distance of cells with no frontier in reach
+
+
+class FrontierMap:
+    """Distance from every explored cell to the nearest unexplored one.
+
+    The frontier is every explored, walkable cell with an unexplored
+    neighbour, and dist[i] is the walking distance from cell i to the
+    nearest frontier cell (one multi-source BFS). Walking downhill on it
+    always heads for the closest unexplored area.
+
+    Dungeon.update_fov() passes newly explored cells to reveal(), which
+    repairs the map around them: new frontier cells lower distances
+    outward, and cells that only led to frontier cells that disappeared
+    are invalidated and refilled from their neighbours. Nothing outside
+    the affected area is touched.
+    """
+
+    def __init__(self, dungeon):
+        self.dungeon = dungeon
+        self.width = dungeon.width
+        self.height = dungeon.height
+        self.dist = []
+        self.sources = set()
+        self.rebuild()
+
+    def copy(self, dungeon):
+        """A copy of this map for a fork of its dungeon"""
+        frontier = FrontierMap.__new__(FrontierMap)
+        frontier.dungeon = dungeon
+        frontier.width, frontier.height = self.width, self.height
+        frontier.dist = self.dist[:]
+        frontier.sources = set(self.sources)
+        return frontier
+
+    def _neighbours(self, i):
+        x, y = i % self.width, i // self.width
+        if x > 0:
+            yield i - 1
+        if x < self.width - 1:
+            yield i + 1
+        if y > 0:
+            yield i - self.width
+        if y < self.height - 1:
+            yield i + self.width
+
+    def _walkable(self, i):
+        # Stairs end the level, so exploring never walks over them
+        return self.dungeon.explored[i] and self.dungeon.map[i // self.width][i % self.width] not in '#>'
+
+    def _is_frontier(self, i):
+        if not self._walkable(i):
+            return False
+        explored = self.dungeon.explored
+        return any(not explored[n] for n in self._neighbours(i))
+
+    def rebuild(self):
+        """Recompute the whole map with a multi-source BFS"""
+        size = self.width * self.height
+        self.dist = [UNREACHED] * size
+        self.sources = {i for i in range(size) if self._is_frontier(i)}
+        queue = deque(self.sources)
+        for i in self.sources:
+            self.dist[i] = 0
+        while queue:
+            i = queue.popleft()
+            d = self.dist[i] + 1
+            for n in self._neighbours(i):
+                if d < self.dist[n] and self._walkable(n):
+                    self.dist[n] = d
+                    queue.append(n)
+
+    def reveal(self, cells):
+        """Update the map for cells that have just been explored"""
+        dist = self.dist
+        touched = set(cells)
+        for i in cells:
+            touched.update(self._neighbours(i))
+        added = {i for i in touched if i not in self.sources and self._is_frontier(i)}
+        removed = {i for i in touched if i in self.sources and not self._is_frontier(i)}
+        self.sources = (self.sources - removed) | added
+
+        # Raise: invalidate cells whose only downhill path went through a
+        # removed source. Levels are processed in order, so a cell's
+        # downhill neighbours are all settled before it is checked.
+        invalid = set(removed)
+        queue = deque(removed)
+        while queue:
+            i = queue.popleft()
+            for n in self._neighbours(i):
+                if n in invalid or dist[n] != dist[i] + 1:
+                    continue
+                if any(dist[m] == dist[n] - 1 and m not in invalid for m in self._neighbours(n)):
+                    continue
+                invalid.add(n)
+                queue.append(n)
+        for i in invalid:
+            dist[i] = UNREACHED
+
+        # Lower: seed new sources, newly walkable cells and invalidated
+        # cells from their settled neighbours, then relax outward
+        heap = [(0, i) for i in added]
+        for i in added:
+            dist[i] = 0
+        for i in invalid | {i for i in cells if self._walkable(i)}:
+            if not self._walkable(i):
+                continue
+            best = min((dist[n] for n in self._neighbours(i) if self._walkable(n)), default=UNREACHED)
+            if best + 1 < dist[i]:
+                dist[i] = best + 1
+                heap.append((best + 1, i))
+        heapq.heapify(heap)
+        while heap:
+            d, i = heapq.heappop(heap)
+            if d > dist[i]:
+                continue
+            for n in self._neighbours(i):
+                if d + 1 < dist[n] and self._walkable(n):
+                    dist[n] = d + 1
+                    heapq.heappush(heap, (d + 1, n))
+
+    def next_step(self, x, y):
+        """Return the (dx, dy) step downhill from (x, y), or None if nothing is left"""
+        i = y * self.width + x
+        best = self.dist[i]
+        step = None
+        for n in self._neighbours(i):
+            if self.dist[n] < best and self._walkable(n):
+                best = self.dist[n]
+                step = (n % self.width - x, n // self.width - y)
+        return step
@@ -0,0 +1,173 @@
+import asyncio
+import contextlib
+import functools
+import random
+
+from input_source import TerminalInput
+
+# A flow is a generator for one screen or game state. Whenever it needs
+# something from outside it yields a request and gets the answer sent back:
+#
+#   KEY (None)   wait for the next key; the key is sent back
+#   a string     the same, naming the prompt (see input_source.PROMPTS)
+#   a number     wait at most that many seconds; the key or None is sent back
+#   FLUSH        discard keys that are already waiting
+#   a callable   show the frame it returns (a list of lines)
+#
+# Sub-screens are entered with `yield from`, so a whole game session is one
+# flow. run_flow() answers requests directly and blocks like the old nested
+# read loops; run_flow_async() answers them on an asyncio loop so many
+# sessions can share one process. Keys come from an InputSource either way.
+KEY = None
+FLUSH = object()
+
+
+def run_flow(flow, terminal, keys=None):
+    """Drive a flow to completion and return its result.
+
+    Frames are drawn on terminal and keys read from the InputSource keys,
+    which defaults to the terminal's own keyboard.
+    """
+    if keys is None:
+        keys = TerminalInput(terminal)
+    try:
+        request = next(flow)
+        while True:
+            reply = None
+            if callable(request):
+                if not terminal.discards_output:
+                    terminal.draw(request())
+            elif request is FLUSH:
+                keys.flush()
+            elif request is None or isinstance(request, str):
+                reply = keys.read_key(None, request)
+            else:
+                reply = keys.read_key(request)
+            request = flow.send(reply)
+    except StopIteration as stop:
+        return stop.value
+
+
+def blocking(method):
+    """Turn a flow method into a plain method that runs it with run_flow().
+
+    Frames go to self.terminal and keys come from self.input when the
+    object has one.
+    """
+    @functools.wraps(method)
+    def run(self, *args, **kwargs):
+        return run_flow(method(self, *args, **kwargs), self.terminal, getattr(self, 'input', None))
+    run.__name__ = _strip_flow(method.__name__)
+    run.__qualname__ = _strip_flow(method.__qualname__)
+    return run
+
+
+def _strip_flow(name):
+    return name[:-len('_flow')] if name.endswith('_flow') else name
+
+
+class SessionRandom:
+    """A private state for the random module, for one of many sessions.
+
+    The game draws from the module-level random functions. Sessions
+    sharing a process only interleave while a flow waits for a key, so
+    entering this context swaps the session's state in and leaving it
+    swaps it back out. Each session then replays the same way for a seed,
+    whatever the other sessions do. state, a random.getstate() tuple,
+    resumes a captured state instead of seeding.
+    """
+
+    def __init__(self, seed=None, state=None):
+        self.state = state if state is not None else random.Random(seed).getstate()
+        self._outer = None
+
+    def __enter__(self):
+        self._outer = random.getstate()
+        random.setstate(self.state)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.state = random.getstate()
+        random.setstate(self._outer)
+        return False
+
+
+async def run_flow_async(flow, keys, pacer, rng=None):
+    """Drive a flow on the asyncio loop with keys from an InputSource.
+
+    Frame requests go to pacer, which draws them from its own task. With
+    a QueueInput a burst of queued keys is simulated in one go and only
+    the last frame is drawn. With a SessionRandom as rng, the flow runs
+    on its own random state.
+    """
+    scope = rng if rng is not None else contextlib.nullcontext()
+    try:
+        with scope:
+            request = next(flow)
+        while True:
+            reply = None
+            if callable(request):
+                pacer.request(request)
+            elif request is FLUSH:
+                keys.flush()
+            elif request is None or isinstance(request, str):
+                reply = await keys.next_key(None, request)
+            else:
+                reply = await keys.next_key(request)
+            with scope:
+                request = flow.send(reply)
+    except StopIteration as stop:
+        return stop.value
+
+
+class FramePacer:
+    """Terminal wrapper that coalesces frame requests.
+
+    request() only remembers the newest frame; run() draws it once the
+    simulation gives the event loop a turn. Anything else written to the
+    terminal keeps the screen consistent: a draw() replaces the pending
+    frame, while append() and write_at() draw it first so they land on
+    top of it.
+    """
+
+    def __init__(self, terminal):
+        self.terminal = terminal
+        self.pending = None
+        self.frames_requested = 0
+        self._ready = asyncio.Event()
+
+    def __getattr__(self, name):
+        return getattr(self.terminal, name)
+
+    def request(self, render):
+        self.pending = render
+        self.frames_requested += 1
+        self._ready.set()
+
+    def flush(self):
+        """Draw the pending frame now, if there is one"""
+        render, self.pending = self.pending, None
+        if render is not None and not self.terminal.discards_output:
+            self.terminal.draw(render())
+
+    async def run(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            self.flush()
+
+    def draw(self, lines):
+        self.pending = None
+        self.terminal.draw(lines)
+
+    def append(self, lines):
+        self.flush()
+        self.terminal.append(lines)
+
+    def write_at(self, row, col, text):
+        self.flush()
+        self.terminal.write_at(row, col, text)
+
+    def write(self, text):
+        self.flush()
+        self.terminal.write(text)
@@ -1,47 +1,115 @@
-import sys
-import msvcrt
-import time
-import os
+import asyncio
+import itertools
+import random
+from functools import lru_cache
+import combat
 from dungeon import Dungeon
 from entities import Player, Item
-from ascii_art import get_title_screen, get_game_over_screen, get_combat_art, get_animation_frames
+from ascii_art import get_title_screen, get_game_over_screen, get_combat_art_lines, get_animation_frames
+from terminal import get_terminal, ESCAPE, SEQUENCE_STARTS, ends_sequence
+from animation import AnimationPlayer
+from flow import FLUSH, blocking, run_flow, run_flow_async, FramePacer
+from input_source import TerminalInput, QueueInput, pump_keys
+
+COMBAT_HEADER = (
+    "=" * 80,
+    "                                    COMBAT",
+    "=" * 80,
+    "",
+)
+# Spell/skill animations play in a column between the two fighters
+ANIMATION_COLUMN = 36
+ANIMATION_WIDTH = 10
+POSE_FPS = 2  # Attack/hurt poses are held for half a second
+# Shift+direction runs until something interesting happens
+RUN_KEYS = {'W': (0, -1), 'A': (-1, 0), 'S': (0, 1), 'D': (1, 0)}
+TRAVEL_KEY = '>'  # Walk to the stairs once they have been seen
+EXPLORE_KEY = 'o'  # Walk toward the nearest unexplored area
+
+@lru_cache(maxsize=None)
+def compose_combat_panel(monster_type, player_pose='idle', monster_pose='idle'):
+    """Return the player and monster art side by side as a tuple of lines.
+
+    The result only depends on its arguments, so each combination is
+    composed once and reused for every later redraw.
+    """
+    player_lines = get_combat_art_lines('player', player_pose)
+    monster_lines = get_combat_art_lines(monster_type, monster_pose)
+    
+    # Art lines are pre-padded to one width, so a fixed gap lines the
+    # monster up at column 41
+    width = len(player_lines[0]) if player_lines else 0
+    blank = ' ' * width
+    gap = ' ' * (max(40, width) - width + 1)
+    
+    # Display them side by side with more spacing
+    max_lines = max(len(player_lines), len(monster_lines))
+    panel = []
+    for i in range(max_lines):
+        player_line = player_lines[i] if i < len(player_lines) else blank
+        monster_line = monster_lines[i] if i < len(monster_lines) else ""
+        panel.append(player_line + gap + monster_line)
+    return tuple(panel)
+
+@lru_cache(maxsize=None)
+def compose_animation_panel(monster_type, frame_count=0):
+    """Return the attack/hurt art with an empty animation column between them"""
+    player_lines = get_combat_art_lines('player', 'attack')
+    monster_lines = get_combat_art_lines(monster_type, 'hurt')
+    max_lines = max(len(player_lines), len(monster_lines), frame_count)
+    panel = []
+    for i in range(max_lines):
+        player_line = player_lines[i] if i < len(player_lines) else ""
+        monster_line = monster_lines[i] if i < len(monster_lines) else ""
+        panel.append(f"{player_line:<{ANIMATION_COLUMN - 1}} {'':{ANIMATION_WIDTH}} {monster_line}")
+    return tuple(panel)
 
 class Game:
-    def __init__(self):
-        self.dungeon = Dungeon()
+    def __init__(self, terminal=None, color=True, input_source=None, dungeon=None):
+        self.terminal = terminal or get_terminal()
+        self.input = input_source or TerminalInput(self.terminal)  # Every key the game reads comes from here
+        self.color = color  # Draw the map in colour
+        self.animator = AnimationPlayer(self.terminal)
+        self.dungeon = dungeon or Dungeon()
         self.player = None  # Will be set after class selection
         self.is_running = True
         self.test_mode = False  # Flag to disable interactive prompts during tests
         self.last_move = (0, 0)  # Track last movement direction (dx, dy)
+        self.turns = 0  # Player turns taken on the map
+        self.kills = 0  # Monsters defeated
+        self.opponent = None  # Monster being fought, while a fight is on
+        self.foes = []  # Every monster still standing in the fight, in initiative order
+        self.combat_history = None  # Logger for full fight histories (combat.history_logger)
 
-    def show_class_selection(self):
+    def show_class_selection_flow(self):
         """Show class selection menu"""
-        os.system('cls')
-        print("=" * 60)
-        print("                           CHOOSE YOUR CLASS")
-        print("=" * 60)
-        print()
-        print("Choose your class:")
-        print("1. Warrior")
-        print("   HP: 15, MP: 10, ATK: 4, DEF: 2")
-        print("   Skills: Power Strike (L2), Shield Bash (L4), Battle Rage (L6)")
-        print()
-        print("2. Mage")
-        print("   HP: 8, MP: 25, ATK: 2, DEF: 1")
-        print("   Spells: Fireball (L1), Lightning (L3), Ice Storm (L5), Meteor (L7)")
-        print()
-        print("3. Rogue")
-        print("   HP: 10, MP: 15, ATK: 3, DEF: 1")
-        print("   Skills: Backstab (L2), Evasion (L4), Poison Strike (L6)")
-        print()
-        print("4. Cleric")
-        print("   HP: 12, MP: 20, ATK: 2, DEF: 2")
-        print("   Spells: Heal (L1), Smite (L3), Divine Protection (L5), Resurrection (L7)")
-        print()
-        print("Press 1-4 to select your class, or P to quit...")
+        self.terminal.draw([
+            "=" * 60,
+            "                           CHOOSE YOUR CLASS",
+            "=" * 60,
+            "",
+            "Choose your class:",
+            "1. Warrior",
+            "   HP: 15, MP: 10, ATK: 4, DEF: 2",
+            "   Skills: Power Strike (L2), Shield Bash (L4), Battle Rage (L6)",
+            "",
+            "2. Mage",
+            "   HP: 8, MP: 25, ATK: 2, DEF: 1",
+            "   Spells: Fireball (L1), Lightning (L3), Ice Storm (L5), Meteor (L7)",
+            "",
+            "3. Rogue",
+            "   HP: 10, MP: 15, ATK: 3, DEF: 1",
+            "   Skills: Backstab (L2), Evasion (L4), Poison Strike (L6)",
+            "",
+            "4. Cleric",
+            "   HP: 12, MP: 20, ATK: 2, DEF: 2",
+            "   Spells: Heal (L1), Smite (L3), Divine Protection (L5), Resurrection (L7)",
+            "",
+            "Press 1-4 to select your class, or P to quit...",
+        ])
         
         while True:
-            key = msvcrt.getch().decode('utf-8').lower()
+            key = (yield 'class').lower()
             if key == 'p':
                 self.is_running = False
                 break
@@ -58,35 +126,97 @@ class Game:
                 self.player = Player(1, 1, 'cleric')
                 break
 
-    def show_title_screen(self):
-        os.system('cls')
-        print(get_title_screen())
-        print("Press any key to start...")
-        msvcrt.getch()
+    show_class_selection = blocking(show_class_selection_flow)
 
-    def show_game_over(self):
-        os.system('cls')
-        print(get_game_over_screen())
-        time.sleep(2)
+    def show_title_screen_flow(self):
+        self.terminal.draw(get_title_screen().split('\n') + ["Press any key to start..."])
+        yield 'title'
 
-    def run(self):
-        self.show_title_screen()
-        self.show_class_selection()
+    show_title_screen = blocking(show_title_screen_flow)
+
+    def show_game_over_flow(self):
+        self.terminal.draw(get_game_over_screen().split('\n'))
+        yield from self.animator.hold_flow(2)
+
+    show_game_over = blocking(show_game_over_flow)
+
+    def session_flow(self):
+        """The whole game as one flow: title, class selection, then the map loop"""
+        yield from self.show_title_screen_flow()
+        yield from self.show_class_selection_flow()
         if self.player is None:  # Fallback in case class selection fails
             self.player = Player(1, 1, 'warrior')
         while self.is_running:
-            self.dungeon.render(player_pos=(self.player.x, self.player.y), player=self.player)
-            self.display_player_status()
-            self.handle_input()
+            # Field of view is part of the simulation, so tiles passed while
+            # redraws are being coalesced are still remembered
+            self.dungeon.update_fov(self.player.x, self.player.y)
+            yield self.get_map_lines
+            yield from self.handle_input_flow()
+
+    def get_map_lines(self):
+        """Return the dungeon view with the status lines under it"""
+        return (self.dungeon.render_lines(player_pos=(self.player.x, self.player.y), player=self.player, color=self.color) +
+                self.get_player_status_lines())
+
+    def run(self):
+        with self.terminal:
+            try:
+                run_flow(self.session_flow(), self.terminal, self.input)
+            except EOFError:
+                # Input closed (end of a piped or scripted session)
+                self.is_running = False
+
+    async def run_async(self, keys=None, rng=None):
+        """Run the game on the asyncio event loop.
+
+        Keys come from the asyncio.Queue given as keys, otherwise from
+        self.input; a realtime input is read by a background task. Map
+        redraws are handed to a render task that only draws the newest
+        frame, so the simulation never waits on the screen and several
+        sessions can share one loop. Give each such session its own
+        flow.SessionRandom as rng.
+        """
+        terminal = self.terminal
+        pacer = FramePacer(terminal)
+        self.terminal = self.animator.terminal = pacer
+        tasks = [asyncio.create_task(pacer.run())]
+        if keys is not None:
+            source = QueueInput(keys, flush=terminal.realtime)
+        elif self.input.realtime:
+            source = QueueInput(asyncio.Queue())
+            tasks.append(asyncio.create_task(pump_keys(self.input, source.queue)))
+        else:
+            source = self.input
+        try:
+            with terminal:
+                try:
+                    await run_flow_async(self.session_flow(), source, pacer, rng)
+                except EOFError:
+                    self.is_running = False
+                pacer.flush()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.terminal = self.animator.terminal = terminal
+
+    def get_player_status_lines(self):
+        """Return the status lines shown under the dungeon map"""
+        if self.player is None:
+            return []
+        return [
+            "",
+            self.player.get_status(),
+            f"Position: ({self.player.x}, {self.player.y})",
+            f"Inventory: {len(self.player.inventory)} items",
+        ]
 
     def display_player_status(self):
         if self.player is None:
             return
-        print(f"\n{self.player.get_status()}")
-        print(f"Position: ({self.player.x}, {self.player.y})")
-        print(f"Inventory: {len(self.player.inventory)} items")
+        self.terminal.append(self.get_player_status_lines())
 
-    def show_inventory(self):
+    def show_inventory_flow(self):
         """Display and manage inventory with WASD/F/Q list selection"""
         if self.player is None:
             return
@@ -94,15 +224,16 @@ class Game:
         selected = 0
         mode = 'normal'  # 'normal' or 'drop'
         while True:
-            os.system('cls')
-            print("=" * 60)
-            print("                              INVENTORY")
-            print("=" * 60)
+            lines = [
+                "=" * 60,
+                "                              INVENTORY",
+                "=" * 60,
+            ]
             current_weight = self.player.get_inventory_weight()
-            print(f"Weight: {current_weight:.1f}/{self.player.max_weight} | Slots: {len(self.player.inventory)}/{self.player.max_inventory_slots}")
-            print("-" * 60)
+            lines.append(f"Weight: {current_weight:.1f}/{self.player.max_weight} | Slots: {len(self.player.inventory)}/{self.player.max_inventory_slots}")
+            lines.append("-" * 60)
             if not self.player.inventory:
-                print("\nYour inventory is empty!")
+                lines += ["", "Your inventory is empty!"]
             else:
                 for i, item in enumerate(self.player.inventory):
                     arrow = '→' if i == selected else ' '
@@ -111,23 +242,24 @@ class Game:
                         equipped_marker = " [EQUIPPED]"
                     quantity_text = f" (x{item.quantity})" if item.quantity > 1 else ""
                     weight_text = f" [{item.get_total_weight():.1f}kg]"
-                    print(f"{arrow} {item.name} ({item.char}){quantity_text}{weight_text}{equipped_marker}")
+                    lines.append(f"{arrow} {item.name} ({item.char}){quantity_text}{weight_text}{equipped_marker}")
                     if item.effect:
                         if item.item_type == 'potion':
                             if 'heal' in item.effect:
-                                print(f"   Restores {item.effect['heal']} HP")
+                                lines.append(f"   Restores {item.effect['heal']} HP")
                             elif 'mana' in item.effect:
-                                print(f"   Restores {item.effect['mana']} MP")
+                                lines.append(f"   Restores {item.effect['mana']} MP")
                         elif item.item_type == 'weapon':
-                            print(f"   Attack: +{item.effect['attack']}")
+                            lines.append(f"   Attack: +{item.effect['attack']}")
                         elif item.item_type == 'armor':
-                            print(f"   Defense: +{item.effect['defense']}")
+                            lines.append(f"   Defense: +{item.effect['defense']}")
                         elif item.item_type == 'gold':
-                            print(f"   Value: {item.effect['gold']} gold")
-                    print()
-            print("\nControls:")
-            print("W/S: Move  F: " + ("Drop" if mode == 'drop' else "Use/Equip") + "  D: Drop mode  Q: Return  P: Quit")
-            key = msvcrt.getch().decode('utf-8').lower()
+                            lines.append(f"   Value: {item.effect['gold']} gold")
+                    lines.append("")
+            lines += ["", "Controls:"]
+            lines.append("W/S: Move  F: " + ("Drop" if mode == 'drop' else "Use/Equip") + "  D: Drop mode  Q: Return  P: Quit")
+            self.terminal.draw(lines)
+            key = (yield 'inventory').lower()
             if key == 'p':
                 self.is_running = False
                 break
@@ -142,87 +274,83 @@ class Game:
             elif key == 'f' and self.player.inventory:
                 if mode == 'drop':
                     success, message = self.player.drop_item(selected)
-                    print(f"\n{message}")
-                    print("Press any key to continue...")
-                    msvcrt.getch()
+                    self.terminal.append(["", message, "Press any key to continue..."])
+                    yield 'message'
                     if selected >= len(self.player.inventory):
                         selected = max(0, len(self.player.inventory) - 1)
                     mode = 'normal'
                 else:
                     result = self.player.use_item_from_inventory(selected)
-                    print(f"\n{result}")
-                    print("Press any key to continue...")
-                    msvcrt.getch()
+                    self.terminal.append(["", result, "Press any key to continue..."])
+                    yield 'message'
                     if selected >= len(self.player.inventory):
                         selected = max(0, len(self.player.inventory) - 1)
 
-    def show_spells(self):
+    show_inventory = blocking(show_inventory_flow)
+
+    def show_spells_flow(self):
         """Display and cast spells (for casters) or skills (for non-casters)"""
         if self.player is None:
             return
             
-        os.system('cls')
-        print("=" * 60)
+        lines = ["=" * 60]
         if self.player.is_caster():
-            print("                                SPELLS")
-            print("=" * 60)
+            lines += ["                                SPELLS", "=" * 60]
             
             learned_spells = self.player.get_learned_spells()
             if not learned_spells:
-                print("\nYou haven't learned any spells yet!")
-                print("Spells are unlocked as you level up.")
+                lines += ["", "You haven't learned any spells yet!", "Spells are unlocked as you level up."]
             else:
                 for spell_key, spell_data in learned_spells.items():
                     can_cast = self.player.mana >= spell_data['mana_cost']
                     status = "✓" if can_cast else "✗"
-                    print(f"{spell_key.upper()}: {spell_data['name']} ({spell_data['mana_cost']} MP) {status}")
-                    print(f"   {spell_data['description']}")
-                    print()
+                    lines.append(f"{spell_key.upper()}: {spell_data['name']} ({spell_data['mana_cost']} MP) {status}")
+                    lines.append(f"   {spell_data['description']}")
+                    lines.append("")
             
             # Show upcoming spells
-            print("Upcoming spells:")
+            lines.append("Upcoming spells:")
             for level, level_spells in self.player.available_spells.items():
                 if level > self.player.level:
                     for spell_key, spell_data in level_spells.items():
-                        print(f"   Level {level}: {spell_data['name']} - {spell_data['description']}")
+                        lines.append(f"   Level {level}: {spell_data['name']} - {spell_data['description']}")
         else:
-            print("                                SKILLS")
-            print("=" * 60)
+            lines += ["                                SKILLS", "=" * 60]
             
             learned_skills = self.player.get_learned_skills()
             if not learned_skills:
-                print("\nYou haven't learned any skills yet!")
-                print("Skills are unlocked as you level up.")
+                lines += ["", "You haven't learned any skills yet!", "Skills are unlocked as you level up."]
             else:
                 for skill_key, skill_data in learned_skills.items():
-                    print(f"{skill_key.upper()}: {skill_data['name']}")
-                    print(f"   {skill_data['description']}")
-                    print()
+                    lines.append(f"{skill_key.upper()}: {skill_data['name']}")
+                    lines.append(f"   {skill_data['description']}")
+                    lines.append("")
             
             # Show upcoming skills
-            print("Upcoming skills:")
+            lines.append("Upcoming skills:")
             for level, level_skills in self.player.available_skills.items():
                 if level > self.player.level:
                     for skill_key, skill_data in level_skills.items():
-                        print(f"   Level {level}: {skill_data['name']} - {skill_data['description']}")
+                        lines.append(f"   Level {level}: {skill_data['name']} - {skill_data['description']}")
         
-        print("\nControls:")
+        lines += ["", "Controls:"]
         if self.player.is_caster():
             learned_spells = self.player.get_learned_spells()
             if learned_spells:
                 spell_keys = list(learned_spells.keys())
                 for spell_key in spell_keys:
-                    print(f"{spell_key.upper()}: Cast {learned_spells[spell_key]['name']}")
+                    lines.append(f"{spell_key.upper()}: Cast {learned_spells[spell_key]['name']}")
         else:
             learned_skills = self.player.get_learned_skills()
             if learned_skills:
                 skill_keys = list(learned_skills.keys())
                 for skill_key in skill_keys:
-                    print(f"{skill_key.upper()}: Use {learned_skills[skill_key]['name']}")
-        print("Q: Return  P: Quit")
+                    lines.append(f"{skill_key.upper()}: Use {learned_skills[skill_key]['name']}")
+        lines.append("Q: Return  P: Quit")
+        self.terminal.draw(lines)
         
         while True:
-            key = msvcrt.getch().decode('utf-8').lower()
+            key = (yield 'spells').lower()
             if key == 'p':
                 self.is_running = False
                 break
@@ -235,95 +363,49 @@ class Game:
                     if self.player.mana >= spell_data['mana_cost']:
                         if 'heal' in spell_data:
                             self.player.heal(spell_data['heal'])
-                            print(f"\nYou cast {spell_data['name']} and restored {spell_data['heal']} HP!")
+                            message = f"You cast {spell_data['name']} and restored {spell_data['heal']} HP!"
                         else:
-                            print(f"\nYou cast {spell_data['name']}!")
+                            message = f"You cast {spell_data['name']}!"
                     else:
-                        print("\nNot enough mana!")
-                    print("Press any key to continue...")
-                    msvcrt.getch()
+                        message = "Not enough mana!"
+                    self.terminal.append(["", message, "Press any key to continue..."])
+                    yield 'message'
                     break
             else:
                 learned_skills = self.player.get_learned_skills()
                 if key in learned_skills:
-                    print(f"\nYou prepare to use {learned_skills[key]['name']}!")
-                    print("Press any key to continue...")
-                    msvcrt.getch()
+                    self.terminal.append(["", f"You prepare to use {learned_skills[key]['name']}!", "Press any key to continue..."])
+                    yield 'message'
                     break
 
-    def show_animation(self, name, monster, log):
+    show_spells = blocking(show_spells_flow)
+
+    def show_animation_flow(self, name, monster, log):
         """Show animation within the combat screen"""
         if self.player is None:
             return
             
         frames = get_animation_frames(name)
-        for frame in frames:
-            # Clear screen and redraw combat interface with animation
-            os.system('cls')
-            
-            # Display combat interface
-            print("=" * 80)
-            print("                                    COMBAT")
-            print("=" * 80)
-            print()
-            
-            # Get monster type for art
-            monster_type = self.get_monster_type(monster)
-            
-            # Player and monster ASCII art side by side
-            player_art = get_combat_art('player', 'attack') or ''
-            monster_art = get_combat_art(monster_type, 'hurt') or ''
-            
-            player_lines = player_art.split('\n')
-            monster_lines = monster_art.split('\n')
-            
-            # Display them side by side with animation in the middle
-            max_lines = max(len(player_lines), len(monster_lines), len(frames))
-            for i in range(max_lines):
-                player_line = player_lines[i] if i < len(player_lines) else ""
-                monster_line = monster_lines[i] if i < len(monster_lines) else ""
-                animation_line = frames[i] if i < len(frames) else ""
-                
-                # Center the animation between player and monster
-                print(f"{player_line:<35} {animation_line:^10} {monster_line}")
-            
-            print()
-            print("-" * 80)
-            # Display HP and MP/SP based on class
-            if self.player.max_stamina > 0:
-                print(f"Your HP: {self.player.hp}/{self.player.max_hp} | SP: {self.player.stamina}/{self.player.max_stamina}")
-            else:
-                print(f"Your HP: {self.player.hp}/{self.player.max_hp} | MP: {self.player.mana}/{self.player.max_mana}")
-            print(f"{monster.name} HP: {monster.hp}/{monster.max_hp}")
-            
-            # Display potions in inventory
-            health_potions = 0
-            mana_potions = 0
-            stamina_potions = 0
-            for item in self.player.inventory:
-                if item.name == 'Health Potion':
-                    health_potions += item.quantity
-                elif item.name == 'Mana Potion':
-                    mana_potions += item.quantity
-                elif item.name == 'Stamina Potion':
-                    stamina_potions += item.quantity
-            
-            if health_potions > 0 or mana_potions > 0 or stamina_potions > 0:
-                potion_display = f"Potions: HP({health_potions})"
-                if mana_potions > 0:
-                    potion_display += f" MP({mana_potions})"
-                if stamina_potions > 0:
-                    potion_display += f" SP({stamina_potions})"
-                print(potion_display)
-            
-            print()
-            print("Battle Log:")
-            for entry in log[-3:]:
-                print(f"  {entry}")
-            
-            time.sleep(0.2)
+        monster_type = self.get_monster_type(monster)
+        
+        # Draw the combat interface once with an empty animation column
+        lines = list(COMBAT_HEADER)
+        lines += compose_animation_panel(monster_type, len(frames))
+        lines += ["", "-" * 80]
+        lines += self.get_combat_status_lines(monster)
+        lines += ["", "Battle Log:"]
+        for entry in log[-3:]:
+            lines.append(f"  {entry}")
+        self.terminal.draw(lines)
+        
+        # Then reveal the animation one row per frame, touching only that column
+        def reveal(row, frame):
+            return lambda: self.terminal.write_at(len(COMBAT_HEADER) + row, ANIMATION_COLUMN, f"{frame:^{ANIMATION_WIDTH}}")
+        yield from self.animator.play_flow([reveal(row, frame) for row, frame in enumerate(frames)])
+
+    show_animation = blocking(show_animation_flow)
 
-    def get_combat_spell_or_skill(self, monster=None, log=None):
+    def get_combat_spell_or_skill_flow(self, monster=None, log=None):
         """Get spell or skill selection during combat"""
         if self.player is None:
             return None
@@ -333,31 +415,30 @@ class Game:
             if not learned_spells:
                 return None
                 
-            # Redraw combat screen if provided
-            if monster is not None and log is not None:
-                self.display_combat_screen(monster, log)
-                
-            print("=" * 60)
-            print("                            CAST SPELL")
-            print("=" * 60)
-            print()
-            print(f"Your MP: {self.player.mana}/{self.player.max_mana}")
-            print()
+            lines = [
+                "=" * 60,
+                "                            CAST SPELL",
+                "=" * 60,
+                "",
+                f"Your MP: {self.player.mana}/{self.player.max_mana}",
+                "",
+            ]
             
             spell_keys = list(learned_spells.keys())
             for i, spell_key in enumerate(spell_keys):
                 spell_data = learned_spells[spell_key]
                 can_cast = self.player.mana >= spell_data['mana_cost']
                 status = "✓" if can_cast else "✗"
-                print(f"{i+1}: {spell_data['name']} ({spell_data['mana_cost']} MP) {status}")
-                print(f"   {spell_data['description']}")
-                print()
+                lines.append(f"{i+1}: {spell_data['name']} ({spell_data['mana_cost']} MP) {status}")
+                lines.append(f"   {spell_data['description']}")
+                lines.append("")
             
-            print("Controls: 1-9 = Select spell, Q = Cancel")
-            print("=" * 60)
+            lines.append("Controls: 1-9 = Select spell, Q = Cancel")
+            lines.append("=" * 60)
+            self._show_combat_menu(monster, log, lines)
             
             while True:
-                key = msvcrt.getch().decode('utf-8').lower()
+                key = (yield 'combat-spell').lower()
                 if key == 'p':
                     self.is_running = False
                     return None
@@ -373,16 +454,14 @@ class Game:
             if not learned_skills:
                 return None
                 
-            # Redraw combat screen if provided
-            if monster is not None and log is not None:
-                self.display_combat_screen(monster, log)
-                
-            print("=" * 60)
-            print("                            USE SKILL")
-            print("=" * 60)
-            print()
-            print(f"Your HP: {self.player.hp}/{self.player.max_hp} | SP: {self.player.stamina}/{self.player.max_stamina}")
-            print()
+            lines = [
+                "=" * 60,
+                "                            USE SKILL",
+                "=" * 60,
+                "",
+                f"Your HP: {self.player.hp}/{self.player.max_hp} | SP: {self.player.stamina}/{self.player.max_stamina}",
+                "",
+            ]
             
             skill_keys = list(learned_skills.keys())
             for i, skill_key in enumerate(skill_keys):
@@ -390,15 +469,16 @@ class Game:
                 can_use = self.player.stamina >= skill_data.get('stamina_cost', 0)
                 status = "✓" if can_use else "✗"
                 stamina_cost = skill_data.get('stamina_cost', 0)
-                print(f"{i+1}: {skill_data['name']} ({stamina_cost} SP) {status}")
-                print(f"   {skill_data['description']}")
-                print()
+                lines.append(f"{i+1}: {skill_data['name']} ({stamina_cost} SP) {status}")
+                lines.append(f"   {skill_data['description']}")
+                lines.append("")
             
-            print("Controls: 1-9 = Select skill, Q = Cancel")
-            print("=" * 60)
+            lines.append("Controls: 1-9 = Select skill, Q = Cancel")
+            lines.append("=" * 60)
+            self._show_combat_menu(monster, log, lines)
             
             while True:
-                key = msvcrt.getch().decode('utf-8').lower()
+                key = (yield 'combat-skill').lower()
                 if key == 'p':
                     self.is_running = False
                     return None
@@ -410,69 +490,38 @@ class Game:
                         skill_key = skill_keys[skill_index]
                         return ('skill', skill_key)
 
-    def get_monster_type(self, monster):
-        """Get monster type for ASCII art"""
-        if monster.name.lower() == 'goblin':
-            return 'goblin'
-        elif monster.name.lower() == 'orc':
-            return 'orc'
-        elif monster.name.lower() == 'troll':
-            return 'troll'
+    get_combat_spell_or_skill = blocking(get_combat_spell_or_skill_flow)
+
+    def _show_combat_menu(self, monster, log, menu_lines):
+        """Draw a combat menu, redrawing the combat screen above it if provided"""
+        if monster is not None and log is not None:
+            self.terminal.draw(self.get_combat_screen_lines(monster, log) + menu_lines)
         else:
-            return 'monster'
+            self.terminal.append(menu_lines)
 
-    def display_combat_screen(self, monster, log, player_pose='idle', monster_pose='idle'):
-        """Display the combat screen with ASCII art"""
-        if self.player is None:
-            return
-            
+    def get_monster_type(self, monster):
+        """Get monster type for ASCII art"""
+        return monster.art
 
-            
-        os.system('cls')
-        
-        # Get monster type for art
-        monster_type = self.get_monster_type(monster)
-        
-        # Display combat interface
-        print("=" * 80)
-        print("                                    COMBAT")
-        print("=" * 80)
-        print()
-        
-        # Player and monster ASCII art side by side
-        player_art = get_combat_art('player', player_pose) or ''
-        monster_art = get_combat_art(monster_type, monster_pose) or ''
-        
-        player_lines = player_art.split('\n')
-        monster_lines = monster_art.split('\n')
-        
-        # Display them side by side with more spacing
-        max_lines = max(len(player_lines), len(monster_lines))
-        for i in range(max_lines):
-            player_line = player_lines[i] if i < len(player_lines) else ""
-            monster_line = monster_lines[i] if i < len(monster_lines) else ""
-            print(f"{player_line:<40} {monster_line}")
-        
-        print()
-        print("-" * 80)
+    def get_combat_status_lines(self, monster):
+        """Return the HP, MP/SP and potion lines shown under the combat art"""
+        lines = []
         # Display HP and MP/SP based on class
         if self.player.max_stamina > 0:
-            print(f"Your HP: {self.player.hp}/{self.player.max_hp} | SP: {self.player.stamina}/{self.player.max_stamina}")
+            lines.append(f"Your HP: {self.player.hp}/{self.player.max_hp} | SP: {self.player.stamina}/{self.player.max_stamina}")
         else:
-            print(f"Your HP: {self.player.hp}/{self.player.max_hp} | MP: {self.player.mana}/{self.player.max_mana}")
-        print(f"{monster.name} HP: {monster.hp}/{monster.max_hp}")
+            lines.append(f"Your HP: {self.player.hp}/{self.player.max_hp} | MP: {self.player.mana}/{self.player.max_mana}")
+        if len(self.foes) > 1:
+            for foe in self.foes:
+                marker = '>' if foe is monster else ' '
+                lines.append(f"{marker} {foe.name} HP: {foe.hp}/{foe.max_hp}")
+        else:
+            lines.append(f"{monster.name} HP: {monster.hp}/{monster.max_hp}")
         
         # Display potions in inventory
-        health_potions = 0
-        mana_potions = 0
-        stamina_potions = 0
-        for item in self.player.inventory:
-            if item.name == 'Health Potion':
-                health_potions += item.quantity
-            elif item.name == 'Mana Potion':
-                mana_potions += item.quantity
-            elif item.name == 'Stamina Potion':
-                stamina_potions += item.quantity
+        health_potions = self.player.get_potion_count('Health Potion')
+        mana_potions = self.player.get_potion_count('Mana Potion')
+        stamina_potions = self.player.get_potion_count('Stamina Potion')
         
         if health_potions > 0 or mana_potions > 0 or stamina_potions > 0:
             potion_display = f"Potions: HP({health_potions})"
@@ -480,227 +529,194 @@ class Game:
                 potion_display += f" MP({mana_potions})"
             if stamina_potions > 0:
                 potion_display += f" SP({stamina_potions})"
-            print(potion_display)
+            lines.append(potion_display)
+        return lines
+
+    def get_combat_screen_lines(self, monster, log, player_pose='idle', monster_pose='idle'):
+        """Return the lines of the combat screen with ASCII art"""
+        if self.player is None:
+            return []
+        
+        # Get monster type for art
+        monster_type = self.get_monster_type(monster)
+        
+        # Display combat interface
+        lines = list(COMBAT_HEADER)
         
-        print()
-        print("Battle Log:")
+        # Player and monster ASCII art side by side
+        lines += compose_combat_panel(monster_type, player_pose, monster_pose)
+        
+        lines += ["", "-" * 80]
+        lines += self.get_combat_status_lines(monster)
+        lines += ["", "Battle Log:"]
         for entry in log[-3:]:
-            print(f"  {entry}")
-        print()
-        print("Choose action: [A]ttack  [H]eal  [R]un  [X]pell")
-        print("(Press A/Enter to attack, H to heal, R to run, X for " + ("spells" if self.player.is_caster() else "skills") + ")")
+            lines.append(f"  {entry}")
+        lines.append("")
+        lines.append("Choose action: [A]ttack  [H]eal  [R]un  [X]pell")
+        lines.append("(Press A/Enter to attack, H to heal, R to run, X for " + ("spells" if self.player.is_caster() else "skills") + ")")
+        return lines
+
+    def display_combat_screen(self, monster, log, player_pose='idle', monster_pose='idle'):
+        """Display the combat screen with ASCII art"""
+        if self.player is None:
+            return
+        self.terminal.draw(self.get_combat_screen_lines(monster, log, player_pose, monster_pose))
+
+    def play_combat_pose_flow(self, monster, log, player_pose, monster_pose):
+        """Show the combat screen in a pose for one beat of the animation clock"""
+        yield from self.animator.play_flow([lambda: self.display_combat_screen(monster, log, player_pose, monster_pose)], fps=POSE_FPS)
+
+    play_combat_pose = blocking(play_combat_pose_flow)
 
-    def combat_round(self, player, monster, action, log):
+    def combat_round_flow(self, player, monster, action, log, foes=None):
+        """Play one round against monster, or against all of foes with monster as the target"""
         if player is None:
             return None, log
-            
-        # Player's turn
+        foes = foes or [monster]
+        # Anything needing input or animation before the rules run
+        ability = None
         if action == 'a':
-            self.display_combat_screen(monster, log, 'attack', 'idle')
-            time.sleep(0.5)
-            damage_to_monster = max(1, player.attack - monster.defense)
-            monster.take_damage(damage_to_monster)
-            log.append(f"You hit {monster.name} for {damage_to_monster} damage!")
-            self.display_combat_screen(monster, log, 'idle', 'hurt')
-            time.sleep(0.5)
-            if not monster.is_alive():
-                log.append(f"You defeated the {monster.name}!")
-                player.gain_exp(monster.exp_value)
-                log.append(f"Gained {monster.exp_value} experience points!")
-                self.display_combat_screen(monster, log, 'idle', 'hurt')
-                print(f"\nYou search the {monster.name}'s remains...")
-                time.sleep(1.0)
-                # Generate loot
-                player_class = self.player.player_class if self.player else None
-                loot = monster.get_loot(player_class)
-                if loot:
-                    print("You found:")
-                    for item_tuple in loot:
-                        item_type, quantity = item_tuple
-                        # Create proper Item object from tuple
-                        if item_type == 'gold':
-                            item = Item(monster.x, monster.y, '$', 'Gold Coins', {'gold': quantity}, 'gold', quantity, 0.01)
-                        elif item_type == 'health_potion':
-                            item = Item(monster.x, monster.y, '!', 'Health Potion', {'heal': 15}, 'potion', quantity, 0.5)
-                        elif item_type == 'mana_potion':
-                            item = Item(monster.x, monster.y, '~', 'Mana Potion', {'mana': 20}, 'potion', quantity, 0.5)
-                        elif item_type == 'stamina_potion':
-                            item = Item(monster.x, monster.y, '&', 'Stamina Potion', {'stamina': 15}, 'potion', quantity, 0.5)
-                        elif item_type == 'sword':
-                            item = Item(monster.x, monster.y, 'S', 'Steel Sword', {'attack': 5}, 'weapon', quantity, 3.0)
-                        elif item_type == 'armor':
-                            item = Item(monster.x, monster.y, 'A', 'Leather Armor', {'defense': 2}, 'armor', quantity, 8.0)
-                        else:
-                            continue  # Skip unknown item types
-                        success, message = player.add_to_inventory(item)
-                        if success:
-                            print(f"  - {item.name}")
-                        else:
-                            print(f"  - {item.name} (couldn't carry: {message})")
-                else:
-                    print("  Nothing of value.")
-                if not self.test_mode:
-                    print("\nPress any key to continue...")
-                    msvcrt.getch()
-                if player.level > 1:
-                    log.append(f"Level up! You are now level {player.level}!")
-                return True, log
-        elif action == 'h':
-            # Use a health potion from inventory if available
-            potion_found = None
-            for item in player.inventory:
-                if item.name == 'Health Potion' and item.item_type == 'potion' and item.quantity > 0:
-                    potion_found = item
-                    break
-            if potion_found:
-                potion_found.use(player)
-                player.remove_from_inventory(potion_found)
-                log.append("You use a Health Potion and restore 15 HP!")
-            else:
-                log.append("No health potions left!")
+            yield from self.play_combat_pose_flow(monster, log, 'attack', 'idle')
         elif action == 'x':
-            # Cast spell or use skill
-            result = self.get_combat_spell_or_skill(monster, log)
-            if result:
-                action_type, key = result
-                if action_type == 'spell':
-                    learned_spells = player.get_learned_spells()
-                    spell_data = learned_spells[key]
-                    if player.mana >= spell_data['mana_cost']:
-                        player.use_mana(spell_data['mana_cost'])
-                        # Show spell animation in combat screen
-                        self.show_animation(key, monster, log)
-                        if 'damage' in spell_data:
-                            spell_damage = spell_data['damage']
-                            monster.take_damage(spell_damage)
-                            log.append(f"You cast {spell_data['name']} for {spell_damage} damage!")
-                            if not monster.is_alive():
-                                log.append(f"You defeated the {monster.name}!")
-                                player.gain_exp(monster.exp_value)
-                                log.append(f"Gained {monster.exp_value} experience points!")
-                                return True, log
-                        elif 'heal' in spell_data:
-                            player.heal(spell_data['heal'])
-                            log.append(f"You cast {spell_data['name']} and restored {spell_data['heal']} HP!")
-                    else:
-                        log.append("Not enough mana!")
-                else: # action_type == 'skill'
-                    learned_skills = player.get_learned_skills()
-                    skill_data = learned_skills[key]
-                    # Check stamina cost
-                    if 'stamina_cost' in skill_data:
-                        if player.stamina < skill_data['stamina_cost']:
-                            log.append("Not enough stamina!")
-                            return None, log
-                        player.use_stamina(skill_data['stamina_cost'])
-                    # Show skill animation in combat screen
-                    self.show_animation(key, monster, log)
-                    # Apply skill effects
-                    damage_dealt = 0
-                    if 'damage' in skill_data:
-                        damage_dealt = skill_data['damage']
-                        monster.take_damage(damage_dealt)
-                        log.append(f"You use {skill_data['name']} and deal {damage_dealt} damage!")
-                    # Handle special skill effects
-                    if 'stun' in skill_data and skill_data['stun']:
-                        # Stun effect (skip monster's next turn)
-                        monster.stunned = True
-                        log.append(f"The monster is stunned!")
-                    if 'self_heal' in skill_data:
-                        heal_amount = skill_data['self_heal']
-                        player.heal(heal_amount)
-                        log.append(f"You heal {heal_amount} HP!")
-                    if 'dodge' in skill_data and skill_data['dodge']:
-                        # Dodge effect (next attack will be dodged)
-                        player.dodging = True
-                        log.append(f"You prepare to dodge the next attack!")
-                    if 'poison' in skill_data:
-                        poison_damage = skill_data['poison']
-                        monster.poisoned = True
-                        monster.poison_damage = poison_damage
-                        log.append(f"The monster is poisoned!")
-                    if damage_dealt == 0 and not any(key in skill_data for key in ['stun', 'self_heal', 'dodge', 'poison']):
-                        log.append(f"You use {skill_data['name']}!")
-            else:
-                log.append("You decide not to cast a spell or use a skill.")
-        elif action == 'r':
-            import random
-            if random.random() < 0.5:
-                log.append("You successfully ran away!")
-                return 'run', log
-            else:
-                log.append("You failed to run away!")
-        
-        # Monster's turn
-        if monster.is_alive():
-            # Apply poison damage if monster is poisoned
-            if monster.poisoned and monster.poison_damage > 0:
-                monster.take_damage(monster.poison_damage)
-                log.append(f"The monster takes {monster.poison_damage} poison damage!")
-                monster.poison_damage -= 1
-                if monster.poison_damage <= 0:
-                    monster.poisoned = False
-                    log.append("The poison wears off!")
-            
-            # Check if monster is stunned
-            if monster.stunned:
-                log.append("The monster is stunned and cannot attack!")
-                monster.stunned = False
-            else:
-                # Passive rogue dodge
-                import random
-                if hasattr(player, 'dodge_chance') and player.dodge_chance > 0:
-                    if random.random() < player.dodge_chance:
-                        log.append("You nimbly dodge the attack!")
-                        return None, log
-                # Check if player is dodging (from skill)
-                if player.dodging:
-                    log.append("You dodge the monster's attack!")
-                    player.dodging = False
+            choice = yield from self.get_combat_spell_or_skill_flow(monster, log)
+            if choice:
+                action_type, key = choice
+                learned = player.get_learned_spells() if action_type == 'spell' else player.get_learned_skills()
+                ability = (action_type, learned[key])
+        before = combat.player_state(player)
+        result = combat.resolve_group_round(before, [combat.monster_state(foe) for foe in foes], foes.index(monster),
+                                            action, random, ability)
+        # Then present what happened: the player's half of the round first
+        if ability and (result.player.mana < before.mana or result.player.stamina < before.stamina):
+            yield from self.show_animation_flow(key, monster, log)
+        player_events = [event for event in result.events if event.actor == 'player']
+        standing = [foe for foe in foes if foe.is_alive()]
+        for foe, state in zip(foes, result.monsters):
+            combat.apply_monster_state(foe, state)
+        if action == 'a':
+            # Effects wearing off come before the blow, the hurt pose after it
+            hit = [event.kind for event in player_events].index('hit') + 1
+            combat.add_events(log, player_events[:hit])
+            player_events = player_events[hit:]
+            yield from self.play_combat_pose_flow(monster, log, 'idle', 'hurt')
+        combat.add_events(log, player_events)
+        combat.apply_player_state(player, result.player)
+        for foe in standing:
+            if not foe.is_alive():
+                player.gain_exp(foe.exp_value)
+                combat.add_events(log, [combat.Event('exp', 'player', foe.exp_value, None)])
+        if action == 'a' and monster in standing and not monster.is_alive():
+            yield from self.search_remains_flow(player, monster, log)
+        combat.add_events(log, [event for event in result.events if event.actor == 'monster'])
+        return result.outcome, log
+
+    combat_round = blocking(combat_round_flow)
+
+    def search_remains_flow(self, player, monster, log):
+        """Show the loot found on a monster killed in melee and add it to the inventory"""
+        self.display_combat_screen(monster, log, 'idle', 'hurt')
+        self.terminal.append(["", f"You search the {monster.name}'s remains..."])
+        yield from self.animator.hold_flow(1.0)
+        # Generate loot
+        player_class = self.player.player_class if self.player else None
+        loot = monster.get_loot(player_class)
+        if loot:
+            found_lines = ["You found:"]
+            for item_tuple in loot:
+                item_type, quantity = item_tuple
+                # Create proper Item object from tuple
+                if item_type == 'gold':
+                    item = Item(monster.x, monster.y, '$', 'Gold Coins', {'gold': quantity}, 'gold', quantity, 0.01)
+                elif item_type == 'health_potion':
+                    item = Item(monster.x, monster.y, '!', 'Health Potion', {'heal': 15}, 'potion', quantity, 0.5)
+                elif item_type == 'mana_potion':
+                    item = Item(monster.x, monster.y, '~', 'Mana Potion', {'mana': 20}, 'potion', quantity, 0.5)
+                elif item_type == 'stamina_potion':
+                    item = Item(monster.x, monster.y, '&', 'Stamina Potion', {'stamina': 15}, 'potion', quantity, 0.5)
+                elif item_type == 'sword':
+                    item = Item(monster.x, monster.y, 'S', 'Steel Sword', {'attack': 5}, 'weapon', quantity, 3.0)
+                elif item_type == 'armor':
+                    item = Item(monster.x, monster.y, 'A', 'Leather Armor', {'defense': 2}, 'armor', quantity, 8.0)
                 else:
-                    # Normal attack
-                    damage = max(1, monster.attack - player.defense)
-                    player.take_damage(damage)
-                    log.append(f"The monster attacks for {damage} damage!")
-        
-        if player.hp <= 0:
-            log.append("You have been defeated!")
-            return False, log
-        return None, log
+                    continue  # Skip unknown item types
+                success, message = player.add_to_inventory(item)
+                if success:
+                    found_lines.append(f"  - {item.name}")
+                else:
+                    found_lines.append(f"  - {item.name} (couldn't carry: {message})")
+            self.terminal.append(found_lines)
+        else:
+            self.terminal.append(["  Nothing of value."])
+        if not self.test_mode:
+            self.terminal.append(["", "Press any key to continue..."])
+            yield 'message'
+        if player.level > 1:
+            combat.add_events(log, [combat.Event('level_up', 'player', player.level, None)])
+
+    search_remains = blocking(search_remains_flow)
+
+    def handle_combat_flow(self, monster, monster_first=False):
+        yield from self.handle_encounter_flow([monster], monster_first)
 
-    def handle_combat(self, monster, monster_first=False):
+    handle_combat = blocking(handle_combat_flow)
+
+    def handle_encounter_flow(self, monsters, monster_first=False):
+        """Fight one or more monsters at once.
+
+        The monsters join one initiative queue, faster ones first: each
+        round the player acts on the target (T switches it), then every
+        monster still standing takes its turn, and the screen is drawn
+        once for the round. With monster_first each monster ambushes the
+        player before the first round.
+        """
         if self.player is None:
             return
-        log = [f"You encounter a {monster.name}! ({monster.hp} HP, ATK {monster.attack}, DEF {monster.defense})"]
+        foes = self.foes = sorted(monsters, key=lambda foe: foe.move_speed)
+        target = self.opponent = foes[0]
+        log = combat.CombatLog(history=self.combat_history)
+        for monster in foes:
+            log.append(combat.Event('encounter', 'monster', (monster.hp, monster.attack, monster.defense), monster.name))
         if monster_first:
-            # Monster gets first attack
-            damage_to_player = max(1, monster.attack - self.player.defense)
-            self.player.take_damage(damage_to_player)
-            log.append(f"{monster.name} ambushes you for {damage_to_player} damage!")
-            if self.player.hp <= 0:
-                log.append("You have been defeated!")
-                self.display_combat_screen(monster, log)
-                self.is_running = False
-                self.show_game_over()
-                return
-        while monster.is_alive() and self.player.hp > 0:
-            self.display_combat_screen(monster, log)
-            action = self.get_combat_action(monster, log)
-            result, log = self.combat_round(self.player, monster, action, log)
-            if result == True:
-                self.dungeon.remove_monster(monster)
-                break
-            elif result == False:
+            # Monsters get the first attack
+            for monster in foes:
+                damage_to_player = max(1, monster.attack - self.player.defense)
+                self.player.take_damage(damage_to_player)
+                log.append(combat.Event('ambush', 'monster', damage_to_player, monster.name))
+                if self.player.hp <= 0:
+                    log.append(combat.Event('player_defeated', 'monster', None, None))
+                    self.display_combat_screen(target, log)
+                    self.foes, self.opponent = [], None
+                    self.is_running = False
+                    yield from self.show_game_over_flow()
+                    return
+        while foes and self.player.hp > 0:
+            log.turn += 1
+            # The action menu draws the combat screen with it
+            action = yield from self.get_combat_action_flow(target, log)
+            target = self.opponent
+            result, log = yield from self.combat_round_flow(self.player, target, action, log, foes)
+            for monster in foes:
+                if not monster.is_alive():
+                    self.dungeon.remove_monster(monster)
+                    self.kills += 1
+            foes = self.foes = [monster for monster in foes if monster.is_alive()]
+            if result == False:
                 self.is_running = False
-                self.show_game_over()
+                yield from self.show_game_over_flow()
                 return
             elif result == 'run':
-                print("\nYou escaped the fight!")
-                print("Press any key to continue...")
-                msvcrt.getch()
+                self.terminal.append(["", "You escaped the fight!", "Press any key to continue..."])
+                yield 'message'
                 break
+            if foes and target not in foes:
+                target = self.opponent = foes[0]
+        self.foes, self.opponent = [], None
+        # Drop keys mashed during the fight so they don't turn into moves
+        yield FLUSH
+
+    handle_encounter = blocking(handle_encounter_flow)
 
-    def get_combat_action(self, monster=None, log=None):
+    def get_combat_action_flow(self, monster=None, log=None):
         actions = [('Attack', 'a'), ('Heal', 'h'), ('Run', 'r')]
         # Add spell/skill if available
         if self.player:
@@ -715,18 +731,17 @@ class Game:
                     actions.append(('Use Skill', 'x'))
         selected = 0
         while True:
-            # Redraw the full combat screen if monster and log are provided
-            if monster is not None and log is not None:
-                self.display_combat_screen(monster, log)
-            print("\n" + "=" * 60)
-            print("Choose your action:")
+            lines = ["", "=" * 60, "Choose your action:"]
             for i, (label, _) in enumerate(actions):
                 arrow = '→' if i == selected else ' '
-                print(f"{arrow} {label}")
-            print("\nControls: W/S = Move, F = Confirm, Q = Cancel")
-            print("=" * 60)
+                lines.append(f"{arrow} {label}")
+            lines += ["", "Controls: W/S = Move, F = Confirm, Q = Cancel", "=" * 60]
+            if len(self.foes) > 1:
+                lines.insert(-1, "T = Switch target")
+            # Redraw the full combat screen if monster and log are provided
+            self._show_combat_menu(monster, log, lines)
             
-            key = msvcrt.getch().decode('utf-8').lower()
+            key = (yield 'combat-action').lower()
             if key == 'p':
                 self.is_running = False
                 return None
@@ -738,24 +753,38 @@ class Game:
                 selected = (selected + 1) % len(actions)
             elif key == 'f':
                 return actions[selected][1]
+            elif key == 't' and len(self.foes) > 1:
+                monster = self.opponent = self.foes[(self.foes.index(monster) + 1) % len(self.foes)]
 
-    def handle_input(self):
+    get_combat_action = blocking(get_combat_action_flow)
+
+    def handle_input_flow(self):
         if self.player is None:
             return
             
-        # Clear any buffered input to prevent combat keys from affecting movement
-        while msvcrt.kbhit():
-            msvcrt.getch()
-            
-        key = msvcrt.getch().decode('utf-8').lower()
-        if key == 'p':
+        raw_key = yield 'map'
+        if raw_key == ESCAPE:
+            raw_key = yield from self.skip_escape_sequence_flow()
+            if raw_key is None:
+                return
+        key = raw_key.lower()
+        if raw_key in RUN_KEYS:
+            yield from self.run_direction_flow(*RUN_KEYS[raw_key])
+            return
+        elif raw_key == TRAVEL_KEY:
+            yield from self.travel_to_stairs_flow()
+            return
+        elif key == EXPLORE_KEY:
+            yield from self.auto_explore_flow()
+            return
+        elif key == 'p':
             self.is_running = False
             return
         elif key == 'i':
-            self.show_inventory()
+            yield from self.show_inventory_flow()
             return
         elif key == 'x':
-            self.show_spells()
+            yield from self.show_spells_flow()
             return
         
         new_x, new_y = self.player.x, self.player.y
@@ -781,9 +810,8 @@ class Game:
             
             # Check for stairs
             if self.dungeon.is_stairs_at(new_x, new_y):
-                print("\nYou descend to the next level...")
-                print("Press any key to continue...")
-                msvcrt.getch()
+                self.terminal.append(["", "You descend to the next level...", "Press any key to continue..."])
+                yield 'message'
                 self.player.x = 1
                 self.player.y = 1
                 self.dungeon.next_level()
@@ -794,18 +822,19 @@ class Game:
             if chest:
                 player_class = self.player.player_class if self.player else None
                 loot = chest.open(player_class)
-                print(f"\nYou opened a treasure chest!")
+                lines = ["", "You opened a treasure chest!"]
                 if loot:
                     for item in loot:
                         success, message = self.player.add_to_inventory(item)
                         if success:
-                            print(f"Found {item.name}!")
+                            lines.append(f"Found {item.name}!")
                         else:
-                            print(f"Couldn't carry {item.name}: {message}")
+                            lines.append(f"Couldn't carry {item.name}: {message}")
                 else:
-                    print("The chest was empty!")
-                print("Press any key to continue...")
-                msvcrt.getch()
+                    lines.append("The chest was empty!")
+                lines.append("Press any key to continue...")
+                self.terminal.append(lines)
+                yield 'message'
                 # Remove chest from the list so it disappears
                 self.dungeon.chests.remove(chest)
                 return
@@ -813,16 +842,123 @@ class Game:
             # Check for monster
             monster = self.dungeon.get_monster_at(new_x, new_y)
             if monster:
-                self.handle_combat(monster)
+                # Monsters next to the player join in
+                others = [other for other in self.adjacent_monsters() if other is not monster]
+                yield from self.handle_encounter_flow([monster] + others)
             else:
                 self.player.x = new_x
                 self.player.y = new_y
                 # Move monsters after player moves
-                self.monster_move_and_check_initiate()
+                yield from self.monster_move_and_check_initiate_flow()
+
+    handle_input = blocking(handle_input_flow)
+
+    def travel_flow(self, steps):
+        """Walk a series of (dx, dy) steps without drawing in between.
 
-    def monster_move_and_check_initiate(self):
+        Monsters take their turns after every step as usual. Travel stops
+        before walking into a wall, monster, chest or the stairs, when a
+        chest or the stairs comes within one step, when a monster is in
+        view or when a fight breaks out. Returns the number of steps taken.
+        """
+        dungeon = self.dungeon
+        taken = 0
+        near = self._features_in_reach()
+        for dx, dy in steps:
+            x, y = self.player.x + dx, self.player.y + dy
+            if (not (0 <= x < dungeon.width and 0 <= y < dungeon.height) or dungeon.map[y][x] == '#' or
+                    dungeon.is_stairs_at(x, y) or dungeon.get_chest_at(x, y) or dungeon.get_monster_at(x, y)):
+                break
+            self.player.x, self.player.y = x, y
+            self.last_move = (dx, dy)
+            taken += 1
+            fought = yield from self.monster_move_and_check_initiate_flow()
+            dungeon.update_fov(self.player.x, self.player.y)
+            reach = self._features_in_reach()
+            if fought or not self.is_running or dungeon.visible_monsters() or reach - near:
+                break
+            near = reach
+        return taken
+
+    def _features_in_reach(self):
+        """Return the chests and stairs one step away from the player"""
+        px, py = self.player.x, self.player.y
+        features = set()
+        for x, y in ((px + 1, py), (px - 1, py), (px, py + 1), (px, py - 1)):
+            if self.dungeon.is_stairs_at(x, y) or self.dungeon.get_chest_at(x, y):
+                features.add((x, y))
+        return features
+
+    def skip_escape_sequence_flow(self):
+        """Read past an arrow/function key that reached the map unparsed.
+
+        The terminal backends drop these, but other input sources may pass
+        ESC [ A on as three keys, and 'A' would start a run. Returns the key
+        typed after a plain Esc, or None if a sequence was skipped.
+        """
+        key = yield 'map'
+        if key not in SEQUENCE_STARTS:
+            return key
+        key = yield 'map'
+        while not ends_sequence(key):
+            key = yield 'map'
+        return None
+
+    def run_direction_flow(self, dx, dy):
+        """Keep moving in one direction until travel has to stop"""
+        return (yield from self.travel_flow(itertools.repeat((dx, dy))))
+
+    run_direction = blocking(run_direction_flow)
+
+    def travel_to_stairs_flow(self):
+        """Walk the shortest known path to the stairs, stopping next to them"""
+        stairs = self.dungeon.stairs
+        if not stairs or not self.dungeon.is_explored(*stairs):
+            message = "You haven't found the stairs yet."
+        else:
+            path = self.dungeon.find_path((self.player.x, self.player.y), stairs)
+            if path:
+                steps = [(x - px, y - py) for (px, py), (x, y) in zip([(self.player.x, self.player.y)] + path, path)]
+                return (yield from self.travel_flow(steps))
+            message = "You don't know a way to the stairs."
+        self.terminal.append(["", message, "Press any key to continue..."])
+        yield 'message'
+        return 0
+
+    travel_to_stairs = blocking(travel_to_stairs_flow)
+
+    def auto_explore_flow(self):
+        """Walk toward the nearest unexplored tile until travel has to stop"""
+        self.dungeon.update_fov(self.player.x, self.player.y)
+        frontier = self.dungeon.get_frontier_map()
+        if self.dungeon.visible_monsters():
+            message = "Not with monsters in view!"
+        elif frontier.next_step(self.player.x, self.player.y) is None:
+            message = "There is nothing left to explore here."
+        else:
+            def steps():
+                # Asked lazily so every step follows the map as it is updated
+                step = frontier.next_step(self.player.x, self.player.y)
+                while step is not None:
+                    yield step
+                    step = frontier.next_step(self.player.x, self.player.y)
+            return (yield from self.travel_flow(steps()))
+        self.terminal.append(["", message, "Press any key to continue..."])
+        yield 'message'
+        return 0
+
+    auto_explore = blocking(auto_explore_flow)
+
+    def adjacent_monsters(self):
+        """Return the living monsters next to the player"""
+        px, py = self.player.x, self.player.y
+        return [monster for monster in self.dungeon.monsters
+                if monster.is_alive() and max(abs(monster.x - px), abs(monster.y - py)) == 1]
+
+    def monster_move_and_check_initiate_flow(self):
         if self.player is None:
             return
+        self.turns += 1
         # Move monsters and check if any try to enter the player's square
         player_pos = (self.player.x, self.player.y)
         last_dx, last_dy = self.last_move
@@ -846,6 +982,9 @@ class Game:
                 # Sideways: allow attack
                 attempted_attacks.append(monster)
         
-        # If any monster attempted to attack, initiate combat (monster first)
-        for monster in attempted_attacks:
-            self.handle_combat(monster, monster_first=True) 
\ No newline at end of file
+        # If any monster attempted to attack, they all fight the player at once (monsters first)
+        if attempted_attacks:
+            yield from self.handle_encounter_flow(attempted_attacks, monster_first=True)
+        return bool(attempted_attacks)
+
+    monster_move_and_check_initiate = blocking(monster_move_and_check_initiate_flow)
@@ -0,0 +1,158 @@
+import asyncio
+from collections import deque
+
+# Prompts the game names when it asks for a key, so a policy can tell
+# which screen it is answering
+PROMPTS = (
+    'title',          # Title screen, any key
+    'class',          # Class selection: 1-4, P
+    'map',            # Exploring: WASD, Shift+WASD, >, O, I, X, P
+    'inventory',      # W/S, F, D, Q, P
+    'spells',         # Spells/skills screen outside combat: spell key, Q, P
+    'combat-action',  # Combat menu: W/S, F, Q, P
+    'combat-spell',   # Spell choice in combat: 1-9, Q, P
+    'combat-skill',   # Skill choice in combat: 1-9, Q, P
+    'message',        # "Press any key to continue..."
+)
+CLOSED = object()  # Put on a QueueInput's queue to end the session
+
+
+class InputSource:
+    """Where the game's keys come from.
+
+    read_key() works like Terminal.read_key() and is also told which prompt
+    the game is waiting on. Timed reads (timeout not None) only come from
+    animations waiting for a skip key. Raising EOFError ends the session.
+    """
+
+    # True when keys come from someone at a keyboard, who may still be
+    # typing; run_async() then reads them on a background task
+    realtime = False
+
+    def read_key(self, timeout=None, prompt=None):
+        raise NotImplementedError
+
+    def flush(self):
+        """Discard keys that are already waiting"""
+
+    async def next_key(self, timeout=None, prompt=None):
+        """Async version of read_key() used by the asyncio game loop"""
+        # Let other sessions and the render task have a turn
+        await asyncio.sleep(0)
+        return self.read_key(timeout, prompt)
+
+
+class TerminalInput(InputSource):
+    """Keys typed at a terminal (or scripted into a HeadlessTerminal)"""
+
+    def __init__(self, terminal):
+        self.terminal = terminal
+
+    @property
+    def realtime(self):
+        return self.terminal.realtime
+
+    def read_key(self, timeout=None, prompt=None):
+        return self.terminal.read_key(timeout)
+
+    def flush(self):
+        self.terminal.flush_input()
+
+
+class ScriptedInput(InputSource):
+    """A fixed list of keys, answered one per prompt.
+
+    Timed reads never use up a scripted key, so animations don't eat the
+    script. Running out of keys ends the session.
+    """
+
+    def __init__(self, keys=()):
+        self.keys = deque(keys)
+
+    def feed(self, keys):
+        """Queue more scripted keys"""
+        self.keys.extend(keys)
+
+    def read_key(self, timeout=None, prompt=None):
+        if timeout is not None:
+            return None
+        if not self.keys:
+            raise EOFError("No scripted keys left")
+        return self.keys.popleft()
+
+
+class CallbackInput(InputSource):
+    """Keys chosen by a function, for bots and policies.
+
+    callback(prompt) returns the key to press at the named prompt (see
+    PROMPTS), or None to end the session. Bind whatever state it needs,
+    usually the Game, with a closure.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.keys_sent = 0
+
+    def read_key(self, timeout=None, prompt=None):
+        if timeout is not None:
+            return None
+        key = self.callback(prompt)
+        if key is None:
+            raise EOFError("Policy stopped")
+        self.keys_sent += 1
+        return key
+
+
+class QueueInput(InputSource):
+    """Keys from an asyncio.Queue, for the asyncio game loop.
+
+    Whatever fills the queue (pump_keys(), a network connection, a test)
+    runs as its own task; put CLOSED on the queue to end the session.
+    """
+
+    def __init__(self, queue, flush=True):
+        self.queue = queue
+        self.flushes = flush  # False keeps flush() from dropping scripted keys
+
+    def read_key(self, timeout=None, prompt=None):
+        raise RuntimeError("QueueInput can only be read from the asyncio loop")
+
+    def flush(self):
+        if self.flushes:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+
+    async def next_key(self, timeout=None, prompt=None):
+        keys = self.queue
+        if not keys.empty():
+            # Queued keys are taken without giving up the loop, so a burst
+            # of type-ahead is simulated before the next redraw
+            key = keys.get_nowait()
+        elif timeout is None:
+            key = await keys.get()
+        elif timeout <= 0:
+            return None
+        else:
+            try:
+                key = await asyncio.wait_for(keys.get(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if key is CLOSED:
+            raise EOFError("Input closed")
+        return key
+
+
+async def pump_keys(source, queue):
+    """Copy keys from a realtime source into a queue until its input closes.
+
+    Reads run on a worker thread with a short timeout, so the event loop
+    never blocks and the task can be cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            key = await loop.run_in_executor(None, source.read_key, 0.1)
+            if key is not None:
+                queue.put_nowait(key)
+    except EOFError:
+        queue.put_nowait(CLOSED)
@@ -1,10 +1,34 @@
 # ASCII Roguelike Dungeon Crawler
 # Entry point
+import argparse
+import asyncio
+
+import combat
 from game import Game
+from recorder import AsciicastRecorder
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ASCII Roguelike Dungeon Crawler")
+    parser.add_argument('--record', metavar='FILE',
+                        help="record the session as a gzip-compressed asciicast v2 file")
+    parser.add_argument('--no-color', action='store_true',
+                        help="draw the map without colour")
+    parser.add_argument('--bandwidth-cap', metavar='BYTES', type=int,
+                        help="send frames larger than BYTES without colour (for slow terminals)")
+    parser.add_argument('--combat-log', metavar='FILE',
+                        help="write every fight's full battle log to FILE (rotated at 1 MB)")
+    args = parser.parse_args(argv)
 
-def main():
-    game = Game()
-    game.run()
+    game = Game(color=not args.no_color)
+    game.terminal.max_frame_bytes = args.bandwidth_cap
+    if args.combat_log:
+        game.combat_history = combat.history_logger(args.combat_log)
+    if args.record:
+        with AsciicastRecorder(args.record) as recorder:
+            game.terminal.recorder = recorder
+            asyncio.run(game.run_async())
+    else:
+        asyncio.run(game.run_async())
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,62 @@
+"""Monster types as shared, immutable templates.
+
+Every monster type is a MonsterTemplate in MONSTER_TEMPLATES, loaded at
+import from monsters.json next to this module. A Monster only holds what
+changes during play (position, HP, effects, move counter) plus a
+reference to its template, so a type costs one template however many
+monsters of it are alive, and spawning one is a dictionary lookup no
+matter how many types there are.
+
+More types can be added at run time with load_templates(path) or
+register_template(). A data file maps each type to its fields:
+
+    {"slime": {"char": "s", "name": "Slime", "hp": 6, "attack": 2, "defense": 0,
+               "exp_value": 3, "loot": ["gold"], "spawn": true}}
+
+char, name, hp, attack, defense and exp_value are required. speed and
+move_speed (map turns between moves) default to 1, loot to nothing, art
+(the combat figure, see ascii_art.py) to the generic 'monster', and
+spawn (whether levels place it) to false.
+"""
+import json
+import os
+from collections import namedtuple
+
+MonsterTemplate = namedtuple('MonsterTemplate', ['monster_type', 'char', 'name', 'hp', 'attack', 'defense',
+                                                 'exp_value', 'speed', 'move_speed', 'loot', 'art', 'spawn'],
+                             defaults=(1, 1, (), 'monster', False))
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'monsters.json')
+
+MONSTER_TEMPLATES = {}  # Monster type -> MonsterTemplate
+MONSTER_LOOT = {}  # Monster type -> its template's loot, the tuple Monster.loot_table returns
+SPAWN_TYPES = []  # Types that levels place, in registration order
+
+
+def register_template(template):
+    """Add a monster type, or replace one of the same name"""
+    monster_type = template.monster_type
+    MONSTER_TEMPLATES[monster_type] = template
+    MONSTER_LOOT[monster_type] = template.loot
+    if template.spawn and monster_type not in SPAWN_TYPES:
+        SPAWN_TYPES.append(monster_type)
+    elif not template.spawn and monster_type in SPAWN_TYPES:
+        SPAWN_TYPES.remove(monster_type)
+
+
+def load_templates(path=DATA_FILE):
+    """Register every monster type in a JSON data file; return their templates"""
+    with open(path, encoding='utf-8') as f:
+        table = json.load(f)
+    templates = []
+    for monster_type, fields in table.items():
+        try:
+            template = MonsterTemplate(monster_type, **dict(fields, loot=tuple(fields.get('loot', ()))))
+        except TypeError as e:
+            raise ValueError(f"Bad monster type {monster_type!r} in {path}: {e}") from None
+        register_template(template)
+        templates.append(template)
+    return templates
+
+
+load_templates()
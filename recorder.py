@@ -0,0 +1,108 @@
+import gzip
+import json
+import queue
+import shutil
+import threading
+import time
+import zlib
+
+# wbits value that makes zlib emit a gzip container, so recordings can be
+# unpacked with gunzip before handing them to an asciicast player
+GZIP_WBITS = 31
+_STOP = object()
+
+
+class AsciicastRecorder:
+    """Records terminal output as a gzip-compressed asciicast v2 file.
+
+    Terminal backends call record() with exactly the text they send to the
+    screen, which after the first frame is only the diff between frames.
+    record() just timestamps the text and queues it; encoding, compression
+    and disk writes all happen on a background thread so the game loop
+    never waits on the file.
+    """
+
+    def __init__(self, path, width=None, height=None, title=None, clock=time.monotonic):
+        if width is None or height is None:
+            size = shutil.get_terminal_size()
+            width = width or size.columns
+            height = height or size.lines
+        self.path = path
+        self.header = {'version': 2, 'width': width, 'height': height, 'timestamp': int(time.time())}
+        if title:
+            self.header['title'] = title
+        self.clock = clock
+        self.events = 0
+        self._queue = queue.SimpleQueue()
+        self._start_time = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._start_time = self.clock()
+        self._thread = threading.Thread(target=self._writer, name='asciicast-writer', daemon=True)
+        self._thread.start()
+
+    def record(self, text):
+        """Queue a chunk of terminal output"""
+        if self._thread is None:
+            self.start()
+        self._queue.put((self.clock() - self._start_time, text))
+        self.events += 1
+
+    def close(self):
+        """Flush everything queued so far and close the file"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _writer(self):
+        compressor = zlib.compressobj(level=6, wbits=GZIP_WBITS)
+        with open(self.path, 'wb') as f:
+            f.write(compressor.compress((json.dumps(self.header) + '\n').encode('utf-8')))
+            done = False
+            while not done:
+                # Block for one event, then drain whatever else is waiting so
+                # a burst of frames becomes one compressed write
+                batch = [self._queue.get()]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                chunks = []
+                for event in batch:
+                    if event is _STOP:
+                        done = True
+                        break
+                    offset, text = event
+                    chunks.append(json.dumps([round(offset, 6), 'o', text]) + '\n')
+                if chunks:
+                    f.write(compressor.compress(''.join(chunks).encode('utf-8')))
+                if not done:
+                    # Sync flush keeps the file readable up to here if we crash
+                    f.write(compressor.flush(zlib.Z_SYNC_FLUSH))
+                    f.flush()
+            f.write(compressor.flush())
+
+
+def load_asciicast(path):
+    """Read a recording back as (header, [(time, text), ...])"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        events = []
+        for line in f:
+            offset, _, text = json.loads(line)
+            events.append((offset, text))
+    return header, events
@@ -0,0 +1,249 @@
+"""Multi-session telnet/TCP server.
+
+Hosts one Game per connection on a single asyncio loop. Every session has
+its own terminal (and so its own frame diffing), its own key queue and
+its own random state, so sessions never see each other's dungeons.
+
+    python server.py [--host 127.0.0.1] [--port 4000]
+    telnet localhost 4000
+
+The server only listens on localhost unless --host says otherwise (e.g.
+--host 0.0.0.0 to accept players from other machines).
+
+See benchmarks/bench_server.py for a load test.
+"""
+import argparse
+import asyncio
+import itertools
+import time
+
+from flow import SessionRandom
+from game import Game
+from input_source import CLOSED
+from terminal import _StreamTerminal, ESCAPE, SEQUENCE_STARTS, ends_sequence
+
+# Telnet protocol bytes (RFC 854) and the options we negotiate
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+ECHO, SUPPRESS_GO_AHEAD, NAWS = 1, 3, 31
+# Character-at-a-time mode: the server echoes (i.e. doesn't), no line
+# buffering, and the client reports its window size
+NEGOTIATION = bytes([IAC, WILL, ECHO, IAC, WILL, SUPPRESS_GO_AHEAD, IAC, DO, NAWS])
+HANGUP_KEYS = {'\x03', '\x04'}  # Ctrl+C, Ctrl+D
+# Unsent bytes queued for a client above which its frames are skipped
+HIGH_WATER = 64 * 1024
+
+
+class _SocketStream:
+    """Text stream over an asyncio StreamWriter, with telnet line endings"""
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def write(self, text):
+        if not self.writer.is_closing():
+            self.writer.write(text.replace('\n', '\r\n').encode('utf-8'))
+
+    def flush(self):
+        pass
+
+
+class SocketTerminal(_StreamTerminal):
+    """Terminal backend for one remote connection.
+
+    Output goes to the connection's StreamWriter with the same frame
+    diffing as a local console; keys arrive through the session's queue,
+    so read_key() is never used. While a client is more than HIGH_WATER
+    bytes behind, frames are skipped rather than queued, and the first one
+    it gets after catching up is a full redraw.
+    """
+
+    def __init__(self, writer, rows=24):
+        super().__init__(_SocketStream(writer))
+        self.writer = writer
+        self.rows = rows
+        self.columns = 80
+        self.frames_dropped = 0
+
+    def draw(self, lines):
+        if self.writer.transport.get_write_buffer_size() > HIGH_WATER:
+            self.frames_dropped += 1
+            self._screen = None  # The client's screen is no longer known
+            return
+        super().draw(lines)
+
+    def read_key(self, timeout=None):
+        raise RuntimeError("SocketTerminal keys arrive through the session queue")
+
+    def flush_input(self):
+        pass
+
+
+class TelnetDecoder:
+    """Splits telnet input into keys and window-size reports.
+
+    Arrow and function key escape sequences are dropped, as the local
+    terminal backends do; an ESC on its own is still a key.
+    """
+
+    def __init__(self, terminal):
+        self.terminal = terminal
+        self.state = 'data'
+        self.option = []
+        self.last = None
+
+    def feed(self, data):
+        """Return the keys in a chunk of input"""
+        keys = []
+        for byte in data:
+            if self.state == 'escape':
+                if chr(byte) in SEQUENCE_STARTS:
+                    self.state = 'sequence'
+                    continue
+                keys.append(ESCAPE)
+                self.state = 'data'
+            if self.state == 'data':
+                if byte == IAC:
+                    self.state = 'iac'
+                elif chr(byte) == ESCAPE:
+                    self.state = 'escape'
+                elif byte in (0, 10) and self.last == 13:
+                    pass  # CR NUL / CR LF is one Enter
+                elif byte < 128:
+                    keys.append('\r' if byte == 10 else chr(byte))
+                self.last = byte
+            elif self.state == 'sequence':
+                if ends_sequence(chr(byte)):
+                    self.state = 'data'
+            elif self.state == 'iac':
+                if byte == IAC:
+                    self.state = 'data'  # Escaped 255, not a key we use
+                elif byte in (DO, DONT, WILL, WONT):
+                    self.state = 'option'
+                elif byte == SB:
+                    self.state, self.option = 'sub', []
+                else:
+                    self.state = 'data'
+            elif self.state == 'option':
+                self.state = 'data'
+            elif self.state == 'sub':
+                if byte == IAC:
+                    self.state = 'sub-iac'
+                else:
+                    self.option.append(byte)
+            elif self.state == 'sub-iac':
+                if byte == SE:
+                    self._subnegotiation(self.option)
+                    self.state = 'data'
+                else:
+                    self.option.append(byte)
+                    self.state = 'sub'
+        if self.state == 'escape':
+            # Clients send a whole sequence at once, so ESC ending a chunk is the Esc key
+            keys.append(ESCAPE)
+            self.state = 'data'
+        return keys
+
+    def _subnegotiation(self, option):
+        if len(option) == 5 and option[0] == NAWS:
+            columns, rows = option[1] << 8 | option[2], option[3] << 8 | option[4]
+            if rows:
+                self.terminal.rows = rows
+            if columns:
+                self.terminal.columns = columns
+
+
+class GameServer:
+    """Accepts connections and runs a Game for each of them"""
+
+    def __init__(self, color=True, seed=None):
+        self.color = color
+        # Sessions get consecutive seeds when a base seed is given
+        self.seeds = itertools.count(seed) if seed is not None else None
+        self.sessions = {}  # Session number -> (Game, key queue)
+        self.session_count = 0
+        self.server = None
+        self._handlers = set()
+
+    async def start(self, host='127.0.0.1', port=4000):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Stop accepting connections and end every running session"""
+        if self.server is not None:
+            self.server.close()
+        for _, keys in self.sessions.values():
+            keys.put_nowait(CLOSED)
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self.server is not None:
+            await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        handler.add_done_callback(self._handlers.discard)
+        self.session_count += 1
+        number = self.session_count
+        terminal = SocketTerminal(writer)
+        decoder = TelnetDecoder(terminal)
+        keys = asyncio.Queue()
+        rng = SessionRandom(next(self.seeds) if self.seeds is not None else None)
+        with rng:
+            game = Game(terminal, color=self.color)
+        self.sessions[number] = (game, keys)
+        writer.write(NEGOTIATION)
+
+        async def read_keys():
+            try:
+                while True:
+                    data = await reader.read(1024)
+                    if not data:
+                        break
+                    for key in decoder.feed(data):
+                        if key in HANGUP_KEYS:
+                            return
+                        keys.put_nowait(key)
+            except ConnectionError:
+                pass
+            finally:
+                keys.put_nowait(CLOSED)
+
+        reading = asyncio.create_task(read_keys())
+        try:
+            await game.run_async(keys, rng)
+        finally:
+            reading.cancel()
+            del self.sessions[number]
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+async def serve(host, port, color=True, seed=None):
+    server = GameServer(color, seed)
+    port = await server.start(host, port)
+    print(f"Serving the dungeon on {host}:{port} (Ctrl+C to stop)")
+    started = time.monotonic()
+    try:
+        await server.server.serve_forever()
+    finally:
+        print(f"{server.session_count} sessions in {time.monotonic() - started:.0f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host the dungeon over telnet/TCP")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on; 0.0.0.0 accepts remote players")
+    parser.add_argument('--port', type=int, default=4000)
+    parser.add_argument('--no-color', action='store_true', help="draw the map without colour")
+    parser.add_argument('--seed', type=int, default=None, help="seed for the first session; later ones count up")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, not args.no_color, args.seed))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Headless whole-game simulation.
+
+Plays complete games (class selection, exploration, combat, descent) with
+a policy choosing every key, on a NullTerminal so nothing is drawn and
+nothing sleeps. A batch runner fans seeds out over worker processes and
+aggregates the results.
+
+    python simulate.py --runs 10000 --classes warrior mage --out runs.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from game import Game
+from input_source import CallbackInput
+from terminal import NullTerminal
+
+CLASS_KEYS = {'warrior': '1', 'mage': '2', 'rogue': '3', 'cleric': '4'}
+MOVE_KEYS = {(0, -1): 'w', (-1, 0): 'a', (0, 1): 's', (1, 0): 'd'}
+HEAL_THRESHOLD = 0.4  # Drink a potion in combat below this share of max HP
+
+
+class Policy:
+    """Chooses the key to press at each prompt of a game.
+
+    choose() gets the game and the prompt name (see input_source.PROMPTS)
+    and returns a key, or None to stop playing.
+    """
+
+    def __init__(self, player_class='warrior', rng=None):
+        self.player_class = player_class
+        self.rng = rng or random.Random()
+
+    def choose(self, game, prompt):
+        if prompt == 'class':
+            return CLASS_KEYS[self.player_class]
+        if prompt == 'map':
+            return self.choose_move(game)
+        if prompt == 'combat-action':
+            return self.choose_combat_action(game)
+        if prompt in ('inventory', 'spells', 'combat-spell', 'combat-skill'):
+            return 'q'
+        return ' '
+
+    def choose_move(self, game):
+        return self.rng.choice('wasd')
+
+    def choose_combat_action(self, game):
+        return 'f'  # Attack is highlighted when the menu opens
+
+
+class RandomPolicy(Policy):
+    """Wanders at random and always attacks; a baseline for the others"""
+
+
+class ExplorerPolicy(Policy):
+    """Explores each level fully, fights what it meets, then descends.
+
+    Uses auto-explore and stairs travel where it can and steps toward
+    visible monsters it can beat to fight them. In combat it drinks a health potion
+    when hurt, uses its strongest spell or skill it can afford and runs
+    from fights it would lose.
+    """
+
+    def __init__(self, player_class='warrior', rng=None):
+        super().__init__(player_class, rng)
+        self.pending = []  # Keys queued for the combat menu
+        self.fled = set()  # Monsters it ran from, left alone afterwards
+        self.last_turns = -1
+
+    def choose_move(self, game):
+        dungeon = game.dungeon
+        player = game.player
+        here = (player.x, player.y)
+        # A command that didn't use a turn (blocked by a chest or the
+        # stairs, or refused with a monster in view) is followed by a
+        # single step instead
+        stalled = game.turns == self.last_turns
+        self.last_turns = game.turns
+        dungeon.update_fov(*here)
+        monsters = dungeon.visible_monsters()
+        targets = [m for m in monsters if id(m) not in self.fled and (m.x, m.y) != here
+                   and not self.losing(player, m)]
+        if targets:
+            nearest = min(targets, key=lambda m: abs(m.x - player.x) + abs(m.y - player.y))
+            return self.step_toward(game, (nearest.x, nearest.y))
+        # Monsters it won't fight are walked around, or away from
+        avoid = {(m.x, m.y) for m in monsters}
+        step = dungeon.get_frontier_map().next_step(*here)
+        if step is not None:
+            if not stalled and not monsters:
+                return 'o'
+            return self.steer(game, MOVE_KEYS[step], avoid)
+        if dungeon.stairs and dungeon.is_explored(*dungeon.stairs):
+            path = dungeon.find_path(here, dungeon.stairs)
+            if path and (stalled or monsters or len(path) == 1):
+                return self.steer(game, self.step_toward(game, dungeon.stairs), avoid)
+            if path:
+                return '>'
+        return self.steer(game, self.rng.choice('wasd'), avoid)
+
+    def steer(self, game, key, avoid):
+        """Return key, or a random other move if key walks into a cell to avoid"""
+        player = game.player
+        moves = {key: step for step, key in MOVE_KEYS.items()}
+        dx, dy = moves[key]
+        if (player.x + dx, player.y + dy) not in avoid:
+            return key
+        others = [k for k, (dx, dy) in moves.items()
+                  if (player.x + dx, player.y + dy) not in avoid and game.dungeon.is_valid_position(player.x + dx, player.y + dy)]
+        return self.rng.choice(others) if others else key
+
+    def step_toward(self, game, goal):
+        here = (game.player.x, game.player.y)
+        path = game.dungeon.find_path(here, goal)
+        if not path:
+            return self.rng.choice('wasd')
+        return MOVE_KEYS[(path[0][0] - here[0], path[0][1] - here[1])]
+
+    def choose(self, game, prompt):
+        if prompt in ('combat-spell', 'combat-skill') and self.pending:
+            return self.pending.pop(0)
+        return super().choose(game, prompt)
+
+    def choose_combat_action(self, game):
+        if self.pending:
+            return self.pending.pop(0)
+        player = game.player
+        hurt = player.hp < player.max_hp * HEAL_THRESHOLD and player.get_potion_count('Health Potion')
+        monster = self.opponent(game)
+        if monster and self.losing(player, monster) and not hurt:
+            self.fled.add(id(monster))
+            self.pending = ['s', 'f']
+            return 's'  # Run is the third entry
+        if hurt:
+            self.pending = ['f']
+            return 's'  # Heal is the second
+        ability = self.best_ability(player)
+        if ability:
+            # Cast Spell / Use Skill is the fourth entry when offered
+            self.pending = ['s', 's', 'f', str(ability)]
+            return 's'
+        return 'f'
+
+    @staticmethod
+    def best_ability(player):
+        """1-based menu number of the hardest-hitting spell or skill it can pay for"""
+        if player.is_caster():
+            abilities = list(player.get_learned_spells().values())
+            pool, cost = player.mana, 'mana_cost'
+        else:
+            abilities = list(player.get_learned_skills().values())
+            pool, cost = player.stamina, 'stamina_cost'
+        best = None
+        for number, ability in enumerate(abilities, 1):
+            if ability.get('damage', 0) > player.attack and pool >= ability.get(cost, 0):
+                if best is None or ability['damage'] > abilities[best - 1]['damage']:
+                    best = number
+        return best
+
+    @staticmethod
+    def opponent(game):
+        """The living monster next to the player, which is the one being fought"""
+        player = game.player
+        for monster in game.dungeon.monsters:
+            if monster.is_alive() and max(abs(monster.x - player.x), abs(monster.y - player.y)) == 1:
+                return monster
+        return None
+
+    @staticmethod
+    def losing(player, monster):
+        """True if trading attacks would kill the player before the monster"""
+        damage = max(1, player.attack - monster.defense)
+        ability = ExplorerPolicy.best_ability(player)
+        if ability:
+            abilities = player.get_learned_spells() if player.is_caster() else player.get_learned_skills()
+            damage = max(damage, list(abilities.values())[ability - 1]['damage'])
+        rounds_to_win = -(-monster.hp // damage)
+        rounds_to_lose = -(-player.hp // max(1, monster.attack - player.defense))
+        return rounds_to_win >= rounds_to_lose
+
+
+POLICIES = {'explorer': ExplorerPolicy, 'random': RandomPolicy}
+
+
+def simulate_game(seed, player_class='warrior', policy='explorer', max_turns=2000, goal_depth=5):
+    """Play one game and return its result as a dict.
+
+    The outcome is 'won' on reaching goal_depth, 'died', or 'turn_limit'
+    after max_turns turns on the map.
+    """
+    random.seed(seed)
+    game = Game(NullTerminal())
+    chooser = POLICIES[policy](player_class, random.Random(seed))
+    outcome = None
+
+    def callback(prompt):
+        nonlocal outcome
+        if game.dungeon.level >= goal_depth:
+            outcome = 'won'
+            return None
+        if game.turns >= max_turns:
+            outcome = 'turn_limit'
+            return None
+        return chooser.choose(game, prompt)
+
+    game.input = CallbackInput(callback)
+    start = time.perf_counter()
+    game.run()
+    if outcome is None:
+        outcome = 'died' if game.player and game.player.hp <= 0 else 'stopped'
+    return {
+        'seed': seed,
+        'class': player_class,
+        'policy': policy,
+        'outcome': outcome,
+        'depth': game.dungeon.level,
+        'turns': game.turns,
+        'kills': game.kills,
+        'player_level': game.player.level if game.player else 0,
+        'seconds': round(time.perf_counter() - start, 4),
+    }
+
+
+def _play(job):
+    return simulate_game(*job)
+
+
+def run_batch(seeds, classes=('warrior',), policy='explorer', max_turns=2000, goal_depth=5,
+              workers=None, out=None):
+    """Play every seed with every class across worker processes.
+
+    Results are returned as a list of dicts and, if out is given, written
+    to it as JSONL, one line per game.
+    """
+    jobs = [(seed, player_class, policy, max_turns, goal_depth) for player_class in classes for seed in seeds]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 8))
+    results = []
+    out_file = open(out, 'w') if out else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(_play, jobs, chunksize=chunksize):
+                results.append(result)
+                if out_file:
+                    out_file.write(json.dumps(result) + '\n')
+    finally:
+        if out_file:
+            out_file.close()
+    return results
+
+
+def summarize(results):
+    """Return per-class summary rows: runs, win rate, depths and turn counts"""
+    rows = []
+    for player_class in sorted({r['class'] for r in results}):
+        runs = [r for r in results if r['class'] == player_class]
+        outcomes = Counter(r['outcome'] for r in runs)
+        depths = Counter(r['depth'] for r in runs)
+        rows.append({
+            'class': player_class,
+            'runs': len(runs),
+            'win_rate': outcomes['won'] / len(runs),
+            'death_rate': outcomes['died'] / len(runs),
+            'mean_depth': statistics.mean(r['depth'] for r in runs),
+            'depths': dict(sorted(depths.items())),
+            'median_turns': statistics.median(r['turns'] for r in runs),
+            'mean_kills': statistics.mean(r['kills'] for r in runs),
+        })
+    return rows
+
+
+def format_summary(rows):
+    lines = [f"{'class':<8} {'runs':>6} {'win%':>6} {'died%':>6} {'depth':>6} {'turns':>7} {'kills':>6}  depth distribution"]
+    for row in rows:
+        depths = ' '.join(f"{depth}:{count}" for depth, count in row['depths'].items())
+        lines.append(f"{row['class']:<8} {row['runs']:>6} {row['win_rate'] * 100:>6.1f} {row['death_rate'] * 100:>6.1f} "
+                     f"{row['mean_depth']:>6.2f} {row['median_turns']:>7.0f} {row['mean_kills']:>6.1f}  {depths}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play headless games in parallel and summarise the results")
+    parser.add_argument('--runs', type=int, default=100, help="games per class")
+    parser.add_argument('--seed', type=int, default=0, help="first seed")
+    parser.add_argument('--classes', nargs='+', default=list(CLASS_KEYS), choices=list(CLASS_KEYS))
+    parser.add_argument('--policy', default='explorer', choices=list(POLICIES))
+    parser.add_argument('--max-turns', type=int, default=2000)
+    parser.add_argument('--goal-depth', type=int, default=5, help="dungeon level that counts as a win")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', metavar='FILE', help="write one JSON line per game")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run_batch(range(args.seed, args.seed + args.runs), args.classes, args.policy,
+                        args.max_turns, args.goal_depth, args.workers, args.out)
+    elapsed = time.perf_counter() - start
+    print(format_summary(summarize(results)))
+    print(f"{len(results)} games in {elapsed:.1f}s ({len(results) / elapsed:.1f} games/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Cheap snapshots and forks of a running game.
+
+take_snapshot() captures a game standing on the map in compact form:
+the player and monsters as tuples of their changing fields and status
+effects, items and chests as tuples, the explored mask as bytes and the
+random state. The tile grid is not copied at all: the snapshot shares
+the map's rows, and so does every game restored from it. That is only
+safe by convention: nothing in the game changes a tile once a level is
+built (next_level() makes a fresh grid), and code that ever needs to must
+go through Dungeon.set_tile(), which copies a shared row first. Writing
+to dungeon.map[y][x] directly would change the tile in every fork.
+
+restore() builds an independent Game from a snapshot, with a
+SessionRandom holding the captured random state; run the fork inside
+`with rng:` so its dice don't disturb anyone else's. Search bots fork a
+position, play a move on each fork (e.g. handle_input() with a
+ScriptedInput) and compare the results:
+
+    snap = take_snapshot(game)
+    for key in 'wasd':
+        trial, rng = restore(snap, input_source=ScriptedInput([key] + [' '] * 20))
+        with rng:
+            trial.handle_input()
+
+See benchmarks/bench_fork.py for forks per second.
+"""
+import random
+from collections import namedtuple
+
+from dungeon import Dungeon
+from effects import StatusEffects
+from entities import Player, Monster, Item, Chest, CLASS_SPELLS, CLASS_SKILLS, NO_ABILITIES
+from flow import SessionRandom
+from game import Game
+from terminal import NullTerminal
+
+# The attributes that change during play; everything else is rebuilt
+# from the class or shared by the monster's template
+PLAYER_FIELDS = ('x', 'y', 'player_class', 'level', 'exp', 'exp_to_next', 'hp', 'max_hp', 'mana', 'max_mana',
+                 'stamina', 'max_stamina', 'attack', 'defense', 'dodge_chance', 'max_weight', 'max_inventory_slots')
+MONSTER_FIELDS = ('x', 'y', 'template', 'hp', 'move_counter')
+ITEM_FIELDS = ('x', 'y', 'char', 'name', 'effect', 'item_type', 'quantity', 'weight')
+
+PlayerSnapshot = namedtuple('PlayerSnapshot', ['fields', 'effects', 'learned_spells', 'learned_skills', 'items',
+                                               'weapon', 'armor'])
+DungeonSnapshot = namedtuple('DungeonSnapshot', ['level', 'base_width', 'base_height', 'width', 'height', 'rows',
+                                                 'stairs', 'explored', 'visible_cells', 'fov_origin', 'frontier',
+                                                 'monsters', 'chests'])
+Snapshot = namedtuple('Snapshot', ['dungeon', 'player', 'turns', 'kills', 'last_move', 'color', 'test_mode',
+                                   'rng_state'])
+
+
+def _fields(obj, names):
+    return tuple(getattr(obj, name) for name in names)
+
+
+def _set_fields(obj, names, values):
+    for name, value in zip(names, values):
+        setattr(obj, name, value)
+
+
+def _snapshot_player(player):
+    items = tuple(_fields(item, ITEM_FIELDS) for item in player.inventory)
+    index = {id(item): i for i, item in enumerate(player.inventory)}
+    return PlayerSnapshot(_fields(player, PLAYER_FIELDS), player.effects.state(), frozenset(player.learned_spells),
+                          frozenset(player.learned_skills), items,
+                          index.get(id(player.equipped_weapon)), index.get(id(player.equipped_armor)))
+
+
+def _snapshot_dungeon(dungeon):
+    # From now on the rows belong to the snapshot as well
+    dungeon.shared_rows = set(range(dungeon.height))
+    return DungeonSnapshot(
+        dungeon.level, dungeon.base_width, dungeon.base_height, dungeon.width, dungeon.height,
+        tuple(dungeon.map), dungeon.stairs, bytes(dungeon.explored), frozenset(dungeon.visible_cells),
+        dungeon.fov_origin, dungeon.frontier.copy(None) if dungeon.frontier is not None else None,
+        tuple((_fields(monster, MONSTER_FIELDS), monster.effects.state()) for monster in dungeon.monsters),
+        tuple((chest.x, chest.y, chest.opened) for chest in dungeon.chests))
+
+
+def take_snapshot(game, rng=None):
+    """Capture a game between turns.
+
+    The random state is taken from rng (a SessionRandom) when given,
+    otherwise from the random module, which is the session's own state
+    when called inside its SessionRandom.
+    """
+    return Snapshot(_snapshot_dungeon(game.dungeon), _snapshot_player(game.player), game.turns, game.kills,
+                    game.last_move, game.color, game.test_mode, rng.state if rng is not None else random.getstate())
+
+
+def _restore_player(snap):
+    player = Player.__new__(Player)
+    _set_fields(player, PLAYER_FIELDS, snap.fields)
+    player.char, player.name = '@', 'Player'
+    player.effects = StatusEffects.from_state(snap.effects)
+    player.available_spells = CLASS_SPELLS.get(player.player_class, NO_ABILITIES)
+    player.available_skills = CLASS_SKILLS.get(player.player_class, NO_ABILITIES)
+    player.learned_spells = set(snap.learned_spells)
+    player.learned_skills = set(snap.learned_skills)
+    player.inventory = [Item(*fields) for fields in snap.items]
+    player.potion_counts = {}
+    for item in player.inventory:
+        player._count_potions(item, item.quantity)
+    player.equipped_weapon = player.inventory[snap.weapon] if snap.weapon is not None else None
+    player.equipped_armor = player.inventory[snap.armor] if snap.armor is not None else None
+    return player
+
+
+def _restore_dungeon(snap):
+    dungeon = Dungeon.__new__(Dungeon)
+    dungeon.level = snap.level
+    dungeon.base_width, dungeon.base_height = snap.base_width, snap.base_height
+    dungeon.width, dungeon.height = snap.width, snap.height
+    dungeon.map = list(snap.rows)
+    dungeon.shared_rows = set(range(snap.height))
+    dungeon.stairs = snap.stairs
+    dungeon.explored = bytearray(snap.explored)
+    dungeon.visible = bytearray(snap.width * snap.height)
+    for i in snap.visible_cells:
+        dungeon.visible[i] = 1
+    dungeon.visible_cells = set(snap.visible_cells)
+    dungeon.fov_origin = snap.fov_origin
+    dungeon.frontier = snap.frontier.copy(dungeon) if snap.frontier is not None else None
+    dungeon.monsters = []
+    for fields, effects in snap.monsters:
+        monster = Monster.__new__(Monster)
+        _set_fields(monster, MONSTER_FIELDS, fields)
+        monster.effects = StatusEffects.from_state(effects)
+        dungeon.monsters.append(monster)
+    dungeon.chests = []
+    for x, y, opened in snap.chests:
+        chest = Chest(x, y)
+        if opened:
+            chest.opened, chest.char = True, 'c'
+        dungeon.chests.append(chest)
+    return dungeon
+
+
+def restore(snapshot, terminal=None, input_source=None):
+    """Build a new Game from a snapshot; return (game, rng).
+
+    The game draws on terminal (a NullTerminal by default) and reads from
+    input_source. rng is a SessionRandom resuming the captured random
+    state; every restore of one snapshot rolls the same dice.
+    """
+    game = Game(terminal or NullTerminal(), snapshot.color, input_source, _restore_dungeon(snapshot.dungeon))
+    game.player = _restore_player(snapshot.player)
+    game.turns, game.kills, game.last_move = snapshot.turns, snapshot.kills, snapshot.last_move
+    game.test_mode = snapshot.test_mode
+    return game, SessionRandom(state=snapshot.rng_state)
+
+
+def fork(game, terminal=None, input_source=None, rng=None):
+    """Snapshot a game and restore it at once; return (game, rng)"""
+    return restore(take_snapshot(game, rng), terminal, input_source)
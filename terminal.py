@@ -0,0 +1,401 @@
+import os
+import re
+import shutil
+import sys
+import time
+from collections import deque
+
+# ANSI sequence that clears the screen and homes the cursor
+CLEAR_SCREEN = '\x1b[2J\x1b[H'
+# Colour/attribute (SGR) escape sequences
+SGR_PATTERN = re.compile('\x1b\\[[0-9;]*m')
+# Arrow and function keys arrive as ESC '[' ... or ESC 'O' ..., ending in
+# a byte from '@' to '~' (ECMA-48). The game has no use for them, but Esc
+# on its own skips animations.
+ESCAPE = '\x1b'
+SEQUENCE_STARTS = '[O'
+SEQUENCE_WAIT = 0.05  # Seconds to wait for the rest of a sequence
+
+
+def ends_sequence(ch):
+    return '@' <= ch <= '~'
+
+
+class Terminal:
+    """Base class for terminal backends.
+
+    The game only talks to the console through this interface: it draws
+    whole frames, appends lines below the current frame and reads single
+    keys. Backends decide how that maps onto a real device.
+    """
+
+    # False for backends where waiting on the wall clock is pointless
+    realtime = True
+    # True for backends that throw frames away, so they needn't be built
+    discards_output = False
+
+    def start(self):
+        """Prepare the terminal for interactive play"""
+
+    def stop(self):
+        """Restore the terminal to its original state"""
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def read_key(self, timeout=None):
+        """Return the next key as a one-character string.
+
+        Blocks until a key arrives when timeout is None, otherwise waits at
+        most timeout seconds and returns None if nothing was pressed.
+        """
+        raise NotImplementedError
+
+    def flush_input(self):
+        """Discard any keys that are already waiting"""
+        while self.read_key(0) is not None:
+            pass
+
+    def write(self, text):
+        """Write raw text to the terminal"""
+        raise NotImplementedError
+
+    def draw(self, lines):
+        """Replace the screen contents with the given lines"""
+        self.write(CLEAR_SCREEN + '\n'.join(lines) + '\n')
+
+    def append(self, lines):
+        """Write lines below whatever is currently on screen"""
+        self.write('\n'.join(lines) + '\n')
+
+    def write_at(self, row, col, text):
+        """Overwrite part of one row of the current frame (0-based)"""
+        self.write(f'\x1b[{row + 1};{col + 1}H{text}')
+
+
+def splice_line(line, col, text):
+    """Return line with text written over it starting at col"""
+    line = line.ljust(col)
+    return line[:col] + text + line[col + len(text):]
+
+
+def diff_frame(old_lines, new_lines):
+    """Return the ANSI text that turns the screen old_lines into new_lines.
+
+    Only rows whose text changed are rewritten, starting at the first
+    changed column; each one is addressed with an absolute cursor move and
+    cleared to the end of the line. Rows left over from a longer previous
+    frame are erased in one go.
+    """
+    out = []
+    for row, line in enumerate(new_lines):
+        old = old_lines[row] if row < len(old_lines) else ''
+        if old == line and row < len(old_lines):
+            continue
+        col = 0
+        # Escape codes take no screen columns, so only skip ahead on plain text
+        if '\x1b' not in line and '\x1b' not in old:
+            limit = min(len(old), len(line))
+            while col < limit and old[col] == line[col]:
+                col += 1
+        out.append(f'\x1b[{row + 1};{col + 1}H{line[col:]}\x1b[K')
+    if len(new_lines) < len(old_lines):
+        out.append(f'\x1b[{len(new_lines) + 1};1H\x1b[J')
+    # Park the cursor below the frame, where appended lines go
+    out.append(f'\x1b[{len(new_lines) + 1};1H')
+    return ''.join(out)
+
+
+class _StreamTerminal(Terminal):
+    """Shared output handling for backends that write to a text stream.
+
+    Frames are diffed against what is already on screen, so redrawing a
+    menu after a cursor move only sends the rows that changed. A recorder
+    sees the same diffed output.
+    """
+
+    def __init__(self, stream=None, recorder=None, max_frame_bytes=None):
+        self.stream = stream or sys.stdout
+        self.recorder = recorder  # Optional AsciicastRecorder fed with everything written
+        # Bandwidth cap for slow links: frames whose output would exceed
+        # this many bytes are sent without colour
+        self.max_frame_bytes = max_frame_bytes
+        self.bytes_written = 0
+        self.frames_drawn = 0
+        self.frames_degraded = 0
+        self.rows = None  # Screen height when known (remote clients); else the local console's
+        self._screen = None  # Lines currently on screen, None when unknown
+
+    def write(self, text):
+        self.stream.write(text)
+        self.stream.flush()
+        self.bytes_written += len(text.encode('utf-8'))
+        if self.recorder is not None:
+            self.recorder.record(text)
+
+    def draw(self, lines):
+        lines = list(lines)
+        text = self._frame_text(lines)
+        if self.max_frame_bytes is not None and len(text.encode('utf-8')) > self.max_frame_bytes:
+            stripped = [SGR_PATTERN.sub('', line) for line in lines]
+            if stripped != lines:
+                lines = stripped
+                text = self._frame_text(lines)
+                self.frames_degraded += 1
+        self.write(text)
+        self.frames_drawn += 1
+        self._screen = lines
+
+    def _frame_text(self, lines):
+        # Absolute cursor moves only work while the frame fits the window
+        height = self.rows or shutil.get_terminal_size().lines
+        if self._screen is None or max(len(lines), len(self._screen)) >= height:
+            return CLEAR_SCREEN + '\n'.join(lines) + '\n'
+        return diff_frame(self._screen, lines)
+
+    def append(self, lines):
+        self.write('\n'.join(lines) + '\n')
+        if self._screen is not None:
+            self._screen.extend(lines)
+
+    def write_at(self, row, col, text):
+        if self._screen is None:
+            super().write_at(row, col, text)
+            return
+        # Going through draw() keeps the cursor parked below the frame and
+        # falls back to a full redraw if the frame has scrolled
+        lines = list(self._screen)
+        while len(lines) <= row:
+            lines.append('')
+        lines[row] = splice_line(lines[row], col, text)
+        self.draw(lines)
+
+
+class WindowsTerminal(_StreamTerminal):
+    """Console backend built on msvcrt"""
+
+    def __init__(self, stream=None):
+        super().__init__(stream)
+        import msvcrt
+        self._msvcrt = msvcrt
+        self._ansi_enabled = False
+
+    def start(self):
+        # Windows 10+ consoles understand ANSI once virtual terminal
+        # processing is switched on, which spares us a 'cls' per frame
+        if self._ansi_enabled:
+            return
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+            mode = ctypes.c_uint32()
+            if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+                kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        except (AttributeError, OSError):
+            pass
+        self._ansi_enabled = True
+
+    def read_key(self, timeout=None):
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._msvcrt.kbhit():
+                ch = self._msvcrt.getch()
+                if ch in (b'\x00', b'\xe0'):
+                    # Arrow and function keys arrive as a two-byte sequence
+                    self._msvcrt.getch()
+                    continue
+                key = ch.decode('utf-8', errors='ignore')
+                if key:
+                    return key
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(0.01)
+
+    def flush_input(self):
+        while self._msvcrt.kbhit():
+            self._msvcrt.getch()
+
+
+class PosixTerminal(_StreamTerminal):
+    """termios backend for Linux and macOS terminals"""
+
+    def __init__(self, stream=None, input_fd=None):
+        super().__init__(stream)
+        self._input_fd = input_fd
+        self._saved_attrs = None
+
+    @property
+    def fd(self):
+        # Resolved lazily so creating a terminal never touches stdin
+        if self._input_fd is None:
+            self._input_fd = sys.stdin.fileno()
+        return self._input_fd
+
+    def start(self):
+        if self._saved_attrs is not None:
+            return
+        try:
+            interactive = os.isatty(self.fd)
+        except (OSError, ValueError):
+            interactive = False
+        if not interactive:
+            return
+        import termios
+        self._saved_attrs = termios.tcgetattr(self.fd)
+        attrs = termios.tcgetattr(self.fd)
+        # Turn off line buffering and echo but keep signals so Ctrl-C works
+        attrs[3] &= ~(termios.ICANON | termios.ECHO)
+        attrs[6][termios.VMIN] = 1
+        attrs[6][termios.VTIME] = 0
+        termios.tcsetattr(self.fd, termios.TCSAFLUSH, attrs)
+        self.write('\x1b[?25l')  # Hide cursor
+
+    def stop(self):
+        if self._saved_attrs is None:
+            return
+        import termios
+        termios.tcsetattr(self.fd, termios.TCSAFLUSH, self._saved_attrs)
+        self._saved_attrs = None
+        self.write('\x1b[?25h')  # Show cursor
+
+    def read_key(self, timeout=None):
+        import select
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return None
+            data = os.read(self.fd, 1)
+            if not data:
+                raise EOFError("Terminal input closed")
+            key = data.decode('utf-8', errors='ignore')
+            if key == ESCAPE and self._skip_sequence():
+                continue  # Like the Windows backend, drop arrow and function keys
+            if key:
+                return key
+
+    def _skip_sequence(self):
+        """After an ESC, read and discard the rest of an escape sequence.
+
+        Returns False if none follows, so the ESC was the Esc key. An ESC
+        followed by any other key (Alt+key) is read as a plain Esc.
+        """
+        import select
+        first = True
+        while select.select([self.fd], [], [], SEQUENCE_WAIT)[0]:
+            ch = os.read(self.fd, 1).decode('latin-1')
+            if first and ch not in SEQUENCE_STARTS:
+                return False
+            if not ch or (not first and ends_sequence(ch)):
+                return True
+            first = False
+        return not first
+
+
+class HeadlessTerminal(Terminal):
+    """In-memory backend for tests and servers.
+
+    Every draw() starts a new frame buffer in a fixed-size ring and
+    append() and write_at() edit the newest one, so nothing is printed.
+    Keys come from a scripted queue and animations never wait.
+    """
+
+    realtime = False
+
+    def __init__(self, keys=(), max_frames=64):
+        self.keys = deque(keys)
+        self.frames = deque(maxlen=max_frames)
+        self.frame_count = 0  # Total frames drawn, including ones dropped from the ring
+
+    def feed(self, keys):
+        """Queue more scripted keys"""
+        self.keys.extend(keys)
+
+    def read_key(self, timeout=None):
+        if self.keys:
+            return self.keys.popleft()
+        if timeout is not None:
+            return None
+        raise EOFError("No scripted keys left")
+
+    def flush_input(self):
+        # Scripted keys are never stale
+        pass
+
+    def draw(self, lines):
+        self.frames.append(list(lines))
+        self.frame_count += 1
+
+    def append(self, lines):
+        if not self.frames:
+            self.draw(lines)
+        else:
+            self.frames[-1].extend(lines)
+
+    def write(self, text):
+        self.append(text.split('\n'))
+
+    def write_at(self, row, col, text):
+        if not self.frames:
+            self.draw([])
+        frame = self.frames[-1]
+        while len(frame) <= row:
+            frame.append('')
+        frame[row] = splice_line(frame[row], col, text)
+
+    @property
+    def screen(self):
+        """Return the newest frame as one string"""
+        return '\n'.join(self.frames[-1]) if self.frames else ''
+
+    def getvalue(self):
+        """Return every frame still in the ring as one string"""
+        return '\n'.join('\n'.join(frame) for frame in self.frames)
+
+
+class NullTerminal(Terminal):
+    """Backend that throws all output away and has no keyboard.
+
+    For bots and batch runs: pair it with a ScriptedInput or CallbackInput
+    and a game runs at CPU speed without building a single frame.
+    """
+
+    realtime = False
+    discards_output = True
+
+    def read_key(self, timeout=None):
+        if timeout is not None:
+            return None
+        raise EOFError("NullTerminal has no keyboard")
+
+    def flush_input(self):
+        pass
+
+    def write(self, text):
+        pass
+
+    def draw(self, lines):
+        pass
+
+    def append(self, lines):
+        pass
+
+    def write_at(self, row, col, text):
+        pass
+
+
+def get_terminal():
+    """Return the terminal backend for the current platform"""
+    if os.name == 'nt':
+        return WindowsTerminal()
+    return PosixTerminal()
@@ -4,6 +4,7 @@ Test script for ASCII Roguelike Dungeon Crawler
 Tests all game functionalities without starting the actual game
 """
 
+import os
 import sys
 import random
 import time
@@ -12,6 +13,7 @@ import time
 from entities import Player, Monster, Item, Chest
 from dungeon import Dungeon
 from game import Game
+from terminal import HeadlessTerminal
 
 def print_test_header(test_name):
     """Print a formatted test header"""
@@ -391,7 +393,7 @@ def test_game_integration():
     
     try:
         # Test game initialization
-        game = Game()
+        game = Game(HeadlessTerminal())
         game.test_mode = True  # Disable interactive prompts during tests
         assert game.dungeon is not None, "Game should have a dungeon"
         assert game.player is None, "Player should start as None"
@@ -404,7 +406,7 @@ def test_game_integration():
         
         # Test dungeon rendering (should not crash)
         try:
-            game.dungeon.render(player_pos=(1, 1), player=game.player)
+            game.dungeon.render(player_pos=(1, 1), player=game.player, terminal=game.terminal)
         except Exception as e:
             assert False, f"Dungeon rendering failed: {str(e)}"
         
@@ -593,7 +595,7 @@ def test_dungeon_methods():
 def test_game_methods():
     print_test_header("Game Methods")
     try:
-        game = Game()
+        game = Game(HeadlessTerminal())
         # Only test non-interactive logic
         game.player = Player(1, 1, 'warrior')
         # Test display_player_status (should not crash)
@@ -637,7 +639,7 @@ def test_combat_potion_display():
     
     try:
         # Create game and player
-        game = Game()
+        game = Game(HeadlessTerminal())
         game.player = Player(1, 1, 'warrior')
         
         # Add some potions to inventory
@@ -673,7 +675,7 @@ def test_skill_spell_selection():
     
     try:
         # Test warrior skills
-        game = Game()
+        game = Game(HeadlessTerminal())
         game.test_mode = True  # Disable interactive prompts during tests
         game.player = Player(1, 1, 'warrior')
         game.player.gain_exp(15)  # Level up to get skills
@@ -744,7 +746,7 @@ def test_combat_potion_consumption():
     
     try:
         # Create game and player with potions
-        game = Game()
+        game = Game(HeadlessTerminal())
         game.player = Player(1, 1, 'warrior')
         
         # Add health potions to inventory
@@ -922,7 +924,7 @@ def test_game_ui_methods():
     print_test_header("Game UI Methods")
     
     try:
-        game = Game()
+        game = Game(HeadlessTerminal())
         
         # Test class selection (should not crash)
         try:
@@ -1000,7 +1002,7 @@ def test_animation_system():
                 assert art is not None, f"Combat art for {entity} {pose} should not be None"
         
         # Test animation display method exists
-        game = Game()
+        game = Game(HeadlessTerminal())
         game.test_mode = True  # Disable interactive prompts during tests
         game.player = Player(1, 1, 'mage')
         monster = Monster(2, 2, 'goblin')
@@ -1098,7 +1100,7 @@ def test_game_state_management():
     print_test_header("Game State Management")
     
     try:
-        game = Game()
+        game = Game(HeadlessTerminal())
         
         # Test initial state
         assert game.is_running, "Game should start as running"
@@ -1194,7 +1196,7 @@ def test_combat_mechanics_comprehensive():
     print_test_header("Comprehensive Combat Mechanics")
     
     try:
-        game = Game()
+        game = Game(HeadlessTerminal())
         game.test_mode = True  # Disable interactive prompts during tests
         game.player = Player(1, 1, 'warrior')
         monster = Monster(2, 2, 'goblin')
@@ -1362,6 +1364,1225 @@ def test_dungeon_randomness_and_functionality():
         print_test_result("Dungeon Randomness and Functionality", False, f"Error: {str(e)}")
         return False
 
+def test_terminal_backend():
+    """Test that the game reads keys and draws frames through a terminal backend"""
+    print_test_header("Terminal Backend")
+    
+    try:
+        from terminal import HeadlessTerminal, get_terminal, Terminal
+        
+        # The platform backend can be created without touching the console
+        assert isinstance(get_terminal(), Terminal), "get_terminal should return a Terminal"
+        
+        # Timed reads return None instead of blocking
+        terminal = HeadlessTerminal()
+        assert terminal.read_key(timeout=0) is None, "Empty timed read should return None"
+        
+        # Scripted keys drive the class selection screen
+        terminal = HeadlessTerminal(['3'])
+        game = Game(terminal)
+        game.show_class_selection()
+        assert game.player is not None and game.player.player_class == 'rogue', "Key '3' should select the rogue"
+        assert "CHOOSE YOUR CLASS" in terminal.getvalue(), "Class selection should be drawn to the terminal"
+        
+        # Dungeon rendering goes to the given backend
+        game.dungeon.render(player_pos=(1, 1), player=game.player, terminal=terminal)
+        assert f"Level: {game.dungeon.level}" in terminal.getvalue(), "Dungeon should render to the terminal"
+        
+        # Running out of scripted input ends the game instead of hanging
+        game.run()
+        assert not game.is_running, "Game should stop when input is exhausted"
+        
+        # Arrow keys are dropped whole on POSIX, like on Windows
+        if os.name == 'posix':
+            from terminal import PosixTerminal
+            read_fd, write_fd = os.pipe()
+            try:
+                os.write(write_fd, b'\x1b[A\x1bOBw\x1b[15~s')
+                posix = PosixTerminal(input_fd=read_fd)
+                keys = [posix.read_key(timeout=1), posix.read_key(timeout=1)]
+                assert keys == ['w', 's'], f"Escape sequences should not reach the game: {keys}"
+                os.write(write_fd, b'\x1b')
+                assert posix.read_key(timeout=1) == '\x1b', "A lone Esc should still be a key"
+            finally:
+                os.close(read_fd)
+                os.close(write_fd)
+        
+        print_test_result("Terminal Backend", True, "Keys and frames routed through the backend")
+        return True
+    except Exception as e:
+        print_test_result("Terminal Backend", False, f"Error: {str(e)}")
+        return False
+
+def test_headless_frame_capture():
+    """Test driving screens headlessly with scripted keys and captured frames"""
+    print_test_header("Headless Frame Capture")
+    
+    try:
+        terminal = HeadlessTerminal(max_frames=4)
+        game = Game(terminal)
+        game.player = Player(1, 1, 'warrior')
+        potion = Item(1, 1, '!', 'Health Potion', {'heal': 15}, 'potion', 2, 0.5)
+        game.player.add_to_inventory(potion)
+        game.player.take_damage(10)
+        hurt_hp = game.player.hp
+        
+        # Inventory: use the potion, dismiss the message, then return
+        terminal.feed(['f', ' ', 'q'])
+        game.show_inventory()
+        assert game.player.hp > hurt_hp, "Using the potion should heal the player"
+        assert "INVENTORY" in terminal.screen, "Inventory should be the last frame drawn"
+        assert "(x1)" not in terminal.screen and "Health Potion" in terminal.screen, "Frame should show the remaining potion"
+        
+        # Spells/skills screen returns on Q
+        terminal.feed(['q'])
+        game.show_spells()
+        assert "SKILLS" in terminal.screen, "Warrior should see the skills screen"
+        
+        # Combat: attack until the goblin dies, without sleeping or printing
+        monster = Monster(2, 2, 'goblin')
+        monster.hp = 1
+        log = []
+        terminal.feed([' '])  # Dismiss the loot message
+        start = time.perf_counter()
+        result, log = game.combat_round(game.player, monster, 'a', log)
+        elapsed = time.perf_counter() - start
+        assert result is True, "Goblin should be defeated"
+        assert "COMBAT" in terminal.getvalue(), "Combat frames should be captured"
+        assert elapsed < 0.5, "Combat animations should not sleep headlessly"
+        
+        # Only the newest frames are kept in the ring
+        assert len(terminal.frames) <= 4, "Frame ring should be bounded"
+        assert terminal.frame_count > len(terminal.frames), "Older frames should be dropped from the ring"
+        
+        print_test_result("Headless Frame Capture", True, f"{terminal.frame_count} frames captured in {elapsed:.3f}s")
+        return True
+    except Exception as e:
+        print_test_result("Headless Frame Capture", False, f"Error: {str(e)}")
+        return False
+
+def test_combat_screen_caching():
+    """Test cached combat art panels, incremental potion counts and diffed redraws"""
+    print_test_header("Combat Screen Caching")
+    
+    try:
+        from game import compose_combat_panel
+        from terminal import diff_frame
+        
+        # The same art combination is composed only once
+        panel = compose_combat_panel('goblin', 'idle', 'hurt')
+        assert panel is compose_combat_panel('goblin', 'idle', 'hurt'), "Panel should come from the cache"
+        assert panel != compose_combat_panel('goblin', 'attack', 'idle'), "Different poses should compose differently"
+        
+        # Potion counts follow inventory changes without rescanning
+        player = Player(1, 1, 'warrior')
+        player.add_to_inventory(Item(1, 1, '!', 'Health Potion', {'heal': 15}, 'potion', 2, 0.5))
+        player.add_to_inventory(Item(1, 1, '!', 'Health Potion', {'heal': 15}, 'potion', 1, 0.5))
+        player.add_to_inventory(Item(1, 1, '&', 'Stamina Potion', {'stamina': 15}, 'potion', 1, 0.5))
+        assert player.get_potion_count('Health Potion') == 3, "Stacked potions should be counted"
+        player.remove_from_inventory(player.inventory[0])
+        player.drop_item(1)
+        assert player.get_potion_count('Health Potion') == 2, "Used potion should be uncounted"
+        assert player.get_potion_count('Stamina Potion') == 0, "Dropped potion should be uncounted"
+        
+        game = Game(HeadlessTerminal())
+        game.player = player
+        status = game.get_combat_status_lines(Monster(2, 2, 'goblin'))
+        assert "Potions: HP(2)" in status, "Combat status should show potion counts"
+        
+        # Moving the menu cursor only rewrites the rows that changed
+        old = ["COMBAT", "Your HP: 15/15", "→ Attack", "  Heal"]
+        new = ["COMBAT", "Your HP: 15/15", "  Attack", "→ Heal"]
+        diff = diff_frame(old, new)
+        assert "COMBAT" not in diff and "Your HP" not in diff, "Unchanged rows should not be redrawn"
+        assert "→ Heal" in diff and "  Attack" in diff, "Changed rows should be redrawn"
+        
+        print_test_result("Combat Screen Caching", True, "Panels cached, potions counted incrementally, redraws diffed")
+        return True
+    except Exception as e:
+        print_test_result("Combat Screen Caching", False, f"Error: {str(e)}")
+        return False
+
+def test_precompiled_art_table():
+    """Test the precompiled combat art line table"""
+    print_test_header("Precompiled Art Table")
+    
+    try:
+        from ascii_art import get_combat_art, get_combat_art_lines, COMBAT_ART_LINES, get_animation_frames
+        
+        for entity in ['player', 'goblin', 'orc', 'troll', 'monster']:
+            for pose in ['idle', 'attack', 'hurt']:
+                lines = get_combat_art_lines(entity, pose)
+                assert isinstance(lines, tuple), "Art lines should be a tuple"
+                assert lines is get_combat_art_lines(entity, pose), "Lookups should return the shared tuple"
+                assert len(set(len(line) for line in lines)) == 1, f"{entity} {pose} lines should be padded to one width"
+                assert [line.rstrip() for line in lines] == [line.rstrip() for line in get_combat_art(entity, pose).split('\n')], \
+                    f"{entity} {pose} lines should match the art string"
+        
+        # Unknown monsters fall back to the default figure, unknown poses to nothing
+        assert get_combat_art_lines('dragon', 'idle') is get_combat_art_lines('monster', 'idle'), "Unknown monster should use default art"
+        assert get_combat_art_lines('goblin', 'dance') == (), "Unknown pose should give no lines"
+        
+        # The table cannot be modified by callers
+        try:
+            COMBAT_ART_LINES[('player', 'idle')] = ()
+            assert False, "Art table should be read-only"
+        except TypeError:
+            pass
+        assert isinstance(get_animation_frames('fireball'), tuple), "Animation frames should be precompiled tuples"
+        
+        print_test_result("Precompiled Art Table", True, f"{len(COMBAT_ART_LINES)} art blocks precompiled")
+        return True
+    except Exception as e:
+        print_test_result("Precompiled Art Table", False, f"Error: {str(e)}")
+        return False
+
+def test_animation_scheduler():
+    """Test frame-deadline animation playback and column-only redraws"""
+    print_test_header("Animation Scheduler")
+    
+    try:
+        from animation import FrameClock, AnimationPlayer
+        from game import ANIMATION_COLUMN, COMBAT_HEADER
+        
+        # Deadlines are fixed from the start so slow frames don't drift
+        now = [0.0]
+        clock = FrameClock(10, clock=lambda: now[0])
+        clock.start()
+        now[0] = 0.25  # First frame drew late
+        assert abs(clock.next_deadline() - 0.1) < 1e-9, "First deadline should be 1/fps after start"
+        assert abs(clock.next_deadline() - 0.2) < 1e-9, "Later deadlines should not drift"
+        clock.speed_up(4)
+        assert abs(clock.next_deadline() - (0.25 + 1 / 40)) < 1e-9, "Fast-forward should shorten the remaining frames"
+        
+        # A realtime terminal waits with timed reads; a keypress skips ahead
+        class TimedTerminal(HeadlessTerminal):
+            realtime = True
+            def __init__(self, keys):
+                super().__init__(keys)
+                self.timeouts = []
+            def read_key(self, timeout=None):
+                self.timeouts.append(timeout)
+                return super().read_key(timeout)
+        terminal = TimedTerminal(['q'])
+        drawn = []
+        skipped = AnimationPlayer(terminal, fps=1000).play([lambda i=i: drawn.append(i) for i in range(5)])
+        assert skipped and drawn == [0, 1, 2, 3, 4], "Skipping should still draw every frame"
+        assert len(terminal.timeouts) == 1, "No waiting after a skip"
+        
+        # Spell animations only write into the animation column
+        terminal = HeadlessTerminal()
+        game = Game(terminal)
+        game.player = Player(1, 1, 'mage')
+        game.show_animation('fireball', Monster(2, 2, 'goblin'), ["Casting"])
+        assert terminal.frame_count == 1, "Animation should draw the combat screen only once"
+        frame = terminal.frames[-1]
+        row = frame[len(COMBAT_HEADER) + 3]
+        assert row[ANIMATION_COLUMN:ANIMATION_COLUMN + 10].strip() == "*******", "Animation frame should be in its column"
+        
+        print_test_result("Animation Scheduler", True, "Frame deadlines, skipping and column redraws working")
+        return True
+    except Exception as e:
+        print_test_result("Animation Scheduler", False, f"Error: {str(e)}")
+        return False
+
+def test_asciicast_recording():
+    """Test recording diffed terminal output to a compressed asciicast file"""
+    print_test_header("Asciicast Recording")
+    
+    try:
+        import io
+        import os
+        import tempfile
+        from recorder import AsciicastRecorder, load_asciicast
+        from terminal import PosixTerminal, CLEAR_SCREEN
+        
+        path = os.path.join(tempfile.mkdtemp(), 'session.cast.gz')
+        terminal = PosixTerminal(io.StringIO())
+        with AsciicastRecorder(path, width=100, height=60) as recorder:
+            terminal.recorder = recorder
+            frame = ["=" * 60, "Choose your action:", "→ Attack", "  Heal"]
+            terminal.draw(frame)
+            terminal.draw(["=" * 60, "Choose your action:", "  Attack", "→ Heal"])
+        
+        header, events = load_asciicast(path)
+        assert header['version'] == 2 and header['width'] == 100, "Header should describe an asciicast v2 recording"
+        assert len(events) == 2, f"Expected 2 output events, got {len(events)}"
+        assert events[0][1].startswith(CLEAR_SCREEN), "First event should be the full frame"
+        assert "Choose your action" not in events[1][1], "Later events should only hold the diff"
+        assert events[0][0] <= events[1][0], "Timestamps should not go backwards"
+        with open(path, 'rb') as f:
+            assert f.read(2) == b'\x1f\x8b', "Recording should be gzip-compressed"
+        
+        print_test_result("Asciicast Recording", True, f"{len(events)} diff events recorded")
+        return True
+    except Exception as e:
+        print_test_result("Asciicast Recording", False, f"Error: {str(e)}")
+        return False
+
+def test_fog_of_war():
+    """Test incremental field of view and explored-tile memory"""
+    print_test_header("Fog of War")
+    
+    try:
+        from dungeon import DIM
+        dungeon = Dungeon(20, 10)
+        # Open room with a wall splitting it at x=10
+        dungeon.map = [['#'] * 20 for _ in range(10)]
+        for y in range(1, 9):
+            for x in range(1, 19):
+                dungeon.map[y][x] = '.' if x != 10 else '#'
+        dungeon.explored = bytearray(20 * 10)
+        dungeon.visible = bytearray(20 * 10)
+        dungeon.visible_cells = set()
+        dungeon.fov_origin = None
+        dungeon.monsters = [Monster(15, 4, 'goblin'), Monster(3, 4, 'orc')]
+        dungeon.chests = []
+        
+        changed = dungeon.update_fov(2, 2)
+        assert dungeon.is_visible(3, 3) and dungeon.is_explored(3, 3), "Nearby floor should be visible and explored"
+        assert dungeon.is_visible(10, 2), "The wall itself should be visible"
+        assert not dungeon.is_visible(15, 4) and not dungeon.is_explored(15, 4), "Cells behind the wall should stay hidden"
+        assert len(changed) == len(dungeon.visible_cells), "First update should reveal every visible cell"
+        
+        # Standing still changes nothing; a step only touches the cells that changed state
+        assert dungeon.update_fov(2, 2) == set(), "Same origin should not touch the masks"
+        changed = dungeon.update_fov(3, 2)
+        assert 0 < len(changed) < len(dungeon.visible_cells), "A step should only update cells whose visibility changed"
+        
+        # Walk away: remembered cells stay explored but leave the view
+        dungeon.update_fov(2, 2)
+        before = set(dungeon.visible_cells)
+        dungeon.update_fov(9, 8)
+        remembered = [i for i in before if i not in dungeon.visible_cells]
+        assert remembered and all(dungeon.explored[i] for i in remembered), "Cells out of view should be remembered"
+        
+        lines = dungeon.render_lines(player_pos=(2, 2))
+        assert 'o' in lines[4], "Visible monster should be drawn"
+        assert 'g' not in lines[4], "Monster outside the view should not be drawn"
+        assert lines[0].startswith('#'), "Visible wall row should be drawn"
+        dungeon.render_lines(player_pos=(9, 8))
+        lines = dungeon.render_lines(player_pos=(9, 8))
+        assert DIM in lines[1], "Remembered tiles should be dimmed"
+        assert not dungeon.is_explored(15, 1) and '.' * 18 not in lines[1], "Unexplored tiles should be blank"
+        
+        print_test_result("Fog of War", True, f"{len(dungeon.visible_cells)} cells visible, masks updated incrementally")
+        return True
+    except Exception as e:
+        print_test_result("Fog of War", False, f"Error: {str(e)}")
+        return False
+
+def test_color_rendering():
+    """Test run-length colour output and the bandwidth cap"""
+    print_test_header("Colour Rendering")
+    
+    try:
+        import io
+        from terminal import PosixTerminal, SGR_PATTERN
+        dungeon = Dungeon(20, 10)
+        dungeon.map = [['#'] * 20 for _ in range(10)]
+        for y in range(1, 9):
+            for x in range(1, 19):
+                dungeon.map[y][x] = '.'
+        dungeon.explored = bytearray(20 * 10)
+        dungeon.visible = bytearray(20 * 10)
+        dungeon.visible_cells = set()
+        dungeon.fov_origin = None
+        dungeon.monsters = [Monster(5, 5, 'goblin')]
+        dungeon.chests = []
+        
+        lines = dungeon.render_lines(player_pos=(2, 2), color=True)
+        codes = sum(len(SGR_PATTERN.findall(line)) for line in lines)
+        plain = [SGR_PATTERN.sub('', line) for line in lines]
+        cells = sum(len(line) for line in plain)
+        assert codes and codes < cells / 4, "Runs of the same colour should share one escape sequence"
+        assert plain == dungeon.render_lines(player_pos=(2, 2), color=False), "Colour should not change the characters drawn"
+        mono = dungeon.render_lines(player_pos=(2, 2), color=False)
+        assert not any(SGR_PATTERN.search(line) for line in mono), "Monochrome view in full sight should have no colour codes"
+        
+        # Frames over the cap are sent with the colour stripped
+        stream = io.StringIO()
+        terminal = PosixTerminal(stream, input_fd=0)
+        terminal.max_frame_bytes = 100
+        terminal.draw(lines)
+        assert terminal.frames_degraded == 1, "Oversized frame should be degraded"
+        assert '\x1b[0;' not in stream.getvalue(), "Degraded frame should carry no colour"
+        assert terminal.bytes_written == len(stream.getvalue().encode('utf-8')), "Bytes written should be counted"
+        
+        print_test_result("Colour Rendering", True, f"{codes} escape sequences for {cells} cells")
+        return True
+    except Exception as e:
+        print_test_result("Colour Rendering", False, f"Error: {str(e)}")
+        return False
+
+def test_render_benchmark():
+    """Test the render benchmark harness on a small map"""
+    print_test_header("Render Benchmark")
+    
+    try:
+        from benchmarks.bench_render import map_cases, screen_cases, measure
+        results = {}
+        for name, sink, step in map_cases(1) + screen_cases():
+            results[name] = measure(sink, step, 0)
+        for name, result in results.items():
+            assert result['fps'] > 0 and result['bytes'] > 0, f"{name} should draw frames into the sink"
+        assert results["map: diffed"]['bytes'] < results["map: print loop"]['bytes'], "Diffed frames should send less than full redraws"
+        
+        print_test_result("Render Benchmark", True, f"{len(results)} cases measured")
+        return True
+    except Exception as e:
+        print_test_result("Render Benchmark", False, f"Error: {str(e)}")
+        return False
+
+def test_async_game_loop():
+    """Test the asyncio game loop, coalesced redraws and concurrent sessions"""
+    print_test_header("Async Game Loop")
+    
+    try:
+        import asyncio
+        from terminal import SGR_PATTERN
+        
+        def open_room_game(keys=()):
+            game = Game(HeadlessTerminal(keys))
+            dungeon = game.dungeon
+            dungeon.map = [['#' if x in (0, dungeon.width - 1) or y in (0, dungeon.height - 1) else '.'
+                            for x in range(dungeon.width)] for y in range(dungeon.height)]
+            dungeon.monsters = []
+            dungeon.chests = []
+            dungeon.stairs = None
+            return game
+        
+        # Keys queued up front are simulated in one go and only the last map frame is drawn
+        game = open_room_game()
+        keys = asyncio.Queue()
+        for key in [' ', '1'] + ['d'] * 5 + ['s'] * 3 + ['p']:
+            keys.put_nowait(key)
+        asyncio.run(game.run_async(keys))
+        terminal = game.terminal
+        assert isinstance(terminal, HeadlessTerminal), "Terminal should be restored after the loop"
+        assert (game.player.x, game.player.y) == (6, 4), "Every queued move should be simulated"
+        assert terminal.frame_count == 3, f"Title, class selection and one map frame expected, got {terminal.frame_count}"
+        row = SGR_PATTERN.sub('', terminal.frames[-1][4])
+        assert row.find('@') == 6, "Final frame should show the last position"
+        
+        # Modal screens are awaited inside the loop: open the inventory, then quit
+        game = open_room_game()
+        keys = asyncio.Queue()
+        for key in [' ', '2', 'd', 'i', 'q', 'p']:
+            keys.put_nowait(key)
+        asyncio.run(game.run_async(keys))
+        assert any("INVENTORY" in line for frame in game.terminal.frames for line in frame), "Inventory should be drawn"
+        assert game.player.player_class == 'mage' and game.player.x == 2, "Class and move should apply"
+        
+        # Two sessions share one event loop, each reading its own terminal
+        async def two_sessions():
+            games = [open_room_game([' ', '1', 'd', 'd', 'p']), open_room_game([' ', '3', 's', 'p'])]
+            await asyncio.gather(*(g.run_async() for g in games))
+            return games
+        first, second = asyncio.run(two_sessions())
+        assert (first.player.x, first.player.y) == (3, 1), "First session should move right twice"
+        assert (second.player.x, second.player.y) == (1, 2) and second.player.player_class == 'rogue', "Second session should move down"
+        assert not first.is_running and not second.is_running, "Both sessions should end on P"
+        
+        print_test_result("Async Game Loop", True, "Queued moves coalesced into one frame, sessions run side by side")
+        return True
+    except Exception as e:
+        print_test_result("Async Game Loop", False, f"Error: {str(e)}")
+        return False
+
+def test_travel_command():
+    """Test running and travelling to the stairs without intermediate redraws"""
+    print_test_header("Travel Command")
+    
+    try:
+        terminal = HeadlessTerminal()
+        game = Game(terminal)
+        game.player = Player(1, 1, 'warrior')
+        dungeon = Dungeon(20, 10)
+        game.dungeon = dungeon
+        # Corridor along y=1 ending in the stairs, plus a room below reached at x=18
+        dungeon.map = [['#'] * 20 for _ in range(10)]
+        for x in range(1, 19):
+            dungeon.map[1][x] = '.'
+        for y in range(1, 9):
+            dungeon.map[y][18] = '.'
+        dungeon.map[8][10:19] = ['.'] * 9
+        dungeon.stairs = (10, 8)
+        dungeon.map[8][10] = '>'
+        dungeon.explored = bytearray(20 * 10)
+        dungeon.visible = bytearray(20 * 10)
+        dungeon.visible_cells = set()
+        dungeon.fov_origin = None
+        dungeon.monsters = []
+        dungeon.chests = []
+        dungeon.update_fov(1, 1)
+        
+        # Shift+D runs down the corridor and stops where it turns, without drawing
+        frames = terminal.frame_count
+        steps = game.run_direction(1, 0)
+        assert (game.player.x, game.player.y) == (18, 1), f"Run should stop at the wall, got {(game.player.x, game.player.y)}"
+        assert steps == 17 and terminal.frame_count == frames, "Running should take many steps and draw nothing"
+        
+        # The stairs haven't been seen yet
+        terminal.feed([' '])
+        assert game.travel_to_stairs() == 0, "Travel should refuse unknown stairs"
+        
+        # Once seen, travel follows the explored path and stops next to the stairs
+        game.run_direction(0, 1)
+        assert dungeon.is_explored(10, 8), "Stairs should be in view from the room"
+        game.travel_to_stairs()
+        assert (game.player.x, game.player.y) == (11, 8), f"Travel should stop beside the stairs, got {(game.player.x, game.player.y)}"
+        
+        # A monster coming into view stops the run
+        game.player.x, game.player.y = 1, 1
+        dungeon.update_fov(1, 1)
+        dungeon.monsters = [Monster(14, 1, 'goblin')]
+        steps = game.run_direction(1, 0)
+        assert dungeon.visible_monsters() and game.player.x < 8, "Run should stop when a monster comes into view"
+        
+        # Shift+direction and '>' reach the travel commands from the map
+        dungeon.monsters = []
+        game.player.x = 6
+        # The Up arrow as raw ESC [ A is not Shift+A
+        from input_source import ScriptedInput
+        keyboard = game.input
+        game.input = ScriptedInput('\x1b[A')
+        while game.input.keys:
+            game.handle_input()
+        assert (game.player.x, game.player.y) == (6, 1), "An arrow key sequence should not move the player"
+        game.input = keyboard
+        terminal.feed(['A'])
+        game.handle_input()
+        assert (game.player.x, game.player.y) == (1, 1), "Shift+A should run left"
+        terminal.feed(['>'])
+        game.handle_input()
+        assert (game.player.x, game.player.y) == (11, 8), "'>' should travel to the stairs"
+        
+        print_test_result("Travel Command", True, "Runs and travel draw only the final state")
+        return True
+    except Exception as e:
+        print_test_result("Travel Command", False, f"Error: {str(e)}")
+        return False
+
+def test_auto_explore():
+    """Test auto-explore and the incrementally updated frontier distance map"""
+    print_test_header("Auto-Explore")
+    
+    try:
+        from explore import FrontierMap
+        from benchmarks.bench_explore import soak
+        terminal = HeadlessTerminal()
+        game = Game(terminal)
+        game.player = Player(1, 1, 'warrior')
+        dungeon = Dungeon(30, 12)
+        game.dungeon = dungeon
+        # Two rooms joined by a long corridor
+        dungeon.map = [['#'] * 30 for _ in range(12)]
+        for y in range(1, 6):
+            for x in range(1, 6):
+                dungeon.map[y][x] = '.'
+            for x in range(22, 29):
+                dungeon.map[y + 5][x] = '.'
+        for x in range(5, 23):
+            dungeon.map[3][x] = '.'
+        for y in range(3, 7):
+            dungeon.map[y][22] = '.'
+        dungeon.explored = bytearray(30 * 12)
+        dungeon.visible = bytearray(30 * 12)
+        dungeon.visible_cells = set()
+        dungeon.fov_origin = None
+        dungeon.frontier = None
+        dungeon.stairs = None
+        dungeon.chests = []
+        dungeon.monsters = [Monster(27, 10, 'goblin')]
+        
+        # Explore stops as soon as the goblin comes into view, drawing nothing on the way
+        frames = terminal.frame_count
+        steps = game.auto_explore()
+        assert steps > 10 and dungeon.visible_monsters(), "Explore should walk until the goblin is in view"
+        assert terminal.frame_count == frames, "Exploring should not draw intermediate frames"
+        assert dungeon.frontier.dist == FrontierMap(dungeon).dist, "Incremental distance map should match a full rebuild"
+        
+        # With the goblin gone every reachable floor tile gets explored
+        dungeon.monsters = []
+        terminal.feed([' '])  # Dismiss the message when exploring is done
+        while game.auto_explore():
+            pass
+        floor = [(x, y) for y in range(12) for x in range(30) if dungeon.map[y][x] == '.']
+        assert all(dungeon.is_explored(x, y) for x, y in floor), "All reachable floor should be explored"
+        assert "nothing left to explore" in terminal.screen, "Explore should report when done"
+        
+        # Headless soak run over a generated level
+        steps, fights, seconds = soak(levels=1, seed=3)
+        # The bound is loose on purpose: it catches a run that sleeps or
+        # redraws per step, not ordinary machine-to-machine variance
+        assert steps > 0 and steps / seconds > 20, f"Soak run should not wait between steps, got {steps / seconds:.0f} steps/s"
+        
+        print_test_result("Auto-Explore", True, f"Soak run: {steps} steps at {steps / seconds:.0f} steps/s")
+        return True
+    except Exception as e:
+        print_test_result("Auto-Explore", False, f"Error: {str(e)}")
+        return False
+
+def test_input_sources():
+    """Test scripted and policy-driven input sources"""
+    print_test_header("Input Sources")
+    
+    try:
+        from input_source import ScriptedInput, CallbackInput
+        from terminal import NullTerminal
+        
+        # Scripted keys answer prompts; timed reads (animation skips) don't use them up
+        script = ScriptedInput(['x'])
+        assert script.read_key(0.1) is None and list(script.keys) == ['x'], "Timed reads should not consume scripted keys"
+        terminal = HeadlessTerminal()
+        game = Game(terminal, input_source=ScriptedInput([' ', '2', 'd', 'p']))
+        game.run()
+        assert game.player.player_class == 'mage' and not game.is_running, "Scripted input should pick the mage and quit"
+        assert "CHOOSE YOUR CLASS" in terminal.getvalue(), "Screens should still be drawn to the terminal"
+        
+        # A policy plays with no terminal at all and never builds a map frame
+        game = Game(NullTerminal())
+        prompts = []
+        
+        def policy(prompt):
+            prompts.append(prompt)
+            if prompt == 'title':
+                return ' '
+            if prompt == 'class':
+                return '1'
+            if prompt == 'map':
+                game.player.hp = game.player.max_hp = 10 ** 6  # Keep the bot alive for the whole run
+                if prompts.count('map') > 150:
+                    return 'p'
+                if game.dungeon.visible_monsters():
+                    return random.choice('wasd')
+                return 'o'
+            if prompt == 'combat-action':
+                return 'f'
+            return ' ' if prompt == 'message' else 'q'
+        
+        game.input = CallbackInput(policy)
+        rendered = []
+        render_lines = game.dungeon.render_lines
+        game.dungeon.render_lines = lambda *args, **kwargs: rendered.append(1) or render_lines(*args, **kwargs)
+        start = time.perf_counter()
+        game.run()
+        elapsed = time.perf_counter() - start
+        assert not game.is_running and game.input.keys_sent > 100, "Policy should play until it quits"
+        assert not rendered, "No map frame should be built for a NullTerminal"
+        # Loose on purpose: a few hundred keys paced at even 30 frames per
+        # second would take about 10s
+        assert elapsed < 5, f"Bot game should run at CPU speed, took {elapsed:.1f}s"
+        
+        print_test_result("Input Sources", True, f"Bot sent {game.input.keys_sent} keys in {elapsed:.2f}s")
+        return True
+    except Exception as e:
+        print_test_result("Input Sources", False, f"Error: {str(e)}")
+        return False
+
+def test_simulation_engine():
+    """Test headless whole-game simulation and the batch runner"""
+    print_test_header("Simulation Engine")
+    
+    try:
+        import json
+        import os
+        import tempfile
+        from simulate import simulate_game, run_batch, summarize
+        
+        # The same seed replays the same game
+        first = simulate_game(7, 'warrior', max_turns=300)
+        second = simulate_game(7, 'warrior', max_turns=300)
+        first.pop('seconds'), second.pop('seconds')
+        assert first == second, "Simulating a seed twice should give the same result"
+        assert first['outcome'] in ('won', 'died', 'turn_limit'), f"Unexpected outcome {first['outcome']}"
+        assert first['turns'] <= 300, "Simulation should stop at the turn limit"
+        
+        # Seeds fan out over worker processes and land in a JSONL file
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'runs.jsonl')
+            results = run_batch(range(4), classes=('warrior', 'mage'), max_turns=300, workers=2, out=out)
+            with open(out) as f:
+                lines = [json.loads(line) for line in f]
+        assert len(results) == 8 and lines == results, "Every game should be returned and written"
+        rows = summarize(results)
+        assert [row['class'] for row in rows] == ['mage', 'warrior'], "Summary should have one row per class"
+        assert all(row['runs'] == 4 for row in rows), "Each class should have played every seed"
+        
+        print_test_result("Simulation Engine", True, f"Seed 7 warrior: {first['outcome']} on level {first['depth']} after {first['turns']} turns")
+        return True
+    except Exception as e:
+        print_test_result("Simulation Engine", False, f"Error: {str(e)}")
+        return False
+
+def test_combat_simulator():
+    """Test the Monte Carlo combat simulator against the game's combat rounds"""
+    print_test_header("Combat Simulator")
+    
+    try:
+        import combat_sim
+        
+        terminal = HeadlessTerminal()
+        game = Game(terminal)
+        game.test_mode = True
+        
+        def real_fight(player_class, level, monster_type):
+            player = Player(1, 1, player_class)
+            while player.level < level:
+                player.level_up()
+            monster = Monster(2, 1, monster_type)
+            log = []
+            for rounds in range(1, 200):
+                result, log = game.combat_round(player, monster, 'a', log)
+                if result is False:
+                    return combat_sim.LOST, player.max_hp, rounds
+                if not monster.is_alive():
+                    return combat_sim.WON, player.max_hp - player.hp, rounds
+        
+        # Warrior vs goblin is deterministic: 3 hits to kill, defense counted twice
+        fighter = combat_sim.Fighter('warrior', 1)
+        assert combat_sim.fight_once(fighter, 'goblin') == (combat_sim.WON, 2, 3) == real_fight('warrior', 1, 'goblin'), "Warrior should beat a goblin in 3 rounds losing 2 HP"
+        
+        # The rogue's dodge rolls draw from the same RNG in the same order
+        rogue = combat_sim.Fighter('rogue', 2)
+        for seed in range(20):
+            random.seed(seed)
+            expected = real_fight('rogue', 2, 'orc')
+            random.seed(seed)
+            assert combat_sim.fight_once(rogue, 'orc', rng=random) == expected, f"Seed {seed} should replay the game's fight"
+        
+        result = combat_sim.evaluate('mage', 3, 'orc', 'ability', fights=2000, seed=1)
+        assert result['win_rate'] + result['loss_rate'] + result['flee_rate'] == 1.0, "Every fight should end"
+        details = f"Mage L3 vs orc: {result['win_rate']:.0%} wins"
+        if combat_sim.np is not None:
+            # The vectorised batch agrees with fight-by-fight resolution
+            outcome, hp_lost, rounds = combat_sim.fight_batch(fighter, 'goblin', fights=100)
+            assert (outcome == combat_sim.WON).all() and (hp_lost == 2).all() and (rounds == 3).all(), "Batch should match the deterministic fight"
+            batch = combat_sim.evaluate('rogue', 5, 'troll', 'attack', fights=200000, seed=1)
+            numpy = combat_sim.np
+            combat_sim.np = None
+            try:
+                single = combat_sim.evaluate('rogue', 5, 'troll', 'attack', fights=20000, seed=1)
+            finally:
+                combat_sim.np = numpy
+            assert abs(batch['win_rate'] - single['win_rate']) < 0.02, f"Win rates differ: {batch['win_rate']} vs {single['win_rate']}"
+            details += f"; rogue L5 vs troll {batch['win_rate']:.1%} (NumPy) vs {single['win_rate']:.1%}"
+        
+        print_test_result("Combat Simulator", True, details)
+        return True
+    except Exception as e:
+        print_test_result("Combat Simulator", False, f"Error: {str(e)}")
+        return False
+
+def test_combat_resolver():
+    """Test the pure combat resolver and its events"""
+    print_test_header("Combat Resolver")
+    
+    try:
+        import combat
+        
+        player = Player(1, 1, 'rogue')
+        player.level_up()
+        monster = Monster(2, 1, 'orc')
+        before = (combat.player_state(player), combat.monster_state(monster))
+        backstab = ('skill', player.get_learned_skills()['backstab'])
+        result = combat.resolve_round(before[0], before[1], 'x', random.Random(1), backstab)
+        assert (combat.player_state(player), combat.monster_state(monster)) == before, "Resolver should not touch the entities"
+        assert result.player.stamina == player.stamina - 6 and result.monster.hp == 5, "Backstab should cost 6 SP and deal 10 damage"
+        assert result.events[0] == combat.Event('skill_damage', 'player', 10, 'Backstab'), f"Unexpected event {result.events[0]}"
+        assert combat.format_event(result.events[0]) == "You use Backstab and deal 10 damage!"
+        
+        # Game.combat_round presents the same round and writes the state back
+        game = Game(HeadlessTerminal())
+        game.test_mode = True
+        game.player = player
+        for seed in range(5):
+            monster = Monster(2, 1, 'orc')
+            random.seed(seed)
+            expected = combat.resolve_round(combat.player_state(player), combat.monster_state(monster), 'a', random)
+            random.seed(seed)
+            outcome, log = game.combat_round(player, monster, 'a', [])
+            assert outcome == expected.outcome and log == [combat.format_event(e) for e in expected.events], f"Seed {seed}: {log}"
+            assert combat.monster_state(monster) == expected.monster, "Monster state should be written back"
+            player.hp = player.max_hp
+        
+        start = time.perf_counter()
+        state = combat.monster_state(Monster(2, 1, 'dragon'))
+        for _ in range(10000):
+            state = combat.resolve_round(combat.player_state(player), state, 'a', random).monster
+        elapsed = time.perf_counter() - start
+        
+        print_test_result("Combat Resolver", True, f"10000 rounds in {elapsed:.3f}s")
+        return True
+    except Exception as e:
+        print_test_result("Combat Resolver", False, f"Error: {str(e)}")
+        return False
+
+def test_shared_static_data():
+    """Test that class, monster and chest data is shared, not copied per instance"""
+    print_test_header("Shared Static Data")
+    
+    try:
+        from entities import CLASS_SPELLS
+        from monsters import MONSTER_LOOT
+        from benchmarks import bench_memory
+        
+        first, second = Player(1, 1, 'mage'), Player(1, 1, 'mage')
+        assert first.available_spells is second.available_spells is CLASS_SPELLS['mage'], "Players should share the spell table"
+        assert Player(1, 1, 'warrior').available_spells == {}, "Warriors should have no spells"
+        try:
+            first.available_spells[1]['fireball']['damage'] = 99
+            assert False, "Spell data should be read-only"
+        except TypeError:
+            pass
+        assert first.get_learned_spells()['fireball']['damage'] == 8, "Fireball should be unchanged"
+        assert Monster(1, 1, 'orc').loot_table is Monster(2, 2, 'orc').loot_table is MONSTER_LOOT['orc']
+        
+        for player_class, unwanted in [('warrior', 'Mana Potion'), ('mage', 'Stamina Potion')]:
+            for _ in range(20):
+                loot = Chest(3, 4).open(player_class)
+                assert 1 <= len(loot) <= 3 and all((item.x, item.y) == (3, 4) for item in loot), "Loot should be built at the chest"
+                assert unwanted not in [item.name for item in loot], f"{player_class} should not find a {unwanted}"
+        
+        per_session, _ = bench_memory.measure(1, 4)
+        assert per_session > 0, "Sessions should allocate something"
+        
+        print_test_result("Shared Static Data", True, f"{per_session / 1024:.1f} KiB per idle level 1 session")
+        return True
+    except Exception as e:
+        print_test_result("Shared Static Data", False, f"Error: {str(e)}")
+        return False
+
+def test_telnet_server():
+    """Test concurrent telnet sessions with their own random state"""
+    print_test_header("Telnet Server")
+    
+    try:
+        import asyncio
+        from flow import SessionRandom
+        from server import GameServer, TelnetDecoder, SocketTerminal, HIGH_WATER, IAC, SB, SE, NAWS
+        from terminal import SGR_PATTERN, CLEAR_SCREEN
+        
+        decoder = TelnetDecoder(HeadlessTerminal())
+        keys = decoder.feed(bytes([IAC, SB, NAWS, 0, 100, 0, 40, IAC, SE]) + b'w\r\n')
+        assert keys == ['w', '\r'] and decoder.terminal.rows == 40, "Decoder should strip telnet commands and read the window size"
+        keys = decoder.feed(b'\x1b[') + decoder.feed(b'Aa\x1bOD\x1b[1;5Cd')
+        assert keys == ['a', 'd'], f"Decoder should drop arrow key sequences: {keys}"
+        assert decoder.feed(b'\x1b') == ['\x1b'], "A lone Esc should still be a key"
+        
+        # A client that stops reading gets frames skipped, not queued without bound
+        class StalledWriter:
+            def __init__(self):
+                self.transport = self
+                self.sent = []
+            def is_closing(self):
+                return False
+            def get_write_buffer_size(self):
+                return sum(map(len, self.sent))
+            def write(self, data):
+                self.sent.append(data)
+        writer = StalledWriter()
+        terminal = SocketTerminal(writer)
+        for i in range(200):
+            terminal.draw([f"frame {i}" + "#" * 1000] * 20)
+        assert terminal.frames_dropped and writer.get_write_buffer_size() < HIGH_WATER + 25000, "Frames should stop queueing"
+        writer.sent.clear()
+        terminal.draw(["caught up"])
+        assert writer.sent[0].startswith(CLEAR_SCREEN.encode()), "A client that catches up should get a full redraw"
+        
+        async def read_until(reader, text):
+            seen = ''
+            while text not in seen:
+                data = await asyncio.wait_for(reader.read(65536), 5)
+                assert data, f"Connection closed before {text!r}"
+                seen += SGR_PATTERN.sub('', data.decode('utf-8', 'replace'))
+            return seen
+        
+        async def scenario():
+            server = GameServer(seed=10)
+            port = await server.start('127.0.0.1', 0)
+            clients = [await asyncio.open_connection('127.0.0.1', port) for _ in range(2)]
+            for reader, writer in clients:
+                writer.write(b' ')
+                await read_until(reader, "CHOOSE YOUR CLASS")
+            for reader, writer in clients:
+                writer.write(b'1')
+            for reader, writer in clients:
+                await read_until(reader, "Class: Warrior")
+            maps = [game.dungeon.map for game, _ in server.sessions.values()]
+            for reader, writer in clients:
+                writer.close()
+            await server.close()
+            return maps
+        
+        maps = asyncio.run(scenario())
+        # Each session builds the dungeon its seed builds on its own
+        for seed, session_map in zip((10, 11), maps):
+            with SessionRandom(seed):
+                expected = Game(HeadlessTerminal()).dungeon.map
+            assert session_map == expected, f"Session with seed {seed} should get its own dungeon"
+        assert maps[0] != maps[1], "Sessions should not share a dungeon"
+        
+        print_test_result("Telnet Server", True, "Two sessions played side by side")
+        return True
+    except Exception as e:
+        print_test_result("Telnet Server", False, f"Error: {str(e)}")
+        return False
+
+def test_gym_environment():
+    """Test the reset/step environment and lockstep VecEnv"""
+    print_test_header("Gym Environment")
+    
+    try:
+        import env
+        
+        dungeon_env = env.DungeonEnv('rogue')
+        obs, info = dungeon_env.reset(seed=5)
+        first = bytes(obs.tiles), bytes(obs.entities), obs.stats.tolist()
+        assert info['prompt'] == 'map' and obs.tiles.shape == env.VIEW, f"Unexpected start {info}"
+        height, width = env.VIEW
+        assert obs.entities[height // 2, width // 2] == env.ENTITY_CODES['player'], "Player should be in the middle"
+        assert obs.stats[env.STATS.index('hp')] == dungeon_env.game.player.hp
+        for action in [0, 1, 2, 3] * 10:
+            obs2, reward, terminated, truncated, info = dungeon_env.step(action)
+            assert obs2 is obs, "Observations should be updated in place"
+            if terminated:
+                break
+        assert dungeon_env.reset(seed=5)[0] is obs and (bytes(obs.tiles), bytes(obs.entities), obs.stats.tolist()) == first, \
+            "Same seed should give the same start"
+        
+        # Worker processes write the same observations as in-process envs
+        actions = [[random.Random(i).randrange(len(env.ACTIONS)) for _ in range(3)] for i in range(60)]
+        runs = []
+        for workers in (0, 1):
+            with env.VecEnv(3, 'warrior', workers=workers, max_steps=40) as envs:
+                obs, infos = envs.reset(seed=9)
+                assert obs.tiles.shape == (3,) + env.VIEW and obs.stats.shape == (3, len(env.STATS))
+                rewards = []
+                for step_actions in actions:
+                    obs, step_rewards, terminated, truncated, infos = envs.step(step_actions)
+                    rewards.append(step_rewards)
+                runs.append((bytes(obs.tiles), bytes(obs.entities), obs.stats.tolist(), rewards))
+        assert runs[0] == runs[1], "Worker envs should match in-process envs"
+        
+        print_test_result("Gym Environment", True, f"{len(actions)} lockstep steps of 3 envs, in-process and in a worker")
+        return True
+    except Exception as e:
+        print_test_result("Gym Environment", False, f"Error: {str(e)}")
+        return False
+
+def test_game_forks():
+    """Test snapshots and forks sharing the tile grid copy-on-write"""
+    print_test_header("Game Forks")
+    
+    try:
+        import snapshot
+        from input_source import ScriptedInput
+        
+        random.seed(4)
+        game = Game(HeadlessTerminal())
+        game.test_mode = True
+        game.player = Player(1, 1, 'warrior')
+        game.player.add_to_inventory(Item(0, 0, 'S', 'Steel Sword', {'attack': 5}, 'weapon'))
+        game.player.use_item_from_inventory(0)
+        game.dungeon.update_fov(1, 1)
+        snap = snapshot.take_snapshot(game)
+        first, rng_a = snapshot.restore(snap)
+        second, rng_b = snapshot.restore(snap)
+        assert all(a is b for a, b in zip(first.dungeon.map, game.dungeon.map)), "Forks should share the map rows"
+        assert first.player.equipped_weapon is first.player.inventory[0] and first.player.attack == game.player.attack
+        
+        # Each fork changes on its own
+        first.player.hp = 1
+        first.dungeon.monsters.pop()
+        first.dungeon.set_tile(2, 2, '#')
+        assert game.player.hp == second.player.hp == game.player.max_hp, "Player stats should not be shared"
+        assert len(second.dungeon.monsters) == len(game.dungeon.monsters), "Monsters should not be shared"
+        assert first.dungeon.map[2][2] == '#' and game.dungeon.map[2] is second.dungeon.map[2] != first.dungeon.map[2], \
+            "set_tile should copy the shared row"
+        
+        # Restores of one snapshot roll the same dice; play diverges by input
+        with rng_a:
+            roll_a = random.random()
+        with rng_b:
+            roll_b = random.random()
+        assert roll_a == roll_b, "Forks should resume the captured random state"
+        positions = set()
+        for key in 'sd':
+            trial, rng = snapshot.restore(snap, input_source=ScriptedInput([key] + [' '] * 20))
+            with rng:
+                trial.handle_input()
+            positions.add((trial.player.x, trial.player.y))
+        assert (game.player.x, game.player.y) == (1, 1), "The original should not move"
+        
+        start = time.perf_counter()
+        for _ in range(500):
+            snapshot.fork(game)
+        elapsed = time.perf_counter() - start
+        
+        print_test_result("Game Forks", True, f"500 forks in {elapsed:.3f}s, fork moves ended at {sorted(positions)}")
+        return True
+    except Exception as e:
+        print_test_result("Game Forks", False, f"Error: {str(e)}")
+        return False
+
+def test_combat_log():
+    """Test the bounded, lazily formatted battle log and its history file"""
+    print_test_header("Combat Log")
+    
+    try:
+        import os
+        import tempfile
+        import combat
+        from input_source import ScriptedInput
+        
+        log = combat.CombatLog(size=4)
+        for turn in range(1, 11):
+            log.turn = turn
+            log.append(combat.Event('hit', 'player', turn, 'Goblin'))
+        log.append("A plain line")
+        assert len(log) == 4 and [r.turn for r in log.records] == [8, 9, 10, 10], "Only the last records should be kept"
+        assert log[-3:] == ["You hit Goblin for 9 damage!", "You hit Goblin for 10 damage!", "A plain line"], f"Got {log[-3:]}"
+        
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'combat.log')
+            history = combat.history_logger(path, max_bytes=400, backups=2)
+            try:
+                game = Game(HeadlessTerminal())
+                game.test_mode = True
+                game.combat_history = history
+                game.player = Player(1, 1, 'warrior')
+                game.player.attack = 100
+                for _ in range(4):
+                    game.input = ScriptedInput(['f'] * 5)
+                    game.handle_combat(Monster(2, 1, 'troll'))
+                assert game.kills == 4, "Every troll should fall to one blow"
+                with open(path, encoding='utf-8') as f:
+                    text = f.read()
+                assert "turn 1 defeated player: You defeated the Troll!" in text, f"History missing the kill: {text!r}"
+                assert os.path.exists(path + '.1'), "History should rotate"
+            finally:
+                for handler in history.handlers[:]:
+                    history.removeHandler(handler)
+                    handler.close()
+        
+        print_test_result("Combat Log", True, "Ring keeps the last records, history rotates on disk")
+        return True
+    except Exception as e:
+        print_test_result("Combat Log", False, f"Error: {str(e)}")
+        return False
+
+def test_timed_status_effects():
+    """Test timed status effects: poison, stun, shield and resurrection ward"""
+    print_test_header("Timed Status Effects")
+    
+    try:
+        import combat
+        from effects import StatusEffects
+        
+        rng = random.Random(1)
+        player = Player(1, 1, 'cleric')
+        player.level = 8
+        player.learned_spells.update(['divine_protection', 'resurrection'])
+        player.mana = player.max_mana = 200
+        player.dodge_chance = 0.0
+        
+        # Poison ticks for 3, 2, 1 then wears off
+        goblin = Monster(2, 1, 'goblin')
+        goblin.hp = 100
+        goblin.poison_damage = 3
+        ticks = []
+        for _ in range(4):
+            state = goblin.effects.tick(combat.monster_state(goblin), lambda kind, amount=None: ticks.append((kind, amount)))
+            goblin.hp = state.hp
+        assert ticks == [('poison_tick', 3), ('poison_tick', 2), ('poison_tick', 1), ('poison_end', None)], f"Got {ticks}"
+        assert goblin.hp == 94 and not goblin.poisoned, "Poison should deal 6 damage and end"
+        
+        # A stun costs the monster exactly one attack
+        orc = Monster(2, 1, 'orc')
+        orc.stunned = True
+        kinds = [event.kind for event in combat.resolve_round(combat.player_state(player), combat.monster_state(orc),
+                                                              'h', rng).events]
+        assert 'stunned' in kinds and 'monster_hit' not in kinds, f"Stunned orc should not attack: {kinds}"
+        
+        # Divine Protection raises defense by 3 for the round it is cast in
+        # and the next two, then fades
+        orc = Monster(2, 1, 'orc')
+        orc.hp = 1000
+        orc.attack = 10
+        spell = ('spell', player.available_spells[5]['divine_protection'])
+        state = combat.player_state(player)._replace(defense=2)
+        result = combat.resolve_round(state, combat.monster_state(orc), 'x', rng, spell)
+        assert player.effects.magnitude('shield') == 0, "The resolver must not touch the input states"
+        assert result.player.effects.magnitude('shield') == 3, "Shield should be active"
+        losses = [state.hp - result.player.hp]
+        for _ in range(3):
+            state = result.player._replace(hp=player.max_hp)
+            result = combat.resolve_round(state, combat.monster_state(orc), 'a', rng)
+            losses.append(state.hp - result.player.hp)
+        # Attack 10 against defense 2 costs 6 HP (defense counts twice), and
+        # the shield's 3 counts once
+        assert losses == [3, 3, 3, 6], f"Shielded hits wrong: {losses}"
+        assert not result.player.effects.has('shield'), "Shield should have expired"
+        
+        # Resurrection brings the player back once
+        troll = Monster(2, 1, 'troll')
+        troll.attack = 1000
+        result = combat.resolve_round(combat.player_state(player), combat.monster_state(troll), 'x', rng,
+                                      ('spell', player.available_spells[7]['resurrection']))
+        kinds = [event.kind for event in result.events]
+        assert 'revived' in kinds and result.outcome is None and result.player.hp == player.max_hp, f"Got {kinds}"
+        result = combat.resolve_round(result.player, result.monster, 'h', rng)
+        assert result.outcome is False, "The ward should only work once"
+        
+        # Effects round-trip through their compact state
+        effects = StatusEffects()
+        effects.add('shield', 3, 2)
+        assert StatusEffects.from_state(effects.state()) == effects
+        
+        print_test_result("Timed Status Effects", True, "Poison, stun, shield and ward tick and expire per turn")
+        return True
+    except Exception as e:
+        print_test_result("Timed Status Effects", False, f"Error: {str(e)}")
+        return False
+
+def test_group_encounters():
+    """Test several monsters fighting the player in one encounter"""
+    print_test_header("Group Encounters")
+    
+    try:
+        import combat
+        from input_source import ScriptedInput
+        
+        # Area spells hit every monster; the rest act in queue order
+        player = Player(1, 1, 'mage')
+        for _ in range(4):
+            player.level_up()
+        goblins = [Monster(2, 1, 'goblin'), Monster(2, 2, 'goblin'), Monster(1, 2, 'troll')]
+        ice_storm = ('spell', player.get_learned_spells()['ice_storm'])
+        result = combat.resolve_group_round(combat.player_state(player), [combat.monster_state(m) for m in goblins], 0,
+                                            'x', random.Random(1), ice_storm)
+        assert [m.hp for m in result.monsters] == [0, 0, 7], f"Ice Storm should hit all: {result.monsters}"
+        kinds = [(e.kind, e.name) for e in result.events]
+        assert kinds.count(('defeated', 'Goblin')) == 2 and ('monster_hit', 'Troll') in kinds, f"Got {kinds}"
+        
+        # Monsters closing in start one fight; the screen is drawn once a round
+        terminal = HeadlessTerminal()
+        game = Game(terminal, input_source=ScriptedInput(['f'] * 20))
+        game.test_mode = True
+        game.dungeon.monsters = [Monster(2, 1, 'goblin'), Monster(1, 2, 'orc'), Monster(2, 2, 'goblin')]
+        game.player = Player(1, 1, 'warrior')
+        game.player.attack = 100
+        game.last_move = (0, 0)
+        for monster in game.dungeon.monsters:
+            monster.stunned = True  # Hold them in place for the map turn
+        drawn = []
+        draw = terminal.draw
+        terminal.draw = lambda lines: (drawn.append(lines), draw(lines))
+        fought = game.monster_move_and_check_initiate()
+        assert fought and game.kills == 3 and not game.dungeon.monsters, "All three should fall in one encounter"
+        assert game.foes == [] and game.opponent is None, "Fight state should be cleared"
+        menus = [lines for lines in drawn if "Choose your action:" in lines]
+        assert len(menus) == 3 and "T = Switch target" in menus[0], f"Expected one action screen per round, got {len(menus)}"
+        assert any("> Goblin HP: 8/8" in line for line in menus[0]), "Status should list every foe"
+        
+        print_test_result("Group Encounters", True, "Three monsters, one fight, area spells hit everyone")
+        return True
+    except Exception as e:
+        print_test_result("Group Encounters", False, f"Error: {str(e)}")
+        return False
+
+def test_slotted_entities():
+    """Test that entities keep their attributes in __slots__"""
+    print_test_header("Slotted Entities")
+    
+    try:
+        import copy
+        import pickle
+        from benchmarks import bench_entities
+        
+        player = Player(1, 1, 'rogue')
+        entities = [player, Monster(2, 1, 'orc'), Item(1, 1, '!', 'Health Potion', {'heal': 15}, 'potion'), Chest(3, 3)]
+        for entity in entities:
+            assert not hasattr(entity, '__dict__'), f"{type(entity).__name__} should not have a __dict__"
+        try:
+            player.nickname = 'Bob'
+            assert False, "Unknown attributes should be refused"
+        except AttributeError:
+            pass
+        
+        # Public attributes and properties still read and write as before
+        monster = entities[1]
+        monster.stunned = True
+        monster.hp -= 5
+        player.dodging = True
+        assert monster.stunned and monster.hp == 10 and player.dodging
+        clone = pickle.loads(pickle.dumps(monster))
+        assert clone.hp == 10 and clone.stunned and copy.deepcopy(player).dodging, "Slotted entities should copy"
+        
+        monster_bytes = bench_entities.bytes_per_instance(bench_entities.build_monsters, 2000)
+        item_bytes = bench_entities.bytes_per_instance(bench_entities.build_items, 2000)
+        
+        print_test_result("Slotted Entities", True, f"{monster_bytes:.0f} bytes/monster, {item_bytes:.0f} bytes/item")
+        return True
+    except Exception as e:
+        print_test_result("Slotted Entities", False, f"Error: {str(e)}")
+        return False
+
+def test_monster_templates():
+    """Test the data-driven monster type registry"""
+    print_test_header("Monster Templates")
+    
+    try:
+        import json
+        import os
+        import tempfile
+        import monsters
+        from benchmarks import bench_entities
+        
+        orc, other = Monster(1, 1, 'orc'), Monster(2, 2, 'orc')
+        assert orc.template is other.template is monsters.MONSTER_TEMPLATES['orc'], "Monsters should share their template"
+        assert (orc.name, orc.hp, orc.max_hp, orc.attack, orc.move_speed) == ('Orc', 15, 15, 5, 2)
+        orc.attack = 50
+        assert orc.attack == 50 and other.attack == 5 and monsters.MONSTER_TEMPLATES['orc'].attack == 5, \
+            "Tweaking one monster should leave the type alone"
+        game = Game(HeadlessTerminal())
+        assert game.get_monster_type(Monster(1, 1, 'dragon')) == 'monster' and game.get_monster_type(other) == 'orc'
+        
+        # 500 more types from a data file cost nothing per monster
+        before = bench_entities.bytes_per_instance(bench_entities.build_monsters, 2000)
+        table = {f"beast{i}": {"char": "b", "name": f"Beast {i}", "hp": 5 + i, "attack": 2, "defense": 1, "exp_value": 3,
+                               "loot": ["gold"]} for i in range(500)}
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'beasts.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(table, f)
+            try:
+                assert len(monsters.load_templates(path)) == 500
+                beast = Monster(3, 3, 'beast499')
+                assert beast.hp == 504 and beast.loot_table == ('gold',) and beast.art == 'monster'
+                after = bench_entities.bytes_per_instance(bench_entities.build_monsters, 2000)
+                assert abs(after - before) < 8, f"Monster size changed: {before:.0f} -> {after:.0f} bytes"
+                assert monsters.SPAWN_TYPES == ['goblin', 'orc', 'troll'], "Only spawning types should be placed"
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump({"blob": {"char": "b"}}, f)
+                try:
+                    monsters.load_templates(path)
+                    assert False, "Incomplete types should be refused"
+                except ValueError:
+                    pass
+            finally:
+                for monster_type in table:
+                    monsters.MONSTER_TEMPLATES.pop(monster_type, None)
+                    monsters.MONSTER_LOOT.pop(monster_type, None)
+        
+        print_test_result("Monster Templates", True, f"{after:.0f} bytes per monster with 504 types")
+        return True
+    except Exception as e:
+        print_test_result("Monster Templates", False, f"Error: {str(e)}")
+        return False
+
 def run_all_tests():
     print("="*60)
     print("ASCII ROGUELIKE DUNGEON CRAWLER - FULL FUNCTION TEST SUITE")
@@ -1400,6 +2621,31 @@ def run_all_tests():
         ("Comprehensive Combat Mechanics", test_combat_mechanics_comprehensive),
         ("Comprehensive Inventory Management", test_inventory_management_comprehensive),
         ("Dungeon Randomness and Functionality", test_dungeon_randomness_and_functionality),
+        ("Terminal Backend", test_terminal_backend),
+        ("Headless Frame Capture", test_headless_frame_capture),
+        ("Combat Screen Caching", test_combat_screen_caching),
+        ("Precompiled Art Table", test_precompiled_art_table),
+        ("Animation Scheduler", test_animation_scheduler),
+        ("Asciicast Recording", test_asciicast_recording),
+        ("Fog of War", test_fog_of_war),
+        ("Colour Rendering", test_color_rendering),
+        ("Render Benchmark", test_render_benchmark),
+        ("Async Game Loop", test_async_game_loop),
+        ("Travel Command", test_travel_command),
+        ("Auto-Explore", test_auto_explore),
+        ("Input Sources", test_input_sources),
+        ("Simulation Engine", test_simulation_engine),
+        ("Combat Simulator", test_combat_simulator),
+        ("Combat Resolver", test_combat_resolver),
+        ("Telnet Server", test_telnet_server),
+        ("Shared Static Data", test_shared_static_data),
+        ("Gym Environment", test_gym_environment),
+        ("Game Forks", test_game_forks),
+        ("Combat Log", test_combat_log),
+        ("Timed Status Effects", test_timed_status_effects),
+        ("Group Encounters", test_group_encounters),
+        ("Slotted Entities", test_slotted_entities),
+        ("Monster Templates", test_monster_templates),
     ]
     passed = 0
     total = len(tests)